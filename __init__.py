@@ -1,44 +1,348 @@
 import ctypes
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Union, Optional
+from typing import Union, Optional, Iterable, Iterator, Dict, List, Tuple
 import numpy as np
 import numpy.typing as npt
 
 from .exceptions import UDMNotLoaded
-from .properties import ElementProperty
+from .fileutil import write_atomic
+from .header import UdmHeader, read_header, HEADER_WINDOW
+from .locks import RWLock
+from .recorder import AccessPlan, AccessRecorder, ReplayResult
+from .transaction import Transaction
+from .properties import (
+    ElementProperty, ValueArrayProperty, StructArrayProperty, PropertyValue, _join_path, _unwrap_property
+)
 from .type_info import UdmType, udm_to_np, udm_type_to_ctypes
+from .writer import write_python, write_generation
 from . import wrapper
 
-__all__ = ['UDM', 'UdmType']
+__all__ = ['UDM', 'UdmType', 'UdmHeader']
+
+_save_executor: Optional[ThreadPoolExecutor] = None
+_save_executor_lock = threading.Lock()
+
+
+def _get_save_executor() -> ThreadPoolExecutor:
+    global _save_executor
+    with _save_executor_lock:
+        if _save_executor is None:
+            # One worker keeps background saves in submission order
+            _save_executor = ThreadPoolExecutor(1, thread_name_prefix='udm-save')
+        return _save_executor
 
 
 class UDM:
     def __init__(self):
         self._udm_data: ctypes.c_void_p = ctypes.c_void_p()
+        # Writes made to this document, see writer.write_generation
+        self._writes = 0
+        # Write generation the document matched a file at, None until it was saved or loaded
+        self._clean_generation: Optional[int] = None
+        self._saved_path: Optional[Path] = None
+        self._pending_save: Optional[Future] = None
+        # Readers share the document, writes (and destroy) are exclusive
+        self._lock = RWLock()
+        # Values read by prefetch and their types, by normalized path
+        self._prefetched: Dict[str, Tuple[PropertyValue, UdmType]] = {}
+        self._prefetched_generation = 0
+        # Subtree fingerprints by path, see IProperty.fingerprint
+        self._fingerprints: Dict[str, bytes] = {}
+        self._fingerprints_generation = 0
+        self._transaction: Optional[Transaction] = None
+        self._recorder: Optional[AccessRecorder] = None
+
+    def _clear_caches(self):
+        # Both are keyed by path and write generation, another document under this object reuses both
+        self._prefetched = {}
+        self._fingerprints = {}
 
     def create(self, asset_type, version, clear_on_destroy: bool = True) -> bool:
         data = wrapper.udm_create(asset_type.encode('utf8'), version, clear_on_destroy)
         self._udm_data = ctypes.c_void_p(data)
+        self._clean_generation = None
+        self._clear_caches()
         return data is not None
 
+    @classmethod
+    def from_python(cls, asset_type: str, version: int, data: dict, types: Optional[Dict[str, UdmType]] = None,
+                    compress_threshold: Optional[int] = None) -> 'UDM':
+        """Builds a new document from nested dicts, lists, scalars and numpy arrays, such as `to_python()` output.
+
+        See `writer.write_python` for `types` and `compress_threshold`, `writer.collect_types` records the types
+        needed for an exact round-trip.
+        """
+        udm = cls()
+        if not udm.create(asset_type, version):
+            raise RuntimeError(f'Failed to create {asset_type!r} document')
+        root_p = udm.root.prop_pointer
+        try:
+            with udm.lock.write():
+                for name, value in data.items():
+                    write_python(root_p, name, value, types, compress_threshold, udm)
+        except Exception:
+            udm.destroy()
+            raise
+        return udm
+
     def load(self, filename: Union[str, Path], clear_on_destroy: bool = True) -> bool:
+        generation = write_generation(self)
         data = wrapper.udm_load(str(filename).encode('utf8'), clear_on_destroy)
         self._udm_data = ctypes.c_void_p(data)
+        self._clear_caches()
+        if data is not None:
+            self._clean_generation = generation
+            self._saved_path = Path(filename)
         return data is not None
 
+    @staticmethod
+    def peek(filename: Union[str, Path], fallback: bool = False, window: int = HEADER_WINDOW) -> UdmHeader:
+        """Returns asset type, version and file size by reading only the file header.
+
+        With `fallback` enabled the file is fully loaded when the header does not contain the asset info.
+        """
+        header = read_header(filename, window)
+        if fallback and (header.asset_type is None or header.asset_version is None):
+            udm = UDM()
+            if udm.load(filename):
+                header = header._replace(asset_type=udm.asset_type, asset_version=udm.asset_version)
+            udm.destroy()
+        return header
+
+    @staticmethod
+    def peek_many(filenames: Iterable[Union[str, Path]], max_workers: Optional[int] = None,
+                  fallback: bool = False) -> Dict[Union[str, Path], Optional[UdmHeader]]:
+        """Peeks files in parallel, files that can not be read map to None instead of failing the whole batch."""
+        def peek(filename):
+            try:
+                return UDM.peek(filename, fallback)
+            except (OSError, ValueError):
+                return None
+
+        filenames = list(filenames)
+        with ThreadPoolExecutor(max_workers) as executor:
+            return dict(zip(filenames, executor.map(peek, filenames)))
+
     def save(self, filename: Union[str, Path], binary: bool = True, ascii_flags: int = 0) -> bool:
         if binary and ascii_flags:
             raise RuntimeError(f'Ascii flags are not supposed to be used when binary mode is chosen')
-        if binary:
-            return wrapper.udm_save_binary(self._udm_data, Path(filename).as_posix().encode('utf8'))
+        with self._lock.read():
+            generation = write_generation(self)
+            if binary:
+                res = wrapper.udm_save_binary(self._udm_data, Path(filename).as_posix().encode('utf8'))
+            else:
+                res = wrapper.udm_save_ascii(self._udm_data, Path(filename).as_posix().encode('utf8'), ascii_flags)
+        if res:
+            self._clean_generation = generation
+            self._saved_path = Path(filename)
+        return res
+
+    @property
+    def lock(self) -> RWLock:
+        """Reader/writer lock of this document.
+
+        Property reads hold the read side, so any number of threads may traverse one document at once. Writes made
+        through ElementProperty assignment, `from_python` and `destroy` hold the write side. Code calling the `writer`
+        helpers with raw handles must hold `lock.write()` itself and pass the document as their `udm` argument.
+        """
+        return self._lock
+
+    @contextmanager
+    def transaction(self) -> Iterator[Transaction]:
+        """Holds the write lock and buffers ElementProperty and ValueArrayProperty assignments until the block ends.
+
+        The buffered writes are applied when the block exits normally and dropped when it raises. Nested transactions
+        join the outermost one.
+        """
+        with self._lock.write():
+            if self._transaction is not None:
+                yield self._transaction
+                return
+            transaction = self._transaction = Transaction(self)
+            try:
+                yield transaction
+            except BaseException:
+                transaction.discard()
+                raise
+            else:
+                transaction.flush()
+            finally:
+                self._transaction = None
+
+    def _prefetched_value(self, path: str) -> Optional[PropertyValue]:
+        if not self._prefetched:
+            return None
+        if self._prefetched_generation != write_generation(self):
+            self._prefetched = {}
+            return None
+        entry = self._prefetched.get(path)
+        if entry is None:
+            return None
+        if self._recorder is not None:
+            self._recorder.record_path(path, entry[1])
+        return entry[0]
+
+    def _fingerprint_memo(self) -> Dict[str, bytes]:
+        generation = write_generation(self)
+        if self._fingerprints_generation != generation:
+            self._fingerprints = {}
+            self._fingerprints_generation = generation
+        return self._fingerprints
+
+    @contextmanager
+    def record(self) -> Iterator[AccessRecorder]:
+        """Records every property looked up and every array range read from this document inside the block.
+
+        `recorder.plan()` returns the AccessPlan that `prefetch_plan` replays on later runs.
+        """
+        if not self._udm_data:
+            raise UDMNotLoaded("UDM file wasn't loaded")
+        recorder = self._recorder = AccessRecorder(self.asset_type, wrapper.udm_get_root_property(self._udm_data))
+        try:
+            yield recorder
+        finally:
+            self._recorder = None
+
+    def prefetch_plan(self, plan: AccessPlan, max_workers: Optional[int] = None) -> ReplayResult:
+        """Prefetches every property of a recorded plan, paths missing from this document are returned as skipped."""
+        values = self.prefetch(plan.paths, max_workers, ignore_missing=True)
+        return ReplayResult(values, [path for path in plan.paths if path not in values])
+
+    def prefetch(self, paths: Iterable[str], max_workers: Optional[int] = None,
+                 ignore_missing: bool = False) -> Dict[str, PropertyValue]:
+        """Reads and decompresses many array and blob properties at once on a thread pool.
+
+        The filled property objects are kept by the document, later lookups of the same paths through `udm[path]` or
+        ElementProperty indexing return them without a native lookup or read until the next write to the document.
+        Elements are prefetched with their children enumerated. A thread already holding the document lock, for example
+        inside `transaction()`, prefetches on its own: pool threads would wait for that lock forever.
+        """
+        if not self._udm_data:
+            raise UDMNotLoaded("UDM file wasn't loaded")
+        paths = list(paths)
+        root_p = wrapper.udm_get_root_property(self._udm_data)
+        generation = write_generation(self)
+
+        def fetch(path: str):
+            with self._lock.read():
+                prop_p = wrapper.udm_get_property(root_p, path.encode('utf8'))
+                if prop_p is None or prop_p == 0:
+                    if ignore_missing:
+                        return None, None
+                    raise IndexError(f'UDM document does not have "{path}" property')
+                udm_type = wrapper.udm_get_property_type(prop_p, wrapper.nullptr)
+                value = _unwrap_property(prop_p, self, udm_type)
+                if isinstance(value, (ValueArrayProperty, StructArrayProperty)):
+                    value.to_python()
+                elif isinstance(value, ElementProperty):
+                    value.children()
+            return prop_p, (value, udm_type)
+
+        if self._lock.held():
+            fetched: List = [fetch(path) for path in paths]
         else:
-            return wrapper.udm_save_ascii(self._udm_data, Path(filename).as_posix().encode('utf8'), ascii_flags)
+            with ThreadPoolExecutor(max_workers) as executor:
+                fetched = list(executor.map(fetch, paths))
+        # Anything written meanwhile may have changed what was read, the values are returned but not kept
+        if generation == write_generation(self):
+            if self._prefetched_generation != generation:
+                self._prefetched = {}
+                self._prefetched_generation = generation
+            self._prefetched.update((_join_path(path), entry) for path, (prop_p, entry) in zip(paths, fetched)
+                                    if prop_p is not None and entry[0] is not None)
+        return {path: entry[0] for path, (prop_p, entry) in zip(paths, fetched) if prop_p is not None}
+
+    @property
+    def dirty(self) -> bool:
+        """True when the document was never saved or loaded, or anything was written to it since."""
+        return self._clean_generation != write_generation(self)
+
+    def mark_dirty(self):
+        self._clean_generation = None
+
+    def _save_atomic(self, filename: Path, binary: bool, ascii_flags: int, generation: int) -> bool:
+        def write(temp_filename: Path) -> bool:
+            with self._lock.read():
+                if binary:
+                    return wrapper.udm_save_binary(self._udm_data, temp_filename.as_posix().encode('utf8'))
+                return wrapper.udm_save_ascii(self._udm_data, temp_filename.as_posix().encode('utf8'), ascii_flags)
+
+        if not write_atomic(filename, write, fsync=True):
+            raise RuntimeError(f'Failed to save {filename}')
+        self._clean_generation = generation
+        self._saved_path = filename
+        return True
+
+    def save_async(self, filename: Union[str, Path], binary: bool = True, ascii_flags: int = 0,
+                   force: bool = False) -> Future:
+        """Saves on a background thread through a temporary file that is fsynced and atomically renamed.
+
+        The future resolves to True once saved, or is already resolved to False when the document is not dirty and
+        was last saved to (or loaded from) `filename`. Use `asyncio.wrap_future` to await it. The save holds the
+        read side of the document lock, writes wait for it to finish. Raises RuntimeError inside a transaction or
+        `lock.write()`, waiting there for the future would deadlock. Waiting on it under `lock.read()` can deadlock
+        against a queued writer too.
+        """
+        if self._lock.held_write():
+            raise RuntimeError('save_async would deadlock while the calling thread holds the document write lock')
+        if binary and ascii_flags:
+            raise RuntimeError(f'Ascii flags are not supposed to be used when binary mode is chosen')
+        if not self._udm_data:
+            raise UDMNotLoaded("UDM file wasn't loaded")
+        filename = Path(filename)
+        if not force and not self.dirty and self._saved_path == filename:
+            future = Future()
+            future.set_result(False)
+            return future
+        future = _get_save_executor().submit(self._save_atomic, filename, binary, ascii_flags,
+                                                write_generation(self))
+        self._pending_save = future
+        return future
+
+    def __getstate__(self):
+        # Documents are pickled as their binary serialization, the native save/load only work on files
+        if not self._udm_data:
+            return {'data': None}
+        fd, filename = tempfile.mkstemp(suffix='.udm_b')
+        os.close(fd)
+        try:
+            with self._lock.read():
+                saved = wrapper.udm_save_binary(self._udm_data, Path(filename).as_posix().encode('utf8'))
+            if not saved:
+                raise RuntimeError('Failed to serialize UDM document')
+            return {'data': Path(filename).read_bytes()}
+        finally:
+            os.unlink(filename)
+
+    def __setstate__(self, state):
+        self.__init__()
+        if state['data'] is None:
+            return
+        fd, filename = tempfile.mkstemp(suffix='.udm_b')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(state['data'])
+            if not self.load(filename):
+                raise RuntimeError('Failed to deserialize UDM document')
+            self._saved_path = None
+        finally:
+            os.unlink(filename)
 
     def destroy(self) -> None:
         if not self._udm_data or self._udm_data.value == 0:
             return
-        wrapper.udm_destroy_function(self._udm_data)
-        self._udm_data.value = 0
+        if self._pending_save is not None:
+            wait([self._pending_save])
+            self._pending_save = None
+        with self._lock.write():
+            wrapper.udm_destroy_function(self._udm_data)
+            self._udm_data.value = 0
+            self._clear_caches()
 
     def __del__(self):
         if self._udm_data.value != 0:
@@ -46,6 +350,10 @@ class UDM:
             self._udm_data.value = 0
 
     def __getitem__(self, key):
+        if isinstance(key, str):
+            value = self._prefetched_value(_join_path(key))
+            if value is not None:
+                return value
         root = self.root
         if root is None:
             raise UDMNotLoaded("UDM file wasn't loaded")
@@ -55,7 +363,7 @@ class UDM:
     def root(self) -> Optional[ElementProperty]:
         if not self._udm_data:
             return None
-        return ElementProperty(wrapper.udm_get_root_property(self._udm_data))
+        return ElementProperty(wrapper.udm_get_root_property(self._udm_data), self)
 
     @property
     def asset_type(self):
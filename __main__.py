@@ -0,0 +1,93 @@
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from .convert import ConvertResult, ConvertStats, collect_jobs, convert_tree
+
+
+def _convert(args) -> int:
+    if args.to == 'binary' and args.ascii_flags:
+        print('--ascii-flags can only be used together with --to ascii', file=sys.stderr)
+        return 2
+    jobs = collect_jobs(args.source, args.target, args.pattern, args.suffix, args.to == 'binary', args.ascii_flags,
+                        args.force)
+
+    def report(result: ConvertResult, stats: ConvertStats):
+        if result.error is not None:
+            print(f'FAILED {result.source}: {result.error}', file=sys.stderr)
+        elif args.verbose and not result.skipped:
+            print(f'{result.source} -> {result.target}', file=sys.stderr)
+
+    stats = convert_tree(jobs, args.jobs, report)
+    print(f'Converted {stats.converted}, skipped {stats.skipped}, failed {stats.failed} of {len(jobs)} files '
+          f'in {stats.seconds:.2f}s ({stats.files_per_second:.1f} files/s, {stats.megabytes_per_second:.1f} MB/s)',
+          file=sys.stderr)
+    return 1 if stats.failed else 0
+
+
+def _bundle(args) -> int:
+    from .bundle import append_bundle, build_bundle
+
+    if args.source.is_file():
+        files, root = [args.source], args.source.parent
+    else:
+        files, root = [path for path in sorted(args.source.rglob(args.pattern)) if path.is_file()], args.source
+    if args.append:
+        append_bundle(args.bundle, files, root, args.jobs)
+    else:
+        build_bundle(args.bundle, files, root, args.jobs)
+    print(f'Bundled {len(files)} files into {args.bundle}', file=sys.stderr)
+    return 0
+
+
+def _delegate(command: str, argv: List[str]) -> int:
+    if command == 'schema':
+        from .schema import main
+    elif command == 'profile':
+        from .profiler import main
+    else:
+        from .materials import main
+    return main(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    # These commands own their argument parsers, forward everything after the command name
+    if argv and argv[0] in ('schema', 'materials', 'profile'):
+        return _delegate(argv[0], argv[1:])
+
+    parser = argparse.ArgumentParser(prog='python -m pragma_udm_wrapper')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = subparsers.add_parser('convert', help='Convert UDM files between binary and ASCII formats')
+    convert_parser.add_argument('source', type=Path, help='Source file or directory')
+    convert_parser.add_argument('target', type=Path, help='Target file or directory')
+    convert_parser.add_argument('--to', choices=('binary', 'ascii'), default='binary')
+    convert_parser.add_argument('--pattern', default='*', help='Glob pattern used for source directories')
+    convert_parser.add_argument('--suffix', default=None, help='Replace the suffix of converted files')
+    convert_parser.add_argument('--ascii-flags', type=int, default=0)
+    convert_parser.add_argument('-j', '--jobs', type=int, default=None)
+    convert_parser.add_argument('-f', '--force', action='store_true', help='Convert files that are up to date')
+    convert_parser.add_argument('-v', '--verbose', action='store_true')
+    convert_parser.set_defaults(handler=_convert)
+
+    bundle_parser = subparsers.add_parser('bundle', help='Pack UDM files into an indexed bundle')
+    bundle_parser.add_argument('bundle', type=Path, help='Bundle file to create or append to')
+    bundle_parser.add_argument('source', type=Path, help='Source file or directory')
+    bundle_parser.add_argument('--pattern', default='*', help='Glob pattern used for source directories')
+    bundle_parser.add_argument('-a', '--append', action='store_true', help='Add to an existing bundle')
+    bundle_parser.add_argument('-j', '--jobs', type=int, default=None)
+    bundle_parser.set_defaults(handler=_bundle)
+
+    for name, description in (('schema', 'Infer the schema of UDM assets and generate typed loaders'),
+                              ('materials', 'Build a texture -> material dependency graph'),
+                              ('profile', 'Report which subtrees of a document take the most space')):
+        subparsers.add_parser(name, help=description, add_help=False)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from . import UDM
+from .fileutil import chunk_size, write_atomic
+from .header import BINARY_IDENTIFIER
+
+BUNDLE_IDENTIFIER = b'UDMBNDL\0'
+BUNDLE_VERSION = 1
+# identifier, version, reserved, index offset, index size
+_HEADER = struct.Struct('<8sIIQQ')
+
+
+class BundleEntry(NamedTuple):
+    offset: int
+    size: int
+
+
+def _binary_bytes(path: str) -> bytes:
+    """Returns the binary serialization of a UDM file, binary files are copied without being parsed."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data.startswith(BINARY_IDENTIFIER):
+        return data
+    udm = UDM()
+    fd, temp_filename = tempfile.mkstemp(suffix='.udm_b')
+    os.close(fd)
+    try:
+        if not udm.load(path):
+            raise ValueError(f'Failed to load {path}')
+        if not udm.save(temp_filename):
+            raise ValueError(f'Failed to save binary copy of {path}')
+        return Path(temp_filename).read_bytes()
+    finally:
+        udm.destroy()
+        os.unlink(temp_filename)
+
+
+def _read_index(f) -> Tuple[int, Dict[str, BundleEntry]]:
+    header = f.read(_HEADER.size)
+    if len(header) != _HEADER.size:
+        raise ValueError('Not a UDM bundle: file is too small')
+    identifier, version, _, index_offset, index_size = _HEADER.unpack(header)
+    if identifier != BUNDLE_IDENTIFIER:
+        raise ValueError('Not a UDM bundle')
+    if version != BUNDLE_VERSION:
+        raise ValueError(f'Unsupported UDM bundle version {version}')
+    f.seek(index_offset)
+    index = json.loads(f.read(index_size).decode('utf8'))
+    return index_offset + index_size, {name: BundleEntry(*entry) for name, entry in index.items()}
+
+
+def _write_entries(f, end: int, index: Dict[str, BundleEntry], files: List[Tuple[str, Path]],
+                   max_workers: Optional[int]):
+    """Serializes `files` in parallel and writes them after `end`, followed by the index, then points the header at it.
+
+    The header is written last, an interrupted write leaves the previous index in place.
+    """
+    f.seek(end)
+    if files:
+        with ProcessPoolExecutor(max_workers) as executor:
+            sources = [path.as_posix() for _, path in files]
+            chunks = chunk_size(len(files), max_workers)
+            for (name, _), data in zip(files, executor.map(_binary_bytes, sources, chunksize=chunks)):
+                index[name] = BundleEntry(end, len(data))
+                f.write(data)
+                end += len(data)
+    index_data = json.dumps({name: list(entry) for name, entry in index.items()}, separators=(',', ':')).encode('utf8')
+    f.write(index_data)
+    f.flush()
+    os.fsync(f.fileno())
+    f.seek(0)
+    f.write(_HEADER.pack(BUNDLE_IDENTIFIER, BUNDLE_VERSION, 0, end, len(index_data)))
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _bundle_files(files: Iterable[Union[str, Path]], root: Optional[Union[str, Path]]) -> List[Tuple[str, Path]]:
+    res = []
+    sources: Dict[str, Path] = {}
+    for path in files:
+        path = Path(path)
+        name = (path.relative_to(root) if root is not None else Path(path.name)).as_posix()
+        if name in sources:
+            hint = '' if root is not None else ', pass a root to name entries by their relative path'
+            raise ValueError(f'{sources[name]} and {path} map to the same bundle entry {name!r}{hint}')
+        sources[name] = path
+        res.append((name, path))
+    return res
+
+
+def build_bundle(filename: Union[str, Path], files: Iterable[Union[str, Path]], root: Optional[Union[str, Path]] = None,
+                 max_workers: Optional[int] = None):
+    """Packs the binary serialization of every file into a new bundle, replacing `filename` atomically.
+
+    Entries are named by their path relative to `root`, or by file name when no root is given. Files mapping to the
+    same name raise a ValueError.
+    """
+    entries = _bundle_files(files, root)
+
+    def write(temp_filename: Path) -> bool:
+        with open(temp_filename, 'wb') as f:
+            f.write(_HEADER.pack(BUNDLE_IDENTIFIER, BUNDLE_VERSION, 0, 0, 0))
+            _write_entries(f, _HEADER.size, {}, entries, max_workers)
+        return True
+
+    write_atomic(Path(filename), write)
+
+
+def append_bundle(filename: Union[str, Path], files: Iterable[Union[str, Path]],
+                  root: Optional[Union[str, Path]] = None, max_workers: Optional[int] = None):
+    """Adds files to an existing bundle, entries with an existing name replace the old ones."""
+    with open(filename, 'r+b') as f:
+        end, index = _read_index(f)
+        _write_entries(f, end, index, _bundle_files(files, root), max_workers)
+
+
+class UdmBundle:
+    """Read access to a bundle built with `build_bundle`, the file is memory mapped and entries are sliced out of it."""
+
+    def __init__(self, filename: Union[str, Path]):
+        self.filename = Path(filename)
+        with open(self.filename, 'rb') as f:
+            _, self._index = _read_index(f)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self) -> 'UdmBundle':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def names(self) -> List[str]:
+        return list(self._index)
+
+    def entry(self, name: str) -> BundleEntry:
+        entry = self._index.get(name)
+        if entry is None:
+            raise KeyError(f'{name!r} is not in bundle {self.filename}')
+        return entry
+
+    def read_bytes(self, name: str) -> memoryview:
+        """Zero-copy view of the binary serialization of one entry."""
+        offset, size = self.entry(name)
+        return memoryview(self._mmap)[offset:offset + size]
+
+    def load(self, name: str) -> UDM:
+        """Loads one entry as a document.
+
+        The native library only loads from paths. Only on Linux the entry is handed over through an in-memory file
+        without extracting it, other platforms, Windows included, always write it to a temporary file first.
+        """
+        data = self.read_bytes(name)
+        udm = UDM()
+        if hasattr(os, 'memfd_create') and sys.platform.startswith('linux'):
+            fd = os.memfd_create(f'udm_bundle_{Path(name).name}')
+            try:
+                with open(fd, 'wb', closefd=False) as f:
+                    f.write(data)
+                loaded = udm.load(f'/proc/self/fd/{fd}')
+            finally:
+                os.close(fd)
+        else:
+            fd, temp_filename = tempfile.mkstemp(suffix='.udm_b')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                loaded = udm.load(temp_filename)
+            finally:
+                os.unlink(temp_filename)
+        data.release()
+        if not loaded:
+            raise ValueError(f'Failed to load {name!r} from bundle {self.filename}')
+        # The path it was loaded from is gone, the document has no file of its own to be saved back to
+        udm._saved_path = None
+        return udm
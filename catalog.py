@@ -0,0 +1,170 @@
+import json
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import UDM
+from .fileutil import chunk_size
+from .iproperty import IProperty
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS assets (
+    path TEXT PRIMARY KEY,
+    asset_type TEXT,
+    asset_version INTEGER,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    error TEXT,
+    key_paths TEXT NOT NULL DEFAULT '[]'
+);
+CREATE TABLE IF NOT EXISTS asset_keys (
+    path TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (path, key)
+);
+CREATE INDEX IF NOT EXISTS asset_type_index ON assets (asset_type);
+CREATE INDEX IF NOT EXISTS asset_keys_value_index ON asset_keys (value);
+'''
+
+_ENTRY_COLUMNS = 'path, asset_type, asset_version, mtime_ns, size, error'
+
+
+class CatalogEntry(NamedTuple):
+    path: str
+    asset_type: Optional[str]
+    asset_version: Optional[int]
+    mtime_ns: int
+    size: int
+    error: Optional[str]
+
+
+class ScanResult(NamedTuple):
+    indexed: int
+    unchanged: int
+    removed: int
+    failed: int
+
+
+def _encode_value(value: Any) -> Optional[str]:
+    if isinstance(value, IProperty):
+        value = value.to_python()
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bytes):
+        return value.hex()
+    return json.dumps(value, default=lambda o: o.tolist() if isinstance(o, np.ndarray) else str(o))
+
+
+def _index_file(path: str, mtime_ns: int, size: int, key_paths: Sequence[str]):
+    udm = UDM()
+    try:
+        if not udm.load(path):
+            return CatalogEntry(path, None, None, mtime_ns, size, 'Failed to load'), []
+        keys = []
+        root = udm.root
+        for pattern in key_paths:
+            keys.extend((key, _encode_value(value)) for key, value in root.glob(pattern))
+        return CatalogEntry(path, udm.asset_type, udm.asset_version, mtime_ns, size, None), keys
+    except Exception as ex:
+        return CatalogEntry(path, None, None, mtime_ns, size, f'{type(ex).__name__}: {ex}'), []
+    finally:
+        udm.destroy()
+
+
+def _index_file_args(args):
+    return _index_file(*args)
+
+
+class AssetCatalog:
+    """SQLite backed index of UDM assets, only files with a changed mtime or size are parsed again on rescans.
+
+    Every entry records the key paths it was indexed with, opening the catalog with different `key_paths` keeps the
+    stored entries and re-indexes them on their next `scan()`.
+    """
+
+    def __init__(self, database: Union[str, Path], key_paths: Sequence[str] = ()):
+        self._connection = sqlite3.connect(str(database))
+        self._connection.executescript(_SCHEMA)
+        columns = {row[1] for row in self._connection.execute('PRAGMA table_info(assets)')}
+        if 'key_paths' not in columns:
+            # Catalogs written before key paths were stored per entry, their entries are re-indexed on the next scan
+            with self._connection:
+                self._connection.execute("ALTER TABLE assets ADD COLUMN key_paths TEXT NOT NULL DEFAULT 'null'")
+        self.key_paths = tuple(key_paths)
+        self._encoded_key_paths = json.dumps(self.key_paths)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def scan(self, root: Union[str, Path], patterns: Iterable[str] = ('*',),
+             max_workers: Optional[int] = None) -> ScanResult:
+        root = Path(root).resolve()
+        files: Dict[str, Tuple[int, int]] = {}
+        for pattern in patterns:
+            for path in root.rglob(pattern):
+                if path.is_file():
+                    stat = path.stat()
+                    files[path.as_posix()] = (stat.st_mtime_ns, stat.st_size)
+
+        known = {path: (mtime_ns, size, key_paths) for path, mtime_ns, size, key_paths in
+                 self._connection.execute('SELECT path, mtime_ns, size, key_paths FROM assets '
+                                          'WHERE path >= ? AND path < ?',
+                                          (root.as_posix() + '/', root.as_posix() + '0'))}
+        removed = [path for path in known if path not in files]
+        stale = [(path, mtime_ns, size, self.key_paths) for path, (mtime_ns, size) in files.items()
+                 if known.get(path) != (mtime_ns, size, self._encoded_key_paths)]
+
+        failed = 0
+        with self._connection:
+            for path in removed:
+                self._remove(path)
+            if stale:
+                with ProcessPoolExecutor(max_workers) as executor:
+                    chunks = chunk_size(len(stale), max_workers)
+                    for entry, keys in executor.map(_index_file_args, stale, chunksize=chunks):
+                        self._remove(entry.path)
+                        self._connection.execute('INSERT INTO assets VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                                 (*entry, self._encoded_key_paths))
+                        self._connection.executemany('INSERT OR REPLACE INTO asset_keys VALUES (?, ?, ?)',
+                                                     [(entry.path, key, value) for key, value in keys])
+                        failed += entry.error is not None
+        return ScanResult(len(stale), len(files) - len(stale), len(removed), failed)
+
+    def _remove(self, path: str):
+        self._connection.execute('DELETE FROM assets WHERE path = ?', (path,))
+        self._connection.execute('DELETE FROM asset_keys WHERE path = ?', (path,))
+
+    def get(self, path: Union[str, Path]) -> Optional[CatalogEntry]:
+        row = self._connection.execute(f'SELECT {_ENTRY_COLUMNS} FROM assets WHERE path = ?',
+                                       (Path(path).resolve().as_posix(),))
+        row = row.fetchone()
+        return CatalogEntry(*row) if row is not None else None
+
+    def assets(self, asset_type: Optional[str] = None) -> List[CatalogEntry]:
+        if asset_type is None:
+            rows = self._connection.execute(f'SELECT {_ENTRY_COLUMNS} FROM assets ORDER BY path')
+        else:
+            rows = self._connection.execute(f'SELECT {_ENTRY_COLUMNS} FROM assets WHERE asset_type = ? ORDER BY path',
+                                            (asset_type,))
+        return [CatalogEntry(*row) for row in rows]
+
+    def keys(self, path: Union[str, Path]) -> Dict[str, Optional[str]]:
+        rows = self._connection.execute('SELECT key, value FROM asset_keys WHERE path = ?',
+                                        (Path(path).resolve().as_posix(),))
+        return dict(rows.fetchall())
+
+    def find_by_value(self, value: str, key_pattern: str = '*') -> List[Tuple[str, str]]:
+        """Returns (path, key) of every asset that stores `value` under a key matching `key_pattern`."""
+        rows = self._connection.execute('SELECT path, key FROM asset_keys WHERE value = ? AND key GLOB ?',
+                                        (value, key_pattern))
+        return rows.fetchall()
@@ -0,0 +1,97 @@
+"""LZ4 compression of large payloads in parallel chunks.
+
+The engine does not read this layout. `ElementProperty.set_blob(..., chunked=True)` stores it as an element with an
+'encoding' string child set to `ENCODING` and the payload in a 'data' Blob child, plain blobs are never decoded.
+"""
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+try:
+    import lz4.block
+except ImportError:
+    lz4 = None
+
+CHUNKED_IDENTIFIER = b'UDMLZ4C\0'
+# Value of the 'encoding' child that marks an element holding a chunked payload
+ENCODING = 'chunked_lz4/1'
+CHUNK_SIZE = 4 * 1024 * 1024
+# identifier, version, chunk count, chunk size, uncompressed size
+_HEADER = struct.Struct('<8sIIQQ')
+_CHUNK_SIZES = 'Q'
+
+
+def available() -> bool:
+    return lz4 is not None
+
+
+def is_chunked(data) -> bool:
+    """Checks the header and that the chunk size table accounts for the whole payload."""
+    view = memoryview(data).cast('B')
+    if len(view) < _HEADER.size:
+        return False
+    identifier, version, chunk_count, chunk_size, size = _HEADER.unpack_from(view)
+    if identifier != CHUNKED_IDENTIFIER or version != 1 or not chunk_size:
+        return False
+    if chunk_count != (size + chunk_size - 1) // chunk_size:
+        return False
+    table_size = struct.calcsize(f'<{chunk_count}{_CHUNK_SIZES}')
+    if len(view) < _HEADER.size + table_size:
+        return False
+    sizes = struct.unpack_from(f'<{chunk_count}{_CHUNK_SIZES}', view, _HEADER.size)
+    return _HEADER.size + table_size + sum(sizes) == len(view)
+
+
+def chunked_size(data) -> int:
+    """Uncompressed size of a chunked payload, read from its header."""
+    return _HEADER.unpack_from(memoryview(data).cast('B'))[4]
+
+
+def _compress_chunk(chunk: memoryview) -> bytes:
+    return lz4.block.compress(chunk, store_size=False)
+
+
+def compress(data, chunk_size: int = CHUNK_SIZE, max_workers: Optional[int] = None) -> bytearray:
+    """Splits `data` into chunks and LZ4-compresses them on a thread pool, lz4 releases the GIL while compressing.
+
+    The result is the header, a table of compressed chunk sizes and the chunks in order.
+    """
+    if lz4 is None:
+        raise RuntimeError('Chunked LZ4 compression requires the lz4 package')
+    view = memoryview(data).cast('B')
+    chunks = [view[start:start + chunk_size] for start in range(0, len(view), chunk_size)]
+    with ThreadPoolExecutor(max_workers) as executor:
+        compressed = list(executor.map(_compress_chunk, chunks))
+    res = bytearray(_HEADER.pack(CHUNKED_IDENTIFIER, 1, len(compressed), chunk_size, len(view)))
+    res += struct.pack(f'<{len(compressed)}{_CHUNK_SIZES}', *(len(chunk) for chunk in compressed))
+    for chunk in compressed:
+        res += chunk
+    return res
+
+
+def decompress(data, max_workers: Optional[int] = None) -> bytearray:
+    """Reverses `compress`, chunks are decompressed in parallel straight into the result buffer."""
+    if lz4 is None:
+        raise RuntimeError('Chunked LZ4 decompression requires the lz4 package')
+    view = memoryview(data).cast('B')
+    identifier, version, chunk_count, chunk_size, size = _HEADER.unpack_from(view)
+    if not is_chunked(view):
+        raise ValueError('Not a chunked LZ4 blob')
+    sizes = struct.unpack_from(f'<{chunk_count}{_CHUNK_SIZES}', view, _HEADER.size)
+    res = bytearray(size)
+    out = memoryview(res)
+    offset = _HEADER.size + struct.calcsize(f'<{chunk_count}{_CHUNK_SIZES}')
+
+    jobs = []
+    for index, compressed_size in enumerate(sizes):
+        start = index * chunk_size
+        jobs.append((view[offset:offset + compressed_size], start, min(chunk_size, size - start)))
+        offset += compressed_size
+
+    def decompress_chunk(job):
+        chunk, start, uncompressed_size = job
+        out[start:start + uncompressed_size] = lz4.block.decompress(chunk, uncompressed_size=uncompressed_size)
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        list(executor.map(decompress_chunk, jobs))
+    return res
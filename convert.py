@@ -0,0 +1,111 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from . import UDM
+from .fileutil import chunk_size, write_atomic
+from .header import BINARY_IDENTIFIER
+
+
+class ConvertResult(NamedTuple):
+    source: str
+    target: str
+    bytes_read: int
+    skipped: bool
+    error: Optional[str]
+
+
+@dataclass
+class ConvertStats:
+    converted: int = 0
+    skipped: int = 0
+    failed: int = 0
+    bytes_read: int = 0
+    seconds: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def files_per_second(self) -> float:
+        return self.converted / self.seconds if self.seconds else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes_read / (1024 * 1024) / self.seconds if self.seconds else 0.0
+
+
+def _is_up_to_date(source: Path, target: Path, binary: bool) -> bool:
+    try:
+        if target.stat().st_mtime_ns < source.stat().st_mtime_ns:
+            return False
+        with target.open('rb') as f:
+            return f.read(len(BINARY_IDENTIFIER)).startswith(BINARY_IDENTIFIER) == binary
+    except FileNotFoundError:
+        return False
+
+
+def convert_file(source: Union[str, Path], target: Union[str, Path], binary: bool = True, ascii_flags: int = 0,
+                 force: bool = False) -> ConvertResult:
+    """Converts one file, the target is written next to its final location and atomically renamed into place."""
+    source, target = Path(source), Path(target)
+    udm = UDM()
+    size = 0
+    try:
+        # Inside the try, a file removed after the jobs were collected only fails its own result
+        size = source.stat().st_size
+        if not force and _is_up_to_date(source, target, binary):
+            return ConvertResult(source.as_posix(), target.as_posix(), 0, True, None)
+        if not udm.load(source):
+            return ConvertResult(source.as_posix(), target.as_posix(), size, False, 'Failed to load')
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if not write_atomic(target, lambda temp_target: udm.save(temp_target, binary, ascii_flags)):
+            return ConvertResult(source.as_posix(), target.as_posix(), size, False, 'Failed to save')
+        return ConvertResult(source.as_posix(), target.as_posix(), size, False, None)
+    except Exception as ex:
+        return ConvertResult(source.as_posix(), target.as_posix(), size, False, f'{type(ex).__name__}: {ex}')
+    finally:
+        udm.destroy()
+
+
+def _convert_file_args(args):
+    return convert_file(*args)
+
+
+def collect_jobs(source: Path, target: Path, pattern: str = '*', suffix: Optional[str] = None,
+                 binary: bool = True, ascii_flags: int = 0,
+                 force: bool = False) -> List[Tuple[Path, Path, bool, int, bool]]:
+    """Maps every file under `source` matching `pattern` onto the mirrored path under `target`."""
+    if source.is_file():
+        files = [(source, target if target.suffix else target / source.name)]
+    else:
+        files = [(path, target / path.relative_to(source)) for path in sorted(source.rglob(pattern)) if path.is_file()]
+    jobs = []
+    for source_file, target_file in files:
+        if suffix is not None:
+            target_file = target_file.with_suffix(suffix)
+        jobs.append((source_file, target_file, binary, ascii_flags, force))
+    return jobs
+
+
+def convert_tree(jobs: List[Tuple[Path, Path, bool, int, bool]], max_workers: Optional[int] = None,
+                 progress: Optional[Callable[[ConvertResult, ConvertStats], None]] = None) -> ConvertStats:
+    stats = ConvertStats()
+    max_workers = max_workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers) as executor:
+        for result in executor.map(_convert_file_args, jobs, chunksize=chunk_size(len(jobs), max_workers)):
+            if result.skipped:
+                stats.skipped += 1
+            elif result.error is not None:
+                stats.failed += 1
+                stats.errors[result.source] = result.error
+            else:
+                stats.converted += 1
+                stats.bytes_read += result.bytes_read
+            stats.seconds = time.perf_counter() - start
+            if progress is not None:
+                progress(result, stats)
+    stats.seconds = time.perf_counter() - start
+    return stats
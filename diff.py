@@ -0,0 +1,111 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .hashing import hash_array_items, hash_element
+from .iproperty import IProperty
+from .properties import (
+    ArrayProperty, ElementProperty, PropertyValue, ValueArrayProperty, StructArrayProperty, _fingerprint_value,
+    _unwrap_property
+)
+from .type_info import UdmType
+
+
+class HashNode(NamedTuple):
+    digest: bytes
+    udm_type: UdmType
+    children: Optional[Dict[str, 'HashNode']]
+
+
+class DiffEntry(NamedTuple):
+    kind: str
+    path: str
+
+    def __repr__(self):
+        return f'<{self.kind} {self.path!r}>'
+
+
+def _children(value: PropertyValue) -> Optional[Dict[str, Tuple[PropertyValue, UdmType]]]:
+    if isinstance(value, ElementProperty):
+        children = value.children()
+        return {name: (_unwrap_property(prop_p, value.udm, child_type), child_type)
+                for name, child_type, prop_p in zip(children.names, children.types, children.handles)}
+    if isinstance(value, ArrayProperty) and not isinstance(value, (ValueArrayProperty, StructArrayProperty)):
+        array_type = value.array_type
+        return {str(index): (item, array_type) for index, item in enumerate(value)}
+    return None
+
+
+def hash_tree(value: PropertyValue, udm_type: Optional[UdmType] = None) -> HashNode:
+    """Builds the full content hash tree of a property, suitable for storing and diffing against later revisions.
+
+    Container digests are combined from the digests of their children, each node is hashed once. They match
+    `IProperty.fingerprint()`, value and struct arrays are leaves.
+    """
+    if isinstance(value, IProperty):
+        udm_type = value.type
+    children = _children(value)
+    if children is None:
+        return HashNode(_fingerprint_value(value, udm_type), udm_type, None)
+    nodes = {name: hash_tree(child, child_type) for name, (child, child_type) in children.items()}
+    if isinstance(value, ElementProperty):
+        digest = hash_element(udm_type, [(name, node.digest) for name, node in nodes.items()])
+    else:
+        digest = hash_array_items(udm_type, value.array_type, [node.digest for node in nodes.values()])
+    return HashNode(digest, udm_type, nodes)
+
+
+def diff_trees(old: HashNode, new: HashNode, path: str = '') -> List[DiffEntry]:
+    if old.digest == new.digest:
+        return []
+    if old.udm_type != new.udm_type or old.children is None or new.children is None:
+        return [DiffEntry('changed', path)]
+    result = []
+    prefix = f'{path}/' if path else ''
+    for name, old_child in old.children.items():
+        new_child = new.children.get(name)
+        if new_child is None:
+            result.append(DiffEntry('removed', prefix + name))
+        else:
+            result.extend(diff_trees(old_child, new_child, prefix + name))
+    for name in sorted(new.children.keys() - old.children.keys()):
+        result.append(DiffEntry('added', prefix + name))
+    if not result:
+        # Same children but different container digest, e.g. changed array element type
+        result.append(DiffEntry('changed', path))
+    return result
+
+
+def _diff_values(old: PropertyValue, old_type: UdmType, old_digest: bytes, new: PropertyValue, new_type: UdmType,
+                 new_digest: bytes, path: str, result: List[DiffEntry]):
+    # Digests are passed down from the parent, every node is fingerprinted once per descent
+    if old_type == new_type and old_digest == new_digest:
+        return
+    old_children = _children(old) if old_type == new_type else None
+    new_children = _children(new) if old_children is not None else None
+    if old_children is None or new_children is None:
+        result.append(DiffEntry('changed', path))
+        return
+    size = len(result)
+    prefix = f'{path}/' if path else ''
+    for name, (old_child, old_child_type) in old_children.items():
+        if name not in new_children:
+            result.append(DiffEntry('removed', prefix + name))
+        else:
+            new_child, new_child_type = new_children[name]
+            _diff_values(old_child, old_child_type, _fingerprint_value(old_child, old_child_type),
+                         new_child, new_child_type, _fingerprint_value(new_child, new_child_type),
+                         prefix + name, result)
+    for name in sorted(new_children.keys() - old_children.keys()):
+        result.append(DiffEntry('added', prefix + name))
+    if len(result) == size:
+        result.append(DiffEntry('changed', path))
+
+
+def diff(old: IProperty, new: IProperty) -> List[DiffEntry]:
+    """Returns the changed, added and removed paths between two properties.
+
+    Subtrees with equal fingerprints are skipped without descending into them. Fingerprints are memoized per document
+    until it is written to, diffing against a document that did not change since its last diff does not hash it again.
+    """
+    result = []
+    _diff_values(old, old.type, old.fingerprint(), new, new.type, new.fingerprint(), '', result)
+    return result
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, NamedTuple, Optional, Union
+
+import numpy as np
+
+from . import UDM, wrapper
+
+CACHE_FORMAT_VERSION = 1
+INLINE_ARRAY_LIMIT = 64
+MANIFEST_NAME = 'manifest.json'
+SIZE_NAME = 'size'
+
+
+class DecodedAsset(NamedTuple):
+    asset_type: Optional[str]
+    asset_version: Optional[int]
+    data: Any
+
+
+def _library_identity() -> str:
+    library_path = Path(getattr(wrapper._library, '_name', '') or '')
+    if library_path.is_file():
+        stat = library_path.stat()
+        return f'{library_path.name}:{stat.st_size}:{stat.st_mtime_ns}'
+    return library_path.name
+
+
+class _Encoder:
+    def __init__(self, directory: Path):
+        self._directory = directory
+        self.size = 0
+        self._count = 0
+
+    def _next_name(self, suffix: str) -> str:
+        self._count += 1
+        return f'{self._count}{suffix}'
+
+    def encode(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            return {'$element': {name: self.encode(item) for name, item in value.items()}}
+        if isinstance(value, list):
+            return [self.encode(item) for item in value]
+        if isinstance(value, bytes):
+            name = self._next_name('.bin')
+            (self._directory / name).write_bytes(value)
+            self.size += len(value)
+            return {'$bytes': name}
+        if isinstance(value, np.ndarray):
+            if value.dtype.fields is None and value.size <= INLINE_ARRAY_LIMIT:
+                return {'$array': value.tolist(), 'dtype': value.dtype.str, 'shape': value.shape}
+            name = self._next_name('.npy')
+            np.save(self._directory / name, value, allow_pickle=False)
+            self.size += value.nbytes
+            return {'$npy': name}
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+
+def _decode(directory: Path, value: Any, mmap_mode: Optional[str]) -> Any:
+    if isinstance(value, list):
+        return [_decode(directory, item, mmap_mode) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if '$element' in value:
+        return {name: _decode(directory, item, mmap_mode) for name, item in value['$element'].items()}
+    if '$npy' in value:
+        return np.load(directory / value['$npy'], mmap_mode=mmap_mode, allow_pickle=False)
+    if '$bytes' in value:
+        return (directory / value['$bytes']).read_bytes()
+    if '$array' in value:
+        return np.asarray(value['$array'], np.dtype(value['dtype'])).reshape(value['shape'])
+    raise ValueError(f'Unknown cache entry value {value!r}')
+
+
+class DecodedAssetCache:
+    """On-disk cache of materialized (`to_python`) UDM documents.
+
+    Entries are keyed by resolved path, mtime, size and the native library identity. Large arrays are stored as
+    .npy files and memory-mapped on a hit, so a warm load does not touch the native parser at all.
+    The cache is trimmed to `max_bytes` by evicting the least recently used entries.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = 4 * 1024 ** 3, mmap_mode: Optional[str] = 'r'):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.mmap_mode = mmap_mode
+        self.hits = 0
+        self.misses = 0
+        self._library = _library_identity()
+
+    def key(self, filename: Union[str, Path]) -> str:
+        filename = Path(filename).resolve()
+        stat = filename.stat()
+        identity = f'{filename.as_posix()}\0{stat.st_mtime_ns}\0{stat.st_size}\0{self._library}\0{CACHE_FORMAT_VERSION}'
+        return hashlib.sha1(identity.encode('utf8')).hexdigest()
+
+    def get(self, filename: Union[str, Path], key: Optional[str] = None) -> Optional[DecodedAsset]:
+        entry = self.directory / (key or self.key(filename))
+        manifest_path = entry / MANIFEST_NAME
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding='utf8'))
+        except (FileNotFoundError, ValueError):
+            return None
+        os.utime(manifest_path)
+        return DecodedAsset(manifest['asset_type'], manifest['asset_version'],
+                            _decode(entry, manifest['data'], self.mmap_mode))
+
+    def put(self, filename: Union[str, Path], asset: DecodedAsset, key: Optional[str] = None):
+        """Stores `asset` under `key`, by default the key of the file as it is now."""
+        if key is None:
+            key = self.key(filename)
+        entry = self.directory / key
+        if entry.exists():
+            return
+        temp_dir = Path(tempfile.mkdtemp(prefix=f'.{key}.', dir=self.directory))
+        try:
+            encoder = _Encoder(temp_dir)
+            manifest = {'asset_type': asset.asset_type, 'asset_version': asset.asset_version,
+                        'data': encoder.encode(asset.data)}
+            (temp_dir / MANIFEST_NAME).write_text(json.dumps(manifest), encoding='utf8')
+            (temp_dir / SIZE_NAME).write_text(str(encoder.size), encoding='utf8')
+            os.replace(temp_dir, entry)
+        except OSError:
+            # Another process published the same entry first
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            if not entry.exists():
+                raise
+        self.evict()
+
+    def load(self, filename: Union[str, Path]) -> DecodedAsset:
+        # Taken once before parsing, a file changed meanwhile must not store the old data under its new key
+        key = self.key(filename)
+        asset = self.get(filename, key)
+        if asset is not None:
+            self.hits += 1
+            return asset
+        self.misses += 1
+        udm = UDM()
+        if not udm.load(filename):
+            raise ValueError(f'Failed to load UDM file {filename}')
+        try:
+            asset = DecodedAsset(udm.asset_type, udm.asset_version, udm.root.to_python())
+        finally:
+            udm.destroy()
+        self.put(filename, asset, key)
+        return asset
+
+    def evict(self):
+        entries = []
+        total = 0
+        for entry in self.directory.iterdir():
+            manifest_path = entry / MANIFEST_NAME
+            try:
+                stat = manifest_path.stat()
+                size = int((entry / SIZE_NAME).read_text(encoding='utf8'))
+            except (OSError, ValueError):
+                continue
+            entries.append((stat.st_mtime_ns, size, entry))
+            total += size
+        entries.sort()
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        for entry in self.directory.iterdir():
+            shutil.rmtree(entry, ignore_errors=True)
@@ -0,0 +1,185 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, Union
+
+from . import UDM
+
+
+def estimate_native_size(udm: UDM, filename: Path) -> int:
+    """Default native size estimate, the size of the file on disk."""
+    return filename.stat().st_size
+
+
+class UDMCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    documents: int
+    total_bytes: int
+
+
+class _CacheEntry:
+    __slots__ = ('udm', 'size', 'leases')
+
+    def __init__(self, udm: UDM, size: int):
+        self.udm = udm
+        self.size = size
+        self.leases = 0
+
+
+class UDMCache:
+    """Keeps loaded documents by path and destroys the least recently used ones once `max_bytes` is exceeded.
+
+    Documents returned by `get` may be destroyed by any later eviction. Documents held through `lease`, or between
+    `acquire` and `release`, are pinned and never destroyed until their last lease is released.
+    """
+
+    def __init__(self, max_bytes: int, size_estimator: Callable[[UDM, Path], int] = estimate_native_size):
+        self.max_bytes = max_bytes
+        self._size_estimator = size_estimator
+        self._entries: 'OrderedDict[str, _CacheEntry]' = OrderedDict()
+        # Files being loaded, loads run outside the lock and other requests for the same file wait for them
+        self._loading: Dict[str, Future] = {}
+        self._lock = threading.RLock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(filename: Union[str, Path]) -> str:
+        return Path(filename).resolve().as_posix()
+
+    @staticmethod
+    def _is_pinned(entry: _CacheEntry) -> bool:
+        return entry.leases > 0
+
+    def _checkout(self, key: str, entry: _CacheEntry, leased: bool) -> UDM:
+        if leased:
+            entry.leases += 1
+        # The requested document is kept even when it alone exceeds the budget
+        self._evict(key)
+        return entry.udm
+
+    def _get(self, key: str, leased: bool) -> UDM:
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._checkout(key, entry, leased)
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = Future()
+                    self.misses += 1
+                    break
+            # Raises the error of a failed load, otherwise the document is looked up again
+            loading.result()
+
+        udm = UDM()
+        try:
+            if not udm.load(key):
+                raise ValueError(f'Failed to load UDM file {key}')
+            size = self._size_estimator(udm, Path(key))
+        except BaseException as ex:
+            udm.destroy()
+            with self._lock:
+                del self._loading[key]
+            loading.set_exception(ex)
+            raise
+        with self._lock:
+            del self._loading[key]
+            entry = self._entries[key] = _CacheEntry(udm, size)
+            self.total_bytes += entry.size
+            udm = self._checkout(key, entry, leased)
+        loading.set_result(None)
+        return udm
+
+    def get(self, filename: Union[str, Path]) -> UDM:
+        """Returns the document without pinning it.
+
+        Any later call on the cache, from any thread, may evict and destroy it while property wrappers of it are still
+        held. Only use it for short-lived access from a single thread, hold documents with `lease` or `acquire`
+        otherwise.
+        """
+        return self._get(self._key(filename), False)
+
+    def acquire(self, filename: Union[str, Path]) -> UDM:
+        """Returns the document and pins it until a matching `release`."""
+        return self._get(self._key(filename), True)
+
+    def release(self, filename: Union[str, Path]):
+        """Drops a lease taken by `acquire`, the document becomes evictable once its last lease is released."""
+        key = self._key(filename)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.leases == 0:
+                raise RuntimeError(f'UDM file {key} is not leased')
+            entry.leases -= 1
+            self._evict()
+
+    @contextmanager
+    def lease(self, filename: Union[str, Path]) -> Iterator[UDM]:
+        """Pins the document for the duration of the block."""
+        udm = self.acquire(filename)
+        try:
+            yield udm
+        finally:
+            self.release(filename)
+
+    def __getitem__(self, filename: Union[str, Path]) -> UDM:
+        return self.get(filename)
+
+    def __contains__(self, filename: Union[str, Path]) -> bool:
+        return self._key(filename) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, keep: Optional[str] = None):
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key in list(self._entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if key == keep or self._is_pinned(entry):
+                continue
+            self._remove(key)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry.size
+        entry.udm.destroy()
+
+    def discard(self, filename: Union[str, Path]) -> bool:
+        """Destroys a cached document if it is not leased, returns True if it was removed."""
+        key = self._key(filename)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._is_pinned(entry):
+                return False
+            self._remove(key)
+            return True
+
+    def trim(self, max_bytes: Optional[int] = None):
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        """Destroys every document that is not leased."""
+        with self._lock:
+            for key in list(self._entries):
+                if not self._is_pinned(self._entries[key]):
+                    self._remove(key)
+
+    @property
+    def stats(self) -> UDMCacheStats:
+        return UDMCacheStats(self.hits, self.misses, self.evictions, len(self._entries), self.total_bytes)
@@ -0,0 +1,152 @@
+import base64
+import json
+import math
+from pathlib import Path
+from typing import Optional, TextIO, Union
+
+import numpy as np
+
+from .iproperty import IProperty
+from .properties import ArrayProperty, ElementProperty, PropertyValue, StructArrayProperty, ValueArrayProperty
+
+ARRAY_MODES = ('inline', 'base64', 'npy')
+# Rows encoded per write, keeps the temporary text of huge arrays bounded
+CHUNK_ROWS = 16384
+
+
+def _json_safe(value):
+    """Replaces NaN and infinities, which JSON has no literals for, with the strings 'NaN', 'Infinity', '-Infinity'."""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return 'Infinity' if value > 0 else '-Infinity'
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    return value
+
+
+def _dumps(value) -> str:
+    try:
+        return json.dumps(value, separators=(',', ':'), allow_nan=False)
+    except ValueError:
+        # Only values holding non-finite floats take the slower path
+        return json.dumps(_json_safe(value), separators=(',', ':'), allow_nan=False)
+
+
+class _Exporter:
+    def __init__(self, fp: TextIO, arrays: str = 'inline', sidecar_dir: Optional[Union[str, Path]] = None):
+        if arrays not in ARRAY_MODES:
+            raise ValueError(f'Unknown array mode {arrays!r}, expected one of {ARRAY_MODES}')
+        if arrays == 'npy' and sidecar_dir is None:
+            raise ValueError('Array mode "npy" requires a sidecar directory')
+        self._fp = fp
+        self._arrays = arrays
+        self._sidecar_dir = Path(sidecar_dir) if sidecar_dir is not None else None
+        self._sidecar_count = 0
+        if self._sidecar_dir is not None:
+            self._sidecar_dir.mkdir(parents=True, exist_ok=True)
+
+    def _write_inline_array(self, array: np.ndarray):
+        write = self._fp.write
+        write('[')
+        for start in range(0, len(array), CHUNK_ROWS):
+            if start:
+                write(',')
+            write(_dumps(array[start:start + CHUNK_ROWS].tolist())[1:-1])
+        write(']')
+
+    def _write_base64_array(self, prop: ArrayProperty, array: np.ndarray):
+        write = self._fp.write
+        header = {'$type': prop.array_type.name, '$dtype': array.dtype.descr, '$shape': array.shape}
+        write(json.dumps(header, separators=(',', ':'))[:-1])
+        write(',"$base64":"')
+        data = memoryview(np.ascontiguousarray(array)).cast('B')
+        # Chunks are a multiple of 3 bytes so the encoded pieces concatenate without padding
+        chunk_size = 3 * 1024 * 1024
+        for start in range(0, len(data), chunk_size):
+            write(base64.b64encode(data[start:start + chunk_size]).decode('ascii'))
+        write('"}')
+
+    def _write_npy_array(self, prop: ArrayProperty, array: np.ndarray):
+        self._sidecar_count += 1
+        name = f'{self._sidecar_count}.npy'
+        np.save(self._sidecar_dir / name, array, allow_pickle=False)
+        self._fp.write(json.dumps({'$type': prop.array_type.name, '$npy': name}, separators=(',', ':')))
+
+    def write_array(self, prop: ArrayProperty):
+        array = prop.value()
+        if self._arrays == 'base64':
+            self._write_base64_array(prop, array)
+        elif self._arrays == 'npy':
+            self._write_npy_array(prop, array)
+        elif isinstance(prop, StructArrayProperty):
+            names = list(array.dtype.names)
+            self._fp.write(f'{{"$struct":{json.dumps(names)},"$rows":')
+            self._write_inline_array(array)
+            self._fp.write('}')
+        else:
+            self._write_inline_array(array)
+
+    def write_scalar(self, value: PropertyValue):
+        if isinstance(value, np.ndarray):
+            value = value.tolist()
+        elif isinstance(value, bytes):
+            value = {'$base64': base64.b64encode(value).decode('ascii')}
+        self._fp.write(_dumps(value))
+
+    def write(self, value: PropertyValue):
+        write = self._fp.write
+        if isinstance(value, ElementProperty):
+            write('{')
+            for index, (name, child) in enumerate(value.items()):
+                if index:
+                    write(',')
+                write(json.dumps(name))
+                write(':')
+                self.write(child)
+            write('}')
+        elif isinstance(value, (ValueArrayProperty, StructArrayProperty)):
+            self.write_array(value)
+        elif isinstance(value, ArrayProperty):
+            write('[')
+            for index, item in enumerate(value):
+                if index:
+                    write(',')
+                self.write(item)
+            write(']')
+        else:
+            self.write_scalar(value)
+
+    def write_records(self, value: PropertyValue, path: str):
+        if isinstance(value, ElementProperty):
+            prefix = f'{path}/' if path else ''
+            for name, child in value.items():
+                self.write_records(child, prefix + name)
+        elif isinstance(value, ArrayProperty) and not isinstance(value, (ValueArrayProperty, StructArrayProperty)):
+            for index, item in enumerate(value):
+                self.write_records(item, f'{path}/{index}')
+        else:
+            self._fp.write(f'{{"path":{json.dumps(path)},"value":')
+            self.write(value)
+            self._fp.write('}\n')
+
+
+def export_json(prop: IProperty, fp: TextIO, arrays: str = 'inline',
+                sidecar_dir: Optional[Union[str, Path]] = None):
+    """Streams `prop` as one JSON document into `fp` while walking the tree.
+
+    `arrays` selects how value and struct arrays are encoded: 'inline' JSON lists written in chunks, 'base64' of the
+    raw buffer, or 'npy' sidecar files written to `sidecar_dir` and referenced by name. NaN and infinite floats are
+    written as the strings "NaN", "Infinity" and "-Infinity", the output is always strict JSON.
+    """
+    _Exporter(fp, arrays, sidecar_dir).write(prop)
+
+
+def export_ndjson(prop: IProperty, fp: TextIO, arrays: str = 'inline',
+                  sidecar_dir: Optional[Union[str, Path]] = None):
+    """Streams one {"path", "value"} JSON record per leaf property of `prop`, one record per line."""
+    _Exporter(fp, arrays, sidecar_dir).write_records(prop, '')
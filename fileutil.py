@@ -0,0 +1,29 @@
+import os
+from pathlib import Path
+from typing import Callable, Optional
+
+
+def write_atomic(filename: Path, write: Callable[[Path], bool], fsync: bool = False) -> bool:
+    """Calls `write` with a temporary path next to `filename` and renames it into place when it returns True.
+
+    The temporary file is removed when `write` returns False or raises, `filename` is left untouched. With `fsync`
+    the temporary file is flushed to disk before the rename.
+    """
+    temp_filename = filename.with_name(f'.{filename.name}.{os.getpid()}.tmp')
+    try:
+        if not write(temp_filename):
+            return False
+        if fsync:
+            with open(temp_filename, 'rb+') as f:
+                os.fsync(f.fileno())
+        os.replace(temp_filename, filename)
+        return True
+    finally:
+        if temp_filename.exists():
+            temp_filename.unlink()
+
+
+def chunk_size(count: int, max_workers: Optional[int] = None, limit: int = 64) -> int:
+    """Chunk size for `executor.map` over `count` items, about four chunks per worker and at most `limit` items each."""
+    max_workers = max_workers or os.cpu_count() or 1
+    return max(1, min(limit, count // (max_workers * 4)))
@@ -0,0 +1,49 @@
+import hashlib
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from .type_info import UdmType
+
+DIGEST_SIZE = 16
+
+
+def new_hash(udm_type: UdmType):
+    return hashlib.blake2b(bytes((udm_type,)), digest_size=DIGEST_SIZE)
+
+
+def hash_scalar(udm_type: UdmType, value) -> bytes:
+    h = new_hash(udm_type)
+    if isinstance(value, str):
+        h.update(value.encode('utf8'))
+    elif isinstance(value, (bytes, np.ndarray)):
+        h.update(value)
+    elif value is not None:
+        h.update(repr(value).encode('ascii'))
+    return h.digest()
+
+
+def hash_array_buffer(udm_type: UdmType, array_type: UdmType, array: np.ndarray) -> bytes:
+    h = new_hash(udm_type)
+    h.update(bytes((array_type,)))
+    h.update(repr(array.dtype.descr).encode('ascii'))
+    h.update(np.ascontiguousarray(array))
+    return h.digest()
+
+
+def hash_element(udm_type: UdmType, children: Iterable[Tuple[str, bytes]]) -> bytes:
+    """Combines the digests of named children, independent of their order."""
+    h = new_hash(udm_type)
+    for name, digest in sorted(children):
+        h.update(name.encode('utf8'))
+        h.update(b'\0')
+        h.update(digest)
+    return h.digest()
+
+
+def hash_array_items(udm_type: UdmType, array_type: UdmType, digests: Iterable[bytes]) -> bytes:
+    h = new_hash(udm_type)
+    h.update(bytes((array_type,)))
+    for digest in digests:
+        h.update(digest)
+    return h.digest()
@@ -0,0 +1,61 @@
+import ctypes
+import re
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+from .wrapper import udm_free_memory, udm_read_header
+
+BINARY_IDENTIFIER = b'UDMB'
+HEADER_WINDOW = 64 * 1024
+
+_ASCII_ASSET_TYPE = re.compile(rb'(?:\$\w+\s+)?"?assetType"?\s+"([^"]*)"')
+_ASCII_ASSET_VERSION = re.compile(rb'(?:\$\w+\s+)?"?assetVersion"?\s+(\d+)')
+
+
+class UdmHeader(NamedTuple):
+    asset_type: Optional[str]
+    asset_version: Optional[int]
+    size: int
+    binary: bool
+
+
+def _read_binary_header(filename: Path):
+    version = ctypes.c_uint32(0)
+    asset_type = udm_read_header(str(filename).encode('utf8'), ctypes.byref(version))
+    if not asset_type:
+        return None, None
+    try:
+        return ctypes.string_at(asset_type).decode('utf8'), version.value
+    finally:
+        udm_free_memory(asset_type)
+
+
+def _sniff_ascii(data: bytes):
+    asset_type = None
+    asset_version = None
+    match = _ASCII_ASSET_TYPE.search(data)
+    if match is not None:
+        asset_type = match.group(1).decode('utf8', errors='replace')
+    match = _ASCII_ASSET_VERSION.search(data)
+    if match is not None:
+        asset_version = int(match.group(1))
+    return asset_type, asset_version
+
+
+def read_header(filename: Union[str, Path], window: int = HEADER_WINDOW) -> UdmHeader:
+    """Reads asset type and version of a UDM file without parsing the body.
+
+    Binary files are read by the native `udm_read_header`, ASCII files are searched for the assetType and
+    assetVersion keys in their first `window` bytes. Fields that can not be found are returned as None, `size` is
+    the size of the file on disk.
+    """
+    filename = Path(filename)
+    with filename.open('rb') as f:
+        data = f.read(window)
+        size = f.seek(0, 2)
+    binary = data.startswith(BINARY_IDENTIFIER)
+    if binary:
+        asset_type, asset_version = _read_binary_header(filename)
+    else:
+        asset_type, asset_version = _sniff_ascii(data)
+    return UdmHeader(asset_type, asset_version, size, binary)
@@ -1,20 +1,25 @@
 import abc
 import ctypes
+from contextlib import nullcontext
 from functools import cache
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
 from .wrapper import (
     udm_get_property_name, udm_get_property_path,
     udm_get_property_type,
 
-    UdmType, nullptr, udm_read_property_string, udm_property_to_ascii, udm_property_to_json
+    UdmType, nullptr, udm_read_property_string, udm_property_to_ascii, udm_property_to_json, udm_free_memory
 )
 
+if TYPE_CHECKING:
+    from . import UDM
 
 class IProperty(abc.ABC):
 
-    def __init__(self, prop_p: int):
+    def __init__(self, prop_p: int, udm: Optional['UDM'] = None):
         self._prop_p = ctypes.c_void_p(prop_p)
+        # Keeps the owning document alive for as long as any of its properties are referenced
+        self._udm = udm
         self._lazy_name: Optional[str] = None
         self._lazy_path: Optional[str] = None
         self._lazy_b_path: Optional[str] = None
@@ -44,10 +49,20 @@ class IProperty(abc.ABC):
             self._lazy_type = udm_get_property_type(self._prop_p, nullptr)
         return self._lazy_type
 
+    @property
+    def udm(self) -> Optional['UDM']:
+        return self._udm
+
     @property
     def prop_pointer(self):
         return self._prop_p
 
+    def _read_lock(self):
+        return self._udm.lock.read() if self._udm is not None else nullcontext()
+
+    def _write_lock(self):
+        return self._udm.lock.write() if self._udm is not None else nullcontext()
+
     def __hash__(self) -> int:
         return self._prop_p.value
 
@@ -58,14 +73,40 @@ class IProperty(abc.ABC):
         return isinstance(o, IProperty) and self._prop_p.value != o._prop_p.value
 
     def to_ascii(self) -> str:
-        value = udm_property_to_ascii(self._prop_p, self.path.encode('ascii'))
+        with self._read_lock():
+            value = udm_property_to_ascii(self._prop_p, self.path.encode('ascii'))
         if value:
-            return value.decode('utf8')
+            try:
+                return ctypes.string_at(value).decode('utf8')
+            finally:
+                udm_free_memory(value)
 
     def to_json(self) -> str:
-        value = udm_property_to_json(self._prop_p)
+        with self._read_lock():
+            value = udm_property_to_json(self._prop_p)
         if value:
-            return value.decode('utf8')
+            try:
+                return ctypes.string_at(value).decode('utf8')
+            finally:
+                udm_free_memory(value)
+
+    def fingerprint(self) -> bytes:
+        """Stable, type aware content hash of this subtree, memoized by path until the next write to the document."""
+        if self._udm is None:
+            return self._fingerprint()
+        with self._read_lock():
+            memo = self._udm._fingerprint_memo()
+            path = self.path
+            digest = memo.get(path)
+            if digest is None:
+                digest = memo[path] = self._fingerprint()
+        return digest
+
+    def _fingerprint(self) -> bytes:
+        raise NotImplementedError(f'UdmProperty {self.path!r} of type {self.type.name!r} can not be fingerprinted')
+
+    def to_python(self):
+        raise NotImplementedError(f'UdmProperty {self.path!r} of type {self.type.name!r} can not be converted')
 
     def __repr__(self):
         return f'<UdmProperty {self.path!r} of type {self.type.name!r}>'
@@ -1,18 +1,86 @@
+from typing import Any, Dict, List, Optional, Sequence, Type, TypeVar, Union
+
 from . import UDM
-from .properties import ElementProperty, PropertyValue
+from .properties import ArrayProperty, ElementProperty, PropertyValue
 from .iproperty import IProperty
+from .writer import write_generation
+
+T = TypeVar('T', bound='ITypeWrapper')
+
+
+class WrapperSequence(Sequence[T]):
+    """Lazy view over an element array, wraps each item on first access and keeps it."""
+
+    def __init__(self, prop: ArrayProperty, wrapper_class: Type[T]):
+        self._prop = prop
+        self._wrapper_class = wrapper_class
+        self._size = len(prop)
+        self._items: List[Optional[T]] = [None] * self._size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, List[T]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if index < 0 or index >= self._size:
+            raise IndexError(f'Index out of range <{index}/{self._size}>')
+        item = self._items[index]
+        if item is None:
+            item = self._items[index] = self._wrapper_class(self._prop[index])
+        return item
+
+    def __repr__(self):
+        return f'<WrapperSequence of {self._wrapper_class.__name__} ({self._size} items)>'
+
 
+class _WrappedChildren:
+    """Caches wrapped children and element arrays of `_prop` until the next write to `_document`."""
+    _prop: IProperty
 
-class ITypeWrapper:
+    def __init__(self):
+        self._children: Dict[str, Any] = {}
+        self._children_generation = 0
 
+    @property
+    def _document(self) -> Optional[UDM]:
+        return self._prop.udm
+
+    def _cached_children(self) -> Dict[str, Any]:
+        # Wrapped children are dropped after any write to the document, like ElementProperty.children()
+        generation = write_generation(self._document)
+        if generation != self._children_generation:
+            self._children = {}
+            self._children_generation = generation
+        return self._children
+
+    def _wrap(self, name: str, wrapper_class: Type[T]) -> T:
+        children = self._cached_children()
+        child = children.get(name)
+        if child is None:
+            child = children[name] = wrapper_class(self._prop[name])
+        return child
+
+    def _wrap_array(self, name: str, wrapper_class: Type[T]) -> WrapperSequence[T]:
+        children = self._cached_children()
+        child = children.get(name)
+        if child is None:
+            child = children[name] = WrapperSequence(self._prop[name], wrapper_class)
+        return child
+
+
+class ITypeWrapper(_WrappedChildren):
     def __init__(self, prop: IProperty):
+        super().__init__()
         self._prop = prop
 
     def __getitem__(self, item) -> PropertyValue:
         return self._prop[item]
 
 
-class ITypeRootWrapper:
+class ITypeRootWrapper(_WrappedChildren):
     _root: ElementProperty
     ASSET_TYPE = 'FILL ME'
     ASSET_VERSION_MIN = 1
@@ -22,7 +90,16 @@ class ITypeRootWrapper:
     def _root(self):
         return self._udm.root
 
+    @property
+    def _prop(self):
+        return self._root
+
+    @property
+    def _document(self) -> UDM:
+        return self._udm
+
     def __init__(self, udm: UDM):
+        super().__init__()
         self._udm = udm
         if self._udm.asset_type != self.ASSET_TYPE:
             raise ValueError(f'Invalid asset type, expected: {self.ASSET_TYPE}, got {self._udm.asset_type}')
@@ -0,0 +1,114 @@
+import threading
+from contextlib import contextmanager
+from typing import Hashable, List
+
+# Striped locks guarding per-property state: lazily filled buffers and native ArrayLz4 properties, which decompress
+# into themselves on first access
+_HANDLE_LOCK_COUNT = 64
+_handle_locks: List[threading.RLock] = [threading.RLock() for _ in range(_HANDLE_LOCK_COUNT)]
+
+
+def handle_lock(key: Hashable) -> threading.RLock:
+    """Stripe for a native handle, or for any other key such as (id(udm), path).
+
+    Every lookup of a property returns a new handle, state shared by all wrappers of one property has to be keyed by
+    something stable instead.
+    """
+    if key is None or isinstance(key, int):
+        # Native allocations are aligned, drop the low bits so neighbouring handles land on different stripes
+        return _handle_locks[((key or 0) >> 4) % _HANDLE_LOCK_COUNT]
+    return _handle_locks[hash(key) % _HANDLE_LOCK_COUNT]
+
+
+class RWLock:
+    """Writer preferring reader/writer lock.
+
+    Any number of threads may hold the read side at once, the write side is exclusive. Both sides are reentrant and
+    the thread holding the write side may also acquire the read side.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._writers_waiting = 0
+        self._local = threading.local()
+
+    def _read_depth(self) -> int:
+        return getattr(self._local, 'depth', 0)
+
+    def held(self) -> bool:
+        """True when the current thread holds either side."""
+        return self.held_write() or self._read_depth() > 0
+
+    def held_write(self) -> bool:
+        """True when the current thread holds the write side."""
+        # Only the owning thread sets _writer to its own ident, reading it unlocked is safe for this comparison
+        return self._writer == threading.get_ident()
+
+    def acquire_read(self):
+        depth = self._read_depth()
+        me = threading.get_ident()
+        if depth == 0:
+            # Reads nested in this thread's write are covered by it and not counted
+            self._local.counted = self._writer != me
+            if self._local.counted:
+                with self._condition:
+                    while self._writer is not None or self._writers_waiting:
+                        self._condition.wait()
+                    self._readers += 1
+        self._local.depth = depth + 1
+
+    def release_read(self):
+        depth = self._read_depth()
+        if depth == 0:
+            raise RuntimeError('Read lock released without being acquired')
+        self._local.depth = depth - 1
+        if depth == 1 and self._local.counted:
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._condition.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if self._read_depth():
+                raise RuntimeError('Can not upgrade a read lock to a write lock')
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self):
+        with self._condition:
+            if self._writer != threading.get_ident():
+                raise RuntimeError('Write lock released by a thread that does not hold it')
+            self._write_depth -= 1
+            if self._write_depth == 0:
+                self._writer = None
+                self._condition.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
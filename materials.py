@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from . import UDM
+from .fileutil import chunk_size
+
+
+class MaterialInfo(NamedTuple):
+    path: str
+    shaders: Tuple[str, ...]
+    textures: Tuple[str, ...]
+    error: Optional[str]
+
+
+@dataclass
+class ScanStats:
+    files: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class MaterialDependencyGraph:
+    """Deduplicated texture -> material graph, `edges` holds (texture index, material index) rows.
+
+    `material_shaders` holds (material index, shader index) rows, one for every shader of a material.
+    """
+    materials: List[str] = field(default_factory=list)
+    textures: List[str] = field(default_factory=list)
+    shaders: List[str] = field(default_factory=list)
+    material_shaders: np.ndarray = field(default_factory=lambda: np.zeros((0, 2), np.int32))
+    edges: np.ndarray = field(default_factory=lambda: np.zeros((0, 2), np.int32))
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def materials_using(self, texture: str) -> List[str]:
+        texture_id = self.textures.index(texture)
+        return [self.materials[i] for i in self.edges[self.edges[:, 0] == texture_id, 1]]
+
+    def shaders_of(self, material: str) -> List[str]:
+        material_id = self.materials.index(material)
+        return [self.shaders[i] for i in self.material_shaders[self.material_shaders[:, 0] == material_id, 1]]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'materials': self.materials,
+            'textures': self.textures,
+            'shaders': self.shaders,
+            'material_shaders': self.material_shaders.ravel().tolist(),
+            'edges': self.edges.ravel().tolist(),
+            'errors': self.errors,
+        }
+
+    def save_json(self, filename: Union[str, Path]):
+        with open(filename, 'w', encoding='utf8') as f:
+            json.dump(self.to_json(), f, separators=(',', ':'))
+
+    def save_npz(self, filename: Union[str, Path]):
+        np.savez_compressed(filename, materials=np.asarray(self.materials, str), textures=np.asarray(self.textures, str),
+                            shaders=np.asarray(self.shaders, str), material_shaders=self.material_shaders,
+                            edges=self.edges)
+
+
+def _collect_strings(value: Any, out: List[str]):
+    if isinstance(value, str):
+        if value:
+            out.append(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _collect_strings(item, out)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_strings(item, out)
+
+
+def scan_material(path: str) -> MaterialInfo:
+    """Materializes a material in one pass, every top level element is a shader with an optional 'textures' block."""
+    udm = UDM()
+    try:
+        if not udm.load(path):
+            return MaterialInfo(path, (), (), 'Failed to load')
+        data = udm.root.to_python()
+        shaders, textures = [], []
+        for shader, shader_data in data.items():
+            if not isinstance(shader_data, dict):
+                continue
+            shaders.append(shader)
+            _collect_strings(shader_data.get('textures'), textures)
+        return MaterialInfo(path, tuple(shaders), tuple(dict.fromkeys(textures)), None)
+    except Exception as ex:
+        return MaterialInfo(path, (), (), f'{type(ex).__name__}: {ex}')
+    finally:
+        udm.destroy()
+
+
+def scan_materials(paths: Iterable[Union[str, Path]], max_workers: Optional[int] = None,
+                   progress: Optional[Callable[[ScanStats], None]] = None,
+                   progress_interval: int = 1000) -> Tuple[MaterialDependencyGraph, ScanStats]:
+    paths = list(dict.fromkeys(Path(path).as_posix() for path in paths))
+    max_workers = max_workers or os.cpu_count() or 1
+    stats = ScanStats()
+    graph = MaterialDependencyGraph()
+    material_ids: Dict[str, int] = {}
+    texture_ids: Dict[str, int] = {}
+    shader_ids: Dict[str, int] = {}
+    material_shaders: List[Tuple[int, int]] = []
+    edges: List[Tuple[int, int]] = []
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers) as executor:
+        for info in executor.map(scan_material, paths, chunksize=chunk_size(len(paths), max_workers, 256)):
+            stats.files += 1
+            if info.error is not None:
+                stats.failed += 1
+                graph.errors[info.path] = info.error
+            elif info.path not in material_ids:
+                material_id = material_ids[info.path] = len(material_ids)
+                for shader in info.shaders:
+                    material_shaders.append((material_id, shader_ids.setdefault(shader, len(shader_ids))))
+                for texture in info.textures:
+                    edges.append((texture_ids.setdefault(texture, len(texture_ids)), material_id))
+            if progress is not None and stats.files % progress_interval == 0:
+                stats.seconds = time.perf_counter() - start
+                progress(stats)
+    stats.seconds = time.perf_counter() - start
+
+    graph.materials = list(material_ids)
+    graph.textures = list(texture_ids)
+    graph.shaders = list(shader_ids)
+    if material_shaders:
+        graph.material_shaders = np.asarray(material_shaders, np.int32)
+    if edges:
+        graph.edges = np.unique(np.asarray(edges, np.int32), axis=0)
+    return graph, stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m pragma_udm_wrapper.materials',
+                                     description='Build a texture -> material dependency graph from material files')
+    parser.add_argument('paths', nargs='+', type=Path, help='Material files or directories')
+    parser.add_argument('--pattern', default='*.pmat*')
+    parser.add_argument('-j', '--jobs', type=int, default=None)
+    parser.add_argument('-o', '--output', type=Path, required=True, help='Output .json or .npz file')
+    args = parser.parse_args(argv)
+
+    files = []
+    for path in args.paths:
+        if path.is_dir():
+            files.extend(p for p in path.rglob(args.pattern) if p.is_file())
+        else:
+            files.append(path)
+
+    def report(stats: ScanStats):
+        print(f'{stats.files}/{len(files)} files, {stats.files_per_second:.1f} files/s', file=sys.stderr)
+
+    graph, stats = scan_materials(files, args.jobs, report)
+    if args.output.suffix == '.npz':
+        graph.save_npz(args.output)
+    else:
+        graph.save_json(args.output)
+    print(f'Scanned {stats.files} files ({stats.failed} failed) in {stats.seconds:.2f}s, '
+          f'{stats.files_per_second:.1f} files/s, {len(graph.textures)} textures', file=sys.stderr)
+    for path, error in graph.errors.items():
+        print(f'{path}: {error}', file=sys.stderr)
+    return 1 if stats.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import argparse
+import ctypes
+import json
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from . import UDM, chunked_lz4
+from .iproperty import IProperty
+from .properties import ElementProperty, StructArrayProperty, ValueArrayProperty, _chunked_payload, _unwrap_property
+from .type_info import UdmType
+from .wrapper import (
+    nullptr, udm_get_array_size, udm_get_array_value_type, udm_get_blob_size, udm_get_property_i, udm_size_of_type
+)
+
+SORT_KEYS = ('bytes', 'nodes', 'array_elements', 'blob_bytes', 'compressed_bytes', 'uncompressed_bytes')
+
+
+@dataclass
+class SubtreeStats:
+    """Totals of a subtree, element array items are folded into one '*' path segment."""
+    path: str
+    nodes: int = 0
+    array_elements: int = 0
+    # Estimated in-memory size of all values, arrays and blobs
+    bytes: int = 0
+    blob_bytes: int = 0
+    # Stored and decoded sizes of the ArrayLz4, BlobLz4 and chunked LZ4 blob elements only
+    compressed_bytes: int = 0
+    uncompressed_bytes: int = 0
+
+    def add(self, other: 'SubtreeStats'):
+        self.nodes += other.nodes
+        self.array_elements += other.array_elements
+        self.bytes += other.bytes
+        self.blob_bytes += other.blob_bytes
+        self.compressed_bytes += other.compressed_bytes
+        self.uncompressed_bytes += other.uncompressed_bytes
+
+
+def _lz4_size(data) -> Optional[int]:
+    if not chunked_lz4.available():
+        return None
+    return len(chunked_lz4.lz4.block.compress(memoryview(data).cast('B'), store_size=False))
+
+
+class _Profiler:
+    def __init__(self, max_depth: Optional[int], measure_compression: bool):
+        self.max_depth = max_depth
+        self.measure_compression = measure_compression
+        self.stats: Dict[str, SubtreeStats] = {}
+
+    def _record(self, path: str, node: SubtreeStats):
+        """Adds the totals of one node to its own path and every prefix of it."""
+        parts = path.split('/') if path else []
+        if self.max_depth is not None:
+            parts = parts[:self.max_depth]
+        for depth in range(len(parts) + 1):
+            prefix = '/'.join(parts[:depth])
+            total = self.stats.get(prefix)
+            if total is None:
+                total = self.stats[prefix] = SubtreeStats(prefix)
+            total.add(node)
+
+    def _compressed(self, node: SubtreeStats, stored: Optional[int], decoded: int):
+        if stored is not None:
+            node.compressed_bytes += stored
+            node.uncompressed_bytes += decoded
+
+    def walk(self, prop_p, prop_type: UdmType, path: str):
+        node = SubtreeStats(path, nodes=1)
+        if prop_type == UdmType.Element:
+            element = ElementProperty(prop_p)
+            children = element.children()
+            prefix = f'{path}/' if path else ''
+            for name, child_type, child_p in zip(children.names, children.types, children.handles):
+                self.walk(child_p, child_type, prefix + name)
+            payload = _chunked_payload(element) if self.measure_compression else None
+            if payload is not None:
+                decoded = chunked_lz4.chunked_size(payload)
+                # The 'data' child already counted the stored size
+                node.bytes = node.blob_bytes = decoded - len(payload)
+                self._compressed(node, len(payload), decoded)
+        elif prop_type in (UdmType.Array, UdmType.ArrayLz4):
+            size = udm_get_array_size(prop_p, nullptr)
+            array_type = udm_get_array_value_type(prop_p, nullptr)
+            node.array_elements = size
+            array = _unwrap_property(prop_p)
+            if isinstance(array, StructArrayProperty):
+                node.bytes = size * array._dtype.itemsize
+            elif isinstance(array, ValueArrayProperty):
+                node.bytes = size * udm_size_of_type(array_type)
+            elif array_type == UdmType.Element:
+                for index in range(size):
+                    self.walk(udm_get_property_i(prop_p, index), UdmType.Element, f'{path}/*')
+            else:
+                node.bytes = sum(len(item.encode('utf8')) if isinstance(item, str) else 0 for item in array)
+            if prop_type == UdmType.ArrayLz4 and self.measure_compression and node.bytes:
+                if isinstance(array, (ValueArrayProperty, StructArrayProperty)):
+                    self._compressed(node, _lz4_size(array.value()), node.bytes)
+        elif prop_type in (UdmType.Blob, UdmType.BlobLz4):
+            size = ctypes.c_uint64(0)
+            udm_get_blob_size(prop_p, nullptr, ctypes.byref(size))
+            node.blob_bytes = node.bytes = size.value
+            if prop_type == UdmType.BlobLz4 and self.measure_compression:
+                self._compressed(node, _lz4_size(_unwrap_property(prop_p)), size.value)
+        elif prop_type in (UdmType.String, UdmType.Utf8String):
+            node.bytes = len(_unwrap_property(prop_p).encode('utf8'))
+        elif prop_type != UdmType.Nil:
+            node.bytes = udm_size_of_type(prop_type)
+        self._record(path, node)
+
+
+def profile(prop: IProperty, max_depth: Optional[int] = None,
+            measure_compression: bool = False) -> Dict[str, SubtreeStats]:
+    """Collects SubtreeStats for every path prefix below `prop`, the root is the '' path.
+
+    Sizes come from the UDM type sizes and array lengths, blobs are measured without reading them. With
+    `measure_compression` ArrayLz4 and BlobLz4 properties are decoded and recompressed with the lz4 package to
+    estimate their stored size, and the chunked LZ4 elements written by `set_blob` count their decoded size.
+    """
+    profiler = _Profiler(max_depth, measure_compression)
+    profiler.walk(prop.prop_pointer, prop.type, '')
+    return profiler.stats
+
+
+def top(stats: Dict[str, SubtreeStats], count: int = 20, key: str = 'bytes') -> List[SubtreeStats]:
+    if key not in SORT_KEYS:
+        raise ValueError(f'Unknown sort key {key!r}, expected one of {SORT_KEYS}')
+    return sorted(stats.values(), key=lambda item: getattr(item, key), reverse=True)[:count]
+
+
+def format_table(rows: List[SubtreeStats]) -> str:
+    lines = [f'{"bytes":>14} {"nodes":>10} {"elements":>12} {"blobs":>14} {"compressed":>14} {"ratio":>6}  path']
+    for row in rows:
+        ratio = f'{row.uncompressed_bytes / row.compressed_bytes:6.2f}' if row.compressed_bytes else f'{"-":>6}'
+        lines.append(f'{row.bytes:>14,} {row.nodes:>10,} {row.array_elements:>12,} {row.blob_bytes:>14,} '
+                     f'{row.compressed_bytes:>14,} {ratio}  {row.path or "/"}')
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m pragma_udm_wrapper.profiler',
+                                     description='Report which subtrees of a UDM document take the most space')
+    parser.add_argument('file', type=Path)
+    parser.add_argument('-n', '--top', type=int, default=20)
+    parser.add_argument('--sort', choices=SORT_KEYS, default='bytes')
+    parser.add_argument('--depth', type=int, default=None, help='Fold deeper paths into their prefix at this depth')
+    parser.add_argument('--compression', action='store_true', help='Estimate stored size of compressed properties')
+    parser.add_argument('-o', '--output', type=Path, default=None, help='Write all subtree stats as JSON')
+    args = parser.parse_args(argv)
+
+    udm = UDM()
+    if not udm.load(args.file):
+        print(f'Failed to load {args.file}', file=sys.stderr)
+        return 1
+    try:
+        stats = profile(udm.root, args.depth, args.compression)
+    finally:
+        udm.destroy()
+    print(format_table(top(stats, args.top, args.sort)))
+    if args.output is not None:
+        rows = [asdict(row) for row in top(stats, len(stats), args.sort)]
+        args.output.write_text(json.dumps(rows, indent=1), encoding='utf8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
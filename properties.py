@@ -1,11 +1,17 @@
 import ctypes
-from typing import Iterator, Any, Dict, List, Union, Optional
+import fnmatch
+from typing import Iterator, Any, Dict, List, NamedTuple, Union, Optional, Sequence, Tuple, TYPE_CHECKING
 
 import numpy as np
 
+from . import chunked_lz4
+from .hashing import hash_scalar, hash_array_buffer, hash_element, hash_array_items
 from .property_unwrappers import string, integer, float_, vectors, blob
 from .iproperty import IProperty
+from .locks import handle_lock
+from .semantic import semantic_view
 from .type_info import UdmType, udm_to_np
+from .writer import write_blob, write_generation, write_items, write_python
 from .wrapper import (
     udm_get_property_type, udm_get_property_i,
     udm_get_property, udm_get_array_size,
@@ -15,32 +21,56 @@ from .wrapper import (
     udm_size_of_type, ReadArrayPropertyResult
 )
 
+if TYPE_CHECKING:
+    from . import UDM
+
+
+def _join_path(*parts: str) -> str:
+    """Joins '/' separated paths, empty segments are dropped so that equal paths compare equal."""
+    return '/'.join(segment for part in parts for segment in part.split('/') if segment)
+
 
 class ArrayIterator(Iterator['PropertyValue']):
     def __init__(self, array_prop: 'ArrayProperty'):
         self._prop = array_prop
-        self._size = len(array_prop)
         self._index = 0
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        if self._index >= self._size:
-            raise StopIteration
-        res = self._prop[self._index]
+        # The size is checked again for every item, the array may be replaced by a write between two items
+        with self._prop._read_lock():
+            if self._index >= len(self._prop):
+                raise StopIteration
+            res = self._prop[self._index]
         self._index += 1
         return res
 
 
+class Column(NamedTuple):
+    """One field of every item of an element array, `udm_type` is None when no item has the field."""
+    udm_type: Optional[UdmType]
+    values: Union[np.ndarray, List[Any]]
+    mask: np.ndarray
+
+
+def _column_buffer(udm_type: UdmType, size: int) -> Union[np.ndarray, List[Any]]:
+    if udm_type in (UdmType.String, UdmType.Utf8String) or udm_type not in udm_to_np:
+        return [None] * size
+    data_type, data_len = udm_to_np[udm_type]
+    return np.zeros((size, data_len) if data_len > 1 else size, data_type)
+
+
 class ArrayProperty(IProperty, List['PropertyValue']):
 
-    def __init__(self, prop_p: int):
-        super().__init__(prop_p)
+    def __init__(self, prop_p: int, udm: Optional['UDM'] = None):
+        super().__init__(prop_p, udm)
         self._lazy_array_type: Optional[UdmType] = None
 
     def __len__(self) -> int:
-        return udm_get_array_size(self._prop_p, nullptr)
+        with self._read_lock():
+            return udm_get_array_size(self._prop_p, nullptr)
 
     def __iter__(self) -> Iterator[IProperty]:
         return ArrayIterator(self)
@@ -54,16 +84,57 @@ class ArrayProperty(IProperty, List['PropertyValue']):
             self._lazy_array_type = udm_get_array_value_type(self._prop_p, nullptr)
         return self._lazy_array_type
 
+    def _buffer_lock(self):
+        """Stripe serializing reads of this property, shared by every wrapper of it."""
+        if self._udm is None:
+            return handle_lock(self._prop_p.value)
+        # Handles differ per lookup, the document and path do not
+        return handle_lock((id(self._udm), self.path))
+
+    # Buffer caching of the value and struct arrays, which set data_buffer and _data_generation
+
+    def _cached_buffer(self) -> Optional[np.ndarray]:
+        """The buffer read last, None when the document was written since, possibly through another wrapper."""
+        buffer = self.data_buffer
+        if buffer is not None and self._data_generation == write_generation(self._udm):
+            return buffer
+        return None
+
+    def _buffer(self) -> np.ndarray:
+        buffer = self._cached_buffer()
+        if buffer is None:
+            # Threads sharing this property read it once, the others wait for that read. The document lock is taken
+            # first, the same order value() uses
+            with self._read_lock(), self._buffer_lock():
+                buffer = self._cached_buffer()
+                if buffer is None:
+                    buffer = self._read()
+        return buffer
+
+    def _record_access(self, item: Union[int, slice]):
+        recorder = self._udm._recorder if self._udm is not None else None
+        if recorder is None:
+            return
+        if isinstance(item, slice):
+            start, stop, _ = item.indices(len(self))
+        else:
+            start = item + len(self) if item < 0 else item
+            stop = start + 1
+        recorder.record(self._prop_p.value, self.type, start, stop)
+
     def __getitem__(self, item: int) -> 'PropertyValue':
         if isinstance(item, int):
-            prop_p = udm_get_property_i(self._prop_p, item)
-            if prop_p is None or prop_p == 0:
-                raise IndexError(f'Index out of range <{item}/{len(self)}>')
-            return _unwrap_property(prop_p)
+            with self._read_lock():
+                prop_p = udm_get_property_i(self._prop_p, item)
+                if prop_p is None or prop_p == 0:
+                    raise IndexError(f'Index out of range <{item}/{len(self)}>')
+                self._record_access(item)
+                return _unwrap_property(prop_p, self._udm)
         elif isinstance(item, slice):
             res = []
-            for i in range(item.start, min(item.stop, len(self))):
-                res.append(_unwrap_property(udm_get_property_i(self._prop_p, i)))
+            with self._read_lock():
+                for i in range(item.start, min(item.stop, len(self))):
+                    res.append(_unwrap_property(udm_get_property_i(self._prop_p, i), self._udm))
             return res
         else:
             raise NotImplementedError(
@@ -74,61 +145,156 @@ class ArrayProperty(IProperty, List['PropertyValue']):
 
     def value(self):
         res = []
-        for i in range(0, len(self)):
-            res.append(_unwrap_property(udm_get_property_i(self._prop_p, i)))
+        with self._read_lock():
+            for i in range(0, len(self)):
+                res.append(_unwrap_property(udm_get_property_i(self._prop_p, i), self._udm))
+        return res
+
+    def to_python(self) -> List[Any]:
+        with self._read_lock():
+            return [_to_python(item) for item in self.value()]
+
+    def column(self, path: str) -> 'Column':
+        """Extracts one field, like 'timeFrame/start', from every item of an element array."""
+        return self.columns([path])[path]
+
+    def columns(self, paths: Sequence[str]) -> Dict[str, 'Column']:
+        """Extracts several fields from every item of an element array in one pass over the items.
+
+        The type of a column is taken from the first item that has the field. Numeric, vector and matrix fields are
+        read straight into numpy arrays ((N,) or (N, components), booleans as np.bool_), other fields into lists.
+        `mask` marks the items that have the field, missing values are zero or None.
+        """
+        if self.array_type != UdmType.Element:
+            raise ValueError(f'UdmProperty {self.path!r} is not an array of elements')
+        size = len(self)
+        b_paths = [path.encode('utf8') for path in paths]
+        masks = [np.zeros(size, np.bool_) for _ in paths]
+        types: List[Optional[UdmType]] = [None] * len(paths)
+        outs: List[Union[np.ndarray, List[Any], None]] = [None] * len(paths)
+        with self._read_lock():
+            for index in range(size):
+                item_p = udm_get_property_i(self._prop_p, index)
+                for column, b_path in enumerate(b_paths):
+                    prop_p = udm_get_property(item_p, b_path)
+                    if prop_p is None or prop_p == 0:
+                        continue
+                    udm_type = types[column]
+                    if udm_type is None:
+                        udm_type = types[column] = UdmType(udm_get_property_type(prop_p, nullptr))
+                        outs[column] = _column_buffer(udm_type, size)
+                    out = outs[column]
+                    if isinstance(out, np.ndarray):
+                        row_size = out.strides[0]
+                        if not udm_read_property(prop_p, nullptr, udm_type, out.ctypes.data + index * row_size,
+                                                 row_size):
+                            continue
+                    else:
+                        out[index] = _unwrap_property(prop_p, self._udm)
+                    masks[column][index] = True
+        res = {}
+        for path, udm_type, out, mask in zip(paths, types, outs, masks):
+            if out is None:
+                out = [None] * size
+            elif udm_type == UdmType.Boolean:
+                out = out.view(np.bool_)
+            res[path] = Column(udm_type, out, mask)
         return res
 
+    def _fingerprint(self) -> bytes:
+        array_type = self.array_type
+        return hash_array_items(self.type, array_type, [_fingerprint_value(item, array_type) for item in self])
+
 
 class ValueArrayProperty(ArrayProperty):
-    def __init__(self, prop_p: int):
-        super().__init__(prop_p)
+    def __init__(self, prop_p: int, udm: Optional['UDM'] = None):
+        super().__init__(prop_p, udm)
         self.data_buffer = None
+        self._data_generation: Optional[int] = None
 
     def __contains__(self, __x: object) -> bool:
         raise NotImplementedError('Contains not supported to ArrayProperty')
 
     def __getitem__(self, item: int) -> Union[int, List[int], np.ndarray]:
-        if isinstance(item, int):
-            if self.data_buffer is None:
-                self.value()
-            return self.data_buffer[item]
+        if isinstance(item, (int, slice)):
+            self._record_access(item)
+            return self._buffer()[item]
+        else:
+            raise NotImplementedError(
+                f'UdmProperty {self.path!r} does not support indexing with index "{item}" of type "{type(item)}"')
 
+    def __setitem__(self, item: Union[int, slice], value) -> None:
+        size = len(self)
+        if isinstance(item, int):
+            if not -size <= item < size:
+                raise IndexError(f'Index out of range <{item}/{size}>')
+            start, values = item % size, [value]
         elif isinstance(item, slice):
-            if self.data_buffer is None:
-                self.value()
-            return self.data_buffer[item]
+            start, stop, step = item.indices(size)
+            if step != 1:
+                raise NotImplementedError(f'UdmProperty {self.path!r} does not support assigning to strided slices')
+            data_len = udm_to_np[self.array_type][1]
+            values = np.asarray(value)
+            if data_len > 1:
+                values = values.reshape(-1, data_len)
+            if len(values) != stop - start:
+                raise ValueError(f'Can not assign {len(values)} items to a slice of {stop - start} items')
         else:
             raise NotImplementedError(
                 f'UdmProperty {self.path!r} does not support indexing with index "{item}" of type "{type(item)}"')
+        with self._write_lock():
+            transaction = self._udm._transaction if self._udm is not None else None
+            if transaction is not None:
+                transaction.set_items(self, start, values)
+            else:
+                write_items(self._prop_p, self.array_type, start, values, self._udm)
+                self.data_buffer = None
 
     def __repr__(self):
         return f'<UdmProperty {self.path!r} of type {self.type.name}<{self.array_type.name}> >'
 
     def value(self):
-        data_type, data_len = udm_to_np[self.array_type]
-        if len(self) == 0:
-            return np.zeros(0, data_type)
-        if data_len > 1:
-            buffer = np.zeros((len(self), data_len), data_type)
-        else:
-            buffer = np.zeros(len(self), data_type)
+        self._record_access(slice(None))
+        return self._read()
+
+    def _read(self) -> np.ndarray:
+        with self._read_lock(), self._buffer_lock():
+            generation = write_generation(self._udm)
+            size = len(self)
+            data_type, data_len = udm_to_np[self.array_type]
+            if size == 0:
+                return np.zeros(0, data_type)
+            if data_len > 1:
+                buffer = np.zeros((size, data_len), data_type)
+            else:
+                buffer = np.zeros(size, data_type)
 
-        buffer_size = buffer.nbytes
-        assert buffer_size == udm_size_of_type(self.array_type) * len(self)
+            buffer_size = buffer.nbytes
+            assert buffer_size == udm_size_of_type(self.array_type) * size
 
-        res = udm_read_array_property(self._prop_p, nullptr, self.array_type, buffer.ctypes.data, buffer_size, 0,
-                                      len(self))
+            res = udm_read_array_property(self._prop_p, nullptr, self.array_type, buffer.ctypes.data, buffer_size, 0,
+                                          size)
         if res == ReadArrayPropertyResult.Success:
-            self.data_buffer = buffer
+            self.data_buffer, self._data_generation = buffer, generation
             return buffer
         else:
             del buffer
             raise ValueError(f"Failed to read value from {self!r}: {res!r}")
 
+    def to_python(self) -> np.ndarray:
+        return self._buffer()
+
+    def semantic_value(self) -> np.ndarray:
+        """Zero-copy view of the values with named transform fields, (N, 4, 4) matrices and np.bool_ booleans."""
+        return semantic_view(self._buffer(), self.array_type)
+
+    def _fingerprint(self) -> bytes:
+        return hash_array_buffer(self.type, self.array_type, self.to_python())
+
 
 class StructArrayProperty(ArrayProperty):
-    def __init__(self, prop_p: int):
-        super().__init__(prop_p)
+    def __init__(self, prop_p: int, udm: Optional['UDM'] = None):
+        super().__init__(prop_p, udm)
         dtype_info = []
         types = self._get_struct_member_types()
         for mname, mtype in zip(self._get_struct_member_names(), types):
@@ -139,6 +305,7 @@ class StructArrayProperty(ArrayProperty):
         sizeof = udm_size_of_struct(len(types), (ctypes.c_uint8 * len(types))(*types))
         assert sizeof == self._dtype.itemsize, 'Item size of generated numpy DType does not match with UDM calculated size'
         self.data_buffer = None
+        self._data_generation: Optional[int] = None
 
     def __iter__(self) -> Iterator[IProperty]:
         raise NotImplementedError()
@@ -148,11 +315,7 @@ class StructArrayProperty(ArrayProperty):
 
     def __getitem__(self, item: int | str) -> 'IProperty':
         if isinstance(item, (int, str)) and self.array_type == UdmType.Struct:
-            if self.data_buffer is not None:
-                return self.data_buffer[item]
-            else:
-                self.data_buffer = self.value()
-                return self.data_buffer[item]
+            return self._buffer()[item]
         else:
             raise NotImplementedError(
                 f'UdmProperty "{self.path}" does not support indexing with index "{item}" of type "{type(item)}"')
@@ -161,15 +324,28 @@ class StructArrayProperty(ArrayProperty):
         return f'<UdmProperty {self.path} of type {self.type.name}<{self.array_type.name}> >'
 
     def value(self):
-        item_count = len(self)
-        array = np.zeros((item_count,), self._dtype)
-        res = udm_read_property(self._prop_p, nullptr, self.type, array.ctypes.data, item_count * array.itemsize)
+        self._record_access(slice(None))
+        return self._read()
+
+    def _read(self) -> np.ndarray:
+        with self._read_lock(), self._buffer_lock():
+            generation = write_generation(self._udm)
+            item_count = len(self)
+            array = np.zeros((item_count,), self._dtype)
+            res = udm_read_property(self._prop_p, nullptr, self.type, array.ctypes.data, item_count * array.itemsize)
         if res:
+            self.data_buffer, self._data_generation = array, generation
             return array
         else:
             del array
             raise ValueError(f'Failed to read {self.path}')
 
+    def to_python(self) -> np.ndarray:
+        return self._buffer()
+
+    def _fingerprint(self) -> bytes:
+        return hash_array_buffer(self.type, self.array_type, self.to_python())
+
     @property
     def array_type(self) -> UdmType:
         return UdmType.Struct
@@ -189,7 +365,6 @@ class ElementIterator(Iterator[str]):
     def __init__(self, array_prop: 'ElementProperty'):
         self._prop = array_prop
         self._iterator = udm_create_property_child_name_iterator(self._prop.prop_pointer, nullptr)
-        self._size = len(array_prop)
 
     def __iter__(self):
         return self
@@ -203,47 +378,160 @@ class ElementIterator(Iterator[str]):
         return name.decode('utf8')
 
 
+class ElementChildren(NamedTuple):
+    """Parallel lists describing the direct children of an element."""
+    names: List[str]
+    types: List[UdmType]
+    handles: List[int]
+
+
 class ElementProperty(IProperty, Dict[str, 'PropertyValue']):
 
+    def __init__(self, prop_p: int, udm: Optional['UDM'] = None):
+        super().__init__(prop_p, udm)
+        # (write generation of the document, children, name -> index), rebuilt after a write to the document
+        self._lazy_children: Optional[Tuple[int, ElementChildren, Dict[str, int]]] = None
+
+    def _children(self) -> Tuple[ElementChildren, Dict[str, int]]:
+        cached = self._lazy_children
+        generation = write_generation(self._udm)
+        if cached is None or cached[0] != generation:
+            names, types, handles = [], [], []
+            with self._read_lock():
+                for name in ElementIterator(self):
+                    prop_p = udm_get_property(self._prop_p, name.encode('utf8'))
+                    names.append(name)
+                    types.append(UdmType(udm_get_property_type(prop_p, nullptr)))
+                    handles.append(prop_p)
+            cached = self._lazy_children = (generation, ElementChildren(names, types, handles),
+                                             {name: index for index, name in enumerate(names)})
+        return cached[1], cached[2]
+
+    def children(self) -> ElementChildren:
+        """Names, types and handles of all children, enumerated once and cached until the next write to the document.
+
+        The C API has no bulk call, enumerating costs three native calls per child: the name, the handle and the type.
+        """
+        return self._children()[0]
+
     def __setitem__(self, __k: str, __v) -> None:
-        raise NotImplementedError()
+        with self._write_lock():
+            transaction = self._udm._transaction if self._udm is not None else None
+            if transaction is not None:
+                transaction.set(self, __k, __v)
+            else:
+                write_python(self._prop_p, __k, __v, udm=self._udm)
 
     def __delitem__(self, __v) -> None:
         raise NotImplementedError()
 
+    def set_blob(self, name: str, data, compress: bool = True, chunked: bool = False,
+                 max_workers: Optional[int] = None):
+        """Writes any buffer-protocol object as a blob without copying it, as a BlobLz4 with `compress`.
+
+        `chunked` LZ4-compresses the payload in parallel chunks instead, it requires the lz4 package and writes an
+        element the engine can not read, see `chunked_lz4`. Blobs are written right away, also inside a transaction.
+        """
+        view = memoryview(data).cast('B')
+        payload = chunked_lz4.compress(view, max_workers=max_workers) if chunked else None
+        with self._write_lock():
+            if payload is None:
+                write_blob(self._prop_p, name, view, compress, self._udm)
+                return
+            write_python(self._prop_p, name, {}, udm=self._udm)
+            write_python(self._prop_p, f'{name}/encoding', chunked_lz4.ENCODING, udm=self._udm)
+            write_blob(self._prop_p, f'{name}/data', payload, udm=self._udm)
+
+    def get_blob(self, name: str, max_workers: Optional[int] = None) -> Union[bytes, bytearray]:
+        """Reads a blob written by `set_blob`, decompressing chunked LZ4 payloads in parallel."""
+        data = self[name]
+        if isinstance(data, ElementProperty):
+            payload = _chunked_payload(data)
+            if payload is not None:
+                return chunked_lz4.decompress(payload, max_workers)
+        if not isinstance(data, bytes):
+            raise ValueError(f'UdmProperty {self.path!r} child "{name}" is not a blob')
+        return data
+
     def __len__(self) -> int:
-        return udm_get_property_child_count(self._prop_p, nullptr)
+        with self._read_lock():
+            return udm_get_property_child_count(self._prop_p, nullptr)
 
     def __iter__(self) -> Iterator[str]:
-        return ElementIterator(self)
+        return iter(self.children().names)
+
+    def keys(self):
+        return list(self.children().names)
 
     def __contains__(self, item: str):
-        prop = udm_get_property(self._prop_p, item.encode('utf8'))
+        cached = self._lazy_children
+        if '/' not in item and cached is not None and cached[0] == write_generation(self._udm) and item in cached[2]:
+            return True
+        # Misses are confirmed natively, the cache only speeds up names it knows
+        with self._read_lock():
+            prop = udm_get_property(self._prop_p, item.encode('utf8'))
         return prop is not None and prop != 0
 
     def __getitem__(self, item) -> 'PropertyValue':
         if isinstance(item, str):
-            prop_p = udm_get_property(self._prop_p, item.encode('utf8'))
-            if prop_p is None or prop_p == 0:
-                raise IndexError(f'UdmProperty {self.path!r} does not have "{item}" property')
-            return _unwrap_property(prop_p)
+            if self._udm is not None and self._udm._prefetched:
+                value = self._udm._prefetched_value(_join_path(self.path, item))
+                if value is not None:
+                    return value
+            with self._read_lock():
+                cached = self._lazy_children
+                if cached is not None and cached[0] == write_generation(self._udm) and item in cached[2]:
+                    children, index = cached[1], cached[2][item]
+                    return _unwrap_property(children.handles[index], self._udm, children.types[index])
+                prop_p = udm_get_property(self._prop_p, item.encode('utf8'))
+                if prop_p is None or prop_p == 0:
+                    raise IndexError(f'UdmProperty {self.path!r} does not have "{item}" property')
+                return _unwrap_property(prop_p, self._udm)
         else:
             raise NotImplementedError(
                 f'UdmProperty {self.path!r} does not support indexing with index "{item}" of type "{type(item)}"')
 
     def items(self):
-        for name in self:
-            yield name, self[name]
+        children = self.children()
+        for name, prop_type, prop_p in zip(children.names, children.types, children.handles):
+            yield name, _unwrap_property(prop_p, self._udm, prop_type)
 
     def values(self):
-        for name in self:
-            yield self[name]
+        children = self.children()
+        for prop_type, prop_p in zip(children.types, children.handles):
+            yield _unwrap_property(prop_p, self._udm, prop_type)
 
     def get(self, item: str, default: Any = None):
         if item in self:
             return self[item]
         return default
 
+    def to_python(self) -> Dict[str, Any]:
+        with self._read_lock():
+            return {name: _to_python(value) for name, value in self.items()}
+
+    def _fingerprint(self) -> bytes:
+        children = self.children()
+        return hash_element(self.type, [
+            (name, _fingerprint_value(_unwrap_property(prop_p, self._udm, child_type), child_type))
+            for name, child_type, prop_p in zip(children.names, children.types, children.handles)
+        ])
+
+    def glob(self, pattern: str) -> Iterator[Tuple[str, 'PropertyValue']]:
+        """Yields (relative path, value) pairs matching a '/' separated pattern like 'pbr/textures/*'."""
+        head, _, tail = pattern.partition('/')
+        if not any(char in head for char in '*?['):
+            names = [head] if head in self else []
+        else:
+            names = [name for name in self if fnmatch.fnmatchcase(name, head)]
+        for name in names:
+            value = self[name]
+            if not tail:
+                yield name, value
+            elif isinstance(value, ElementProperty):
+                for sub_path, sub_value in value.glob(tail):
+                    yield f'{name}/{sub_path}', sub_value
+
 
 PropertyValue = Union[ArrayProperty, ValueArrayProperty,
                       StructArrayProperty, ElementProperty,
@@ -252,22 +540,24 @@ PropertyValue = Union[ArrayProperty, ValueArrayProperty,
 ]
 
 
-def _array_subtype_selector(prop_p):
+def _array_subtype_selector(prop_p, udm: Optional['UDM'] = None):
     array_type = udm_get_array_value_type(prop_p, nullptr)
     if array_type <= UdmType.Utf8String:
-        return ArrayProperty(prop_p)
+        return ArrayProperty(prop_p, udm)
     elif UdmType.Utf8String < array_type <= UdmType.Mat3x4:
-        return ValueArrayProperty(prop_p)
+        return ValueArrayProperty(prop_p, udm)
     elif array_type == UdmType.Struct:
-        return StructArrayProperty(prop_p)
+        return StructArrayProperty(prop_p, udm)
     elif UdmType.Half <= array_type <= UdmType.Vector4i:
-        return ValueArrayProperty(prop_p)
+        return ValueArrayProperty(prop_p, udm)
     elif UdmType.Element <= array_type <= UdmType.ArrayLz4:
-        return ArrayProperty(prop_p)
+        return ArrayProperty(prop_p, udm)
     else:
         raise NotImplementedError(f'Unknown array subtype: {array_type} for {udm_get_property_path(prop_p)}')
 
 
+_container_types = (UdmType.Element, UdmType.Array, UdmType.ArrayLz4)
+
 _prop_unwrappers = (
     None,
     string.unwrap_string,
@@ -316,9 +606,36 @@ _prop_unwrappers = (
 )
 
 
-def _unwrap_property(prop_p) -> PropertyValue:
-    prop_type = udm_get_property_type(prop_p, nullptr)
+def _to_python(value: PropertyValue) -> Any:
+    if isinstance(value, IProperty):
+        return value.to_python()
+    return value
+
+
+def _fingerprint_value(value: PropertyValue, udm_type: UdmType) -> bytes:
+    if isinstance(value, IProperty):
+        return value.fingerprint()
+    return hash_scalar(udm_type, value)
+
+
+def _chunked_payload(element: ElementProperty) -> Optional[bytes]:
+    """The 'data' blob of an element written by `set_blob(..., chunked=True)`, None for other elements."""
+    if 'encoding' not in element or 'data' not in element or element['encoding'] != chunked_lz4.ENCODING:
+        return None
+    data = element['data']
+    return data if isinstance(data, bytes) else None
+
+
+def _unwrap_property(prop_p, udm: Optional['UDM'] = None, prop_type: Optional[UdmType] = None) -> PropertyValue:
+    if udm is not None and udm._recorder is not None:
+        if prop_type is None:
+            prop_type = udm_get_property_type(prop_p, nullptr)
+        udm._recorder.record(prop_p, prop_type)
+    if prop_type is None:
+        prop_type = udm_get_property_type(prop_p, nullptr)
     unwprapper = _prop_unwrappers[prop_type]
     if unwprapper is None:
         return None
+    if prop_type in _container_types:
+        return unwprapper(prop_p, udm)
     return unwprapper(prop_p)
@@ -0,0 +1,106 @@
+import json
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Union
+
+from .properties import _join_path
+from .type_info import UdmType
+from .wrapper import udm_get_property, udm_get_property_path
+
+
+@dataclass
+class AccessRecord:
+    path: str
+    udm_type: UdmType
+    # Item range read from an array, None when only the property itself was looked up
+    start: Optional[int] = None
+    stop: Optional[int] = None
+
+
+@dataclass
+class AccessPlan:
+    """Properties a job accessed, in the order they were first touched.
+
+    Array items are covered by the item range of their array. `unresolved` counts the accessed properties whose
+    native path could not be looked up from the root again, like properties below element array items.
+    """
+    asset_type: Optional[str] = None
+    records: List[AccessRecord] = field(default_factory=list)
+    unresolved: int = 0
+
+    @property
+    def paths(self) -> List[str]:
+        return [record.path for record in self.records]
+
+    def to_json(self):
+        return {'asset_type': self.asset_type, 'unresolved': self.unresolved,
+                'records': [{**asdict(record), 'udm_type': record.udm_type.name} for record in self.records]}
+
+    @classmethod
+    def from_json(cls, data) -> 'AccessPlan':
+        records = [AccessRecord(record['path'], UdmType[record['udm_type']], record.get('start'), record.get('stop'))
+                   for record in data['records']]
+        return cls(data.get('asset_type'), records, data.get('unresolved', 0))
+
+    def save(self, filename: Union[str, Path]):
+        Path(filename).write_text(json.dumps(self.to_json(), indent=1), encoding='utf8')
+
+    @classmethod
+    def load(cls, filename: Union[str, Path]) -> 'AccessPlan':
+        return cls.from_json(json.loads(Path(filename).read_text(encoding='utf8')))
+
+
+class ReplayResult(NamedTuple):
+    """Outcome of `UDM.prefetch_plan`."""
+    values: Dict[str, Any]
+    # Paths of the plan the document does not have
+    skipped: List[str]
+
+
+class AccessRecorder:
+    """Collects the properties unwrapped from one document, see `UDM.record`."""
+
+    def __init__(self, asset_type: Optional[str] = None, root_p: Optional[int] = None):
+        self._asset_type = asset_type
+        self._root_p = root_p
+        self._lock = threading.Lock()
+        self._records: Dict[str, AccessRecord] = {}
+        self._unresolved: Set[str] = set()
+
+    def _resolves(self, path: str) -> bool:
+        if self._root_p is None:
+            return True
+        prop_p = udm_get_property(self._root_p, path.encode('utf8'))
+        return prop_p is not None and prop_p != 0
+
+    def record(self, prop_p: int, udm_type: UdmType, start: Optional[int] = None, stop: Optional[int] = None):
+        path = _join_path(udm_get_property_path(prop_p).decode('utf8'))
+        if not path:
+            # The root is always there
+            return
+        with self._lock:
+            if path in self._unresolved:
+                return
+            known = path in self._records
+        # Only paths a lookup from the root finds again can be replayed, new ones are checked once
+        if not known and not self._resolves(path):
+            with self._lock:
+                self._unresolved.add(path)
+            return
+        self.record_path(path, udm_type, start, stop)
+
+    def record_path(self, path: str, udm_type: UdmType, start: Optional[int] = None, stop: Optional[int] = None):
+        with self._lock:
+            record = self._records.get(path)
+            if record is None:
+                self._records[path] = AccessRecord(path, UdmType(udm_type), start, stop)
+            elif start is not None:
+                # Ranges of one array are merged into the span covering all of them
+                record.start = start if record.start is None else min(record.start, start)
+                record.stop = stop if record.stop is None else max(record.stop, stop)
+
+    def plan(self) -> AccessPlan:
+        with self._lock:
+            return AccessPlan(self._asset_type, [AccessRecord(**asdict(record)) for record in self._records.values()],
+                              len(self._unresolved))
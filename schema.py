@@ -0,0 +1,265 @@
+import argparse
+import keyword
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from . import UDM
+from .properties import ElementProperty, StructArrayProperty
+from .type_info import UdmType
+from .wrapper import udm_get_property_type
+
+_PYTHON_TYPES = {
+    UdmType.String: 'str',
+    UdmType.Utf8String: 'str',
+    UdmType.Int8: 'int',
+    UdmType.UInt8: 'int',
+    UdmType.Int16: 'int',
+    UdmType.UInt16: 'int',
+    UdmType.Int32: 'int',
+    UdmType.UInt32: 'int',
+    UdmType.Int64: 'int',
+    UdmType.UInt64: 'int',
+    UdmType.Float: 'float',
+    UdmType.Double: 'float',
+    UdmType.Half: 'float',
+    UdmType.Boolean: 'bool',
+    UdmType.Blob: 'bytes',
+    UdmType.BlobLz4: 'bytes',
+}
+
+
+@dataclass
+class ElementSchema:
+    samples: int = 0
+    fields: Dict[str, 'FieldSchema'] = field(default_factory=dict)
+
+
+@dataclass
+class FieldSchema:
+    name: str
+    udm_types: Set[UdmType] = field(default_factory=set)
+    array_types: Set[UdmType] = field(default_factory=set)
+    struct_members: Optional[List[Tuple[str, UdmType]]] = None
+    element: Optional[ElementSchema] = None
+    seen: int = 0
+
+    @property
+    def udm_type(self) -> Optional[UdmType]:
+        return next(iter(self.udm_types)) if len(self.udm_types) == 1 else None
+
+    @property
+    def array_type(self) -> Optional[UdmType]:
+        return next(iter(self.array_types)) if len(self.array_types) == 1 else None
+
+    @property
+    def is_array(self):
+        return bool(self.udm_types) and self.udm_types <= {UdmType.Array, UdmType.ArrayLz4}
+
+
+def infer_element_schema(prop: ElementProperty, schema: Optional[ElementSchema] = None) -> ElementSchema:
+    """Merges the layout of `prop` into `schema`, fields missing from some samples end up optional."""
+    if schema is None:
+        schema = ElementSchema()
+    schema.samples += 1
+    for name in prop:
+        field_schema = schema.fields.get(name)
+        if field_schema is None:
+            field_schema = schema.fields[name] = FieldSchema(name)
+        field_schema.seen += 1
+        udm_type = udm_get_property_type(prop.prop_pointer, name.encode('utf8'))
+        field_schema.udm_types.add(udm_type)
+        if udm_type == UdmType.Element:
+            field_schema.element = infer_element_schema(prop[name], field_schema.element)
+        elif udm_type in (UdmType.Array, UdmType.ArrayLz4):
+            array = prop[name]
+            field_schema.array_types.add(array.array_type)
+            if array.array_type == UdmType.Element:
+                if field_schema.element is None:
+                    field_schema.element = ElementSchema()
+                for item in array:
+                    infer_element_schema(item, field_schema.element)
+            elif isinstance(array, StructArrayProperty):
+                members = list(zip(array._get_struct_member_names(), array._get_struct_member_types()))
+                if field_schema.struct_members is not None and field_schema.struct_members != members:
+                    raise ValueError(f'Struct layout of {array.path!r} differs between samples')
+                field_schema.struct_members = members
+    return schema
+
+
+def infer_schema(files: Iterable[Union[str, Path]], asset_type: str) -> Tuple[ElementSchema, int, int]:
+    """Samples every file of `asset_type` and returns the merged root schema and the seen version range."""
+    schema = ElementSchema()
+    min_version, max_version = None, None
+    for filename in files:
+        udm = UDM()
+        if not udm.load(filename):
+            raise ValueError(f'Failed to load UDM file {filename}')
+        try:
+            if udm.asset_type != asset_type:
+                continue
+            version = udm.asset_version
+            min_version = version if min_version is None else min(min_version, version)
+            max_version = version if max_version is None else max(max_version, version)
+            infer_element_schema(udm.root, schema)
+        finally:
+            udm.destroy()
+    if not schema.samples:
+        raise ValueError(f'No files of asset type {asset_type!r} were sampled')
+    return schema, min_version, max_version
+
+
+def _to_snake_case(name: str) -> str:
+    name = re.sub(r'(?<=[a-z0-9])([A-Z])', r'_\1', name).lower()
+    name = re.sub(r'\W', '_', name)
+    if not name or name[0].isdigit() or keyword.iskeyword(name):
+        name = f'_{name}'
+    return name
+
+
+# Names of the generated classmethods, fields are renamed instead of shadowing them
+_RESERVED_ATTRIBUTES = {'from_python', 'load'}
+
+
+def _unique_attribute(name: str, used: Set[str]) -> str:
+    """Appends _2, _3... to attribute names already taken, keys like 'fooBar' and 'foo_bar' both map to foo_bar."""
+    unique_name, index = name, 1
+    while unique_name in used or unique_name in _RESERVED_ATTRIBUTES:
+        index += 1
+        unique_name = f'{name}_{index}'
+    used.add(unique_name)
+    return unique_name
+
+
+def _to_camel_case(name: str) -> str:
+    return ''.join(part[:1].upper() + part[1:] for part in re.split(r'[\W_]+', name) if part)
+
+
+class _LoaderGenerator:
+    def __init__(self):
+        self._classes: List[str] = []
+        self._class_names: Set[str] = set()
+
+    def _unique_class_name(self, name: str) -> str:
+        unique_name, index = name, 1
+        while unique_name in self._class_names:
+            index += 1
+            unique_name = f'{name}{index}'
+        self._class_names.add(unique_name)
+        return unique_name
+
+    def _field_code(self, class_name: str, field_schema: FieldSchema) -> Tuple[str, str]:
+        element = field_schema.element
+        if field_schema.udm_type == UdmType.Element and element is not None:
+            child = self.generate(_child_class_name(class_name, field_schema.name), element)
+            return child, f'{child}.from_python({{value}})'
+        if field_schema.is_array:
+            array_type = field_schema.array_type
+            if array_type == UdmType.Element and element is not None and element.samples:
+                child = self.generate(_child_class_name(class_name, field_schema.name), element)
+                return f'List[{child}]', f'[{child}.from_python(item) for item in {{value}}]'
+            if array_type in (UdmType.String, UdmType.Utf8String):
+                return 'List[str]', '{value}'
+            if array_type is None or array_type in (UdmType.Element, UdmType.Array, UdmType.ArrayLz4):
+                return 'List[Any]', '{value}'
+            return 'np.ndarray', '{value}'
+        udm_type = field_schema.udm_type
+        if udm_type is None:
+            return 'Any', '{value}'
+        if udm_type == UdmType.Element:
+            return 'Dict[str, Any]', '{value}'
+        return _PYTHON_TYPES.get(udm_type, 'np.ndarray'), '{value}'
+
+    def generate(self, class_name: str, schema: ElementSchema, header: str = '') -> str:
+        class_name = self._unique_class_name(class_name)
+        required, optional = [], []
+        attributes: Set[str] = set()
+        for field_schema in schema.fields.values():
+            annotation, converter = self._field_code(class_name, field_schema)
+            attribute = _unique_attribute(_to_snake_case(field_schema.name), attributes)
+            key = repr(field_schema.name)
+            if field_schema.seen < schema.samples:
+                value = converter.format(value=f'data[{key}]')
+                optional.append((attribute, f'Optional[{annotation}]', f'{value} if {key} in data else None'))
+            else:
+                required.append((attribute, annotation, converter.format(value=f'data[{key}]')))
+
+        lines = ['', '', '@dataclass(slots=True)', f'class {class_name}:']
+        if header:
+            lines.append(header)
+        for attribute, annotation, _ in required:
+            lines.append(f'    {attribute}: {annotation}')
+        for attribute, annotation, _ in optional:
+            lines.append(f'    {attribute}: {annotation} = None')
+        lines += ['',
+                  '    @classmethod',
+                  f"    def from_python(cls, data: Dict[str, Any]) -> '{class_name}':",
+                  '        return cls(']
+        for attribute, _, value in required + optional:
+            lines.append(f'            {attribute}={value},')
+        lines += ['        )',
+                  '',
+                  '    @classmethod',
+                  f"    def load(cls, prop) -> '{class_name}':",
+                  '        return cls.from_python(prop.to_python())']
+        self._classes.append('\n'.join(lines))
+        return class_name
+
+    def source(self, asset_type: str) -> str:
+        return '\n'.join([f'# Generated by pragma_udm_wrapper.schema for asset type {asset_type!r}',
+                          'from dataclasses import dataclass',
+                          'from typing import Any, Dict, List, Optional',
+                          '',
+                          'import numpy as np',
+                          *self._classes]) + '\n'
+
+
+def _child_class_name(parent: str, name: str) -> str:
+    return f'{parent}{_to_camel_case(name)}'
+
+
+def generate_loaders(schema: ElementSchema, asset_type: str, min_version: int = 1, max_version: int = 1,
+                     class_name: Optional[str] = None) -> str:
+    """Returns python source with one slotted dataclass per element of `schema`.
+
+    Every class has a `load(prop)` classmethod that materializes the property with a single `to_python()`
+    traversal and fills the whole object tree from the result.
+    """
+    generator = _LoaderGenerator()
+    header = '\n'.join([f'    ASSET_TYPE = {asset_type!r}',
+                        f'    ASSET_VERSION_MIN = {min_version}',
+                        f'    ASSET_VERSION_MAX = {max_version}',
+                        ''])
+    generator.generate(class_name or _to_camel_case(asset_type.lower()), schema, header)
+    return generator.source(asset_type)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m pragma_udm_wrapper.schema',
+                                     description='Infer the schema of UDM assets and generate typed loaders')
+    parser.add_argument('asset_type', help='Asset type to sample, for example PMAT')
+    parser.add_argument('files', nargs='+', type=Path, help='Sample files or directories')
+    parser.add_argument('--pattern', default='*', help='Glob pattern used for directories')
+    parser.add_argument('--class-name', default=None)
+    parser.add_argument('-o', '--output', type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    files = []
+    for path in args.files:
+        if path.is_dir():
+            files.extend(p for p in path.rglob(args.pattern) if p.is_file())
+        else:
+            files.append(path)
+    schema, min_version, max_version = infer_schema(files, args.asset_type)
+    source = generate_loaders(schema, args.asset_type, min_version, max_version, args.class_name)
+    if args.output is None:
+        sys.stdout.write(source)
+    else:
+        args.output.write_text(source, encoding='utf8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
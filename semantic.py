@@ -0,0 +1,62 @@
+import numpy as np
+
+from .type_info import UdmType, udm_to_np
+
+TRANSFORM_DTYPE = np.dtype([('pos', np.float32, (3,)), ('rot', np.float32, (4,))])
+SCALED_TRANSFORM_DTYPE = np.dtype([('pos', np.float32, (3,)), ('rot', np.float32, (4,)), ('scale', np.float32, (3,))])
+
+# Item dtype of the views returned by `semantic_view`, the layout matches the flat `udm_to_np` buffers byte for byte
+semantic_dtypes = {
+    UdmType.Boolean: np.dtype(np.bool_),
+    UdmType.Transform: TRANSFORM_DTYPE,
+    UdmType.ScaledTransform: SCALED_TRANSFORM_DTYPE,
+    UdmType.Mat4: np.dtype((np.float32, (4, 4))),
+    UdmType.Mat3x4: np.dtype((np.float32, (3, 4))),
+}
+
+# Linear value of every 8 bit sRGB level
+_SRGB_TO_LINEAR = np.arange(256, dtype=np.float32) / 255
+_SRGB_TO_LINEAR = np.where(_SRGB_TO_LINEAR <= 0.04045, _SRGB_TO_LINEAR / 12.92,
+                           ((_SRGB_TO_LINEAR + 0.055) / 1.055) ** 2.4).astype(np.float32)
+
+
+def semantic_view(array: np.ndarray, udm_type: UdmType) -> np.ndarray:
+    """Reinterprets a flat buffer of `udm_type` items without copying.
+
+    Transforms become structured arrays with pos/rot(/scale) fields, matrices (N, 4, 4) or (N, 3, 4) arrays and
+    booleans np.bool_. Other types are returned unchanged. A 1D buffer of a compound type is treated as one item.
+    """
+    dtype = semantic_dtypes.get(udm_type)
+    if dtype is None:
+        return array
+    if udm_type == UdmType.Boolean:
+        return array.view(np.bool_)
+    data_type, data_len = udm_to_np[udm_type]
+    flat = np.ascontiguousarray(array, data_type).reshape(-1, data_len)
+    if dtype.subdtype is not None:
+        res = flat.reshape((len(flat),) + dtype.shape)
+    else:
+        res = flat.view(dtype).reshape(len(flat))
+    return res[0] if array.ndim == 1 else res
+
+
+def half_to_float32(array: np.ndarray) -> np.ndarray:
+    """Converts float16 values, or their raw uint16 bits, to float32."""
+    array = np.asarray(array)
+    if array.dtype == np.uint16:
+        array = array.view(np.float16)
+    return array.astype(np.float32)
+
+
+def srgb_to_linear(array: np.ndarray, alpha: bool = True) -> np.ndarray:
+    """Converts 8 bit sRGB colors to linear float32 through a lookup table.
+
+    With `alpha`, a fourth channel is treated as linear coverage and only scaled to 0..1.
+    """
+    array = np.asarray(array)
+    if array.dtype != np.uint8:
+        raise ValueError(f'Expected uint8 sRGB colors, got {array.dtype}')
+    res = _SRGB_TO_LINEAR[array]
+    if alpha and array.ndim and array.shape[-1] == 4:
+        res[..., 3] = array[..., 3] / np.float32(255)
+    return res
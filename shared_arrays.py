@@ -0,0 +1,87 @@
+from multiprocessing import shared_memory
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+from .iproperty import IProperty
+from .properties import ArrayProperty, ElementProperty, StructArrayProperty, ValueArrayProperty
+
+# Segments attached by this process, kept open so the returned views stay valid
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+
+
+class SharedArray(NamedTuple):
+    """Picklable reference to an array stored in a shared memory segment."""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: object
+
+    def attach(self) -> np.ndarray:
+        """Maps the segment into this process (once) and returns a read-only view of the array."""
+        segment = _attached.get(self.name)
+        if segment is None:
+            segment = shared_memory.SharedMemory(self.name)
+            _attached[self.name] = segment
+        dtype = np.lib.format.descr_to_dtype(self.dtype)
+        array = np.ndarray(self.shape, dtype, segment.buf)
+        array.flags.writeable = False
+        return array
+
+
+def detach_all():
+    """Closes every segment attached by this process, views returned by `SharedArray.attach` become invalid."""
+    for segment in _attached.values():
+        segment.close()
+    _attached.clear()
+
+
+class SharedArrayPool:
+    """Owns the shared memory segments created for arrays handed to worker processes.
+
+    Segments are unlinked when the pool is closed, use it as a context manager around the executor.
+    """
+
+    def __init__(self):
+        self._segments: List[shared_memory.SharedMemory] = []
+
+    def share(self, array: np.ndarray) -> SharedArray:
+        """Copies `array` into a new segment once, workers attach to it without copying."""
+        array = np.ascontiguousarray(array)
+        segment = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        self._segments.append(segment)
+        np.ndarray(array.shape, array.dtype, segment.buf)[...] = array
+        return SharedArray(segment.name, array.shape, np.lib.format.dtype_to_descr(array.dtype))
+
+    def share_property(self, prop: ArrayProperty) -> SharedArray:
+        return self.share(prop.value())
+
+    def share_tree(self, prop: IProperty, min_bytes: int = 0) -> Dict[str, SharedArray]:
+        """Shares every value and struct array below `prop` of at least `min_bytes`, keyed by its '/' path."""
+        shared = {}
+        self._share_tree(prop, '', min_bytes, shared)
+        return shared
+
+    def _share_tree(self, value, path: str, min_bytes: int, shared: Dict[str, SharedArray]):
+        if isinstance(value, ElementProperty):
+            prefix = f'{path}/' if path else ''
+            for name, child in value.items():
+                self._share_tree(child, prefix + name, min_bytes, shared)
+        elif isinstance(value, (ValueArrayProperty, StructArrayProperty)):
+            array = value.value()
+            if array.nbytes >= min_bytes:
+                shared[path] = self.share(array)
+        elif isinstance(value, ArrayProperty):
+            for index, item in enumerate(value):
+                self._share_tree(item, f'{path}/{index}', min_bytes, shared)
+
+    def close(self):
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments.clear()
+
+    def __enter__(self) -> 'SharedArrayPool':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,195 @@
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from pragma_udm_wrapper import UDM, UdmType
+from pragma_udm_wrapper.properties import ArrayProperty, ElementProperty, ValueArrayProperty, StructArrayProperty
+from pragma_udm_wrapper.writer import (
+    write_value, write_array, write_struct_array, write_string_array, write_blob, write_python
+)
+
+STRUCT_DTYPE = np.dtype([('pos', np.float32, (3,)), ('rot', np.float32, (4,))])
+
+
+def _generate_deep(root, size, rng):
+    path = 'deep'
+    for depth in range(size):
+        path += f'/level{depth}'
+        write_value(root, f'{path}/value', UdmType.Float, rng.random())
+        write_value(root, f'{path}/name', UdmType.String, f'level{depth}')
+
+
+def _generate_wide(root, size, rng):
+    for i in range(size):
+        write_value(root, f'wide/child{i}', UdmType.Int32, i)
+
+
+def _generate_value_array(root, size, rng):
+    write_array(root, 'values', UdmType.Vector3, rng.random((size, 3), np.float32))
+    write_array(root, 'valuesLz4', UdmType.Float, rng.random(size, np.float32), compressed=True)
+
+
+def _generate_struct_array(root, size, rng):
+    data = np.zeros(size, STRUCT_DTYPE)
+    data['pos'] = rng.random((size, 3), np.float32)
+    data['rot'] = rng.random((size, 4), np.float32)
+    write_struct_array(root, 'structs', data)
+
+
+def _generate_string_array(root, size, rng):
+    write_string_array(root, 'strings', [f'models/props/item_{i}' for i in range(size)])
+
+
+def _generate_blob(root, size, rng):
+    write_blob(root, 'blob', rng.integers(0, 255, size * 16, np.uint8))
+
+
+def _generate_element_array(root, size, rng):
+    write_python(root, 'clips', [{'timeFrame': {'start': i * 0.5}, 'name': f'clip{i}'} for i in range(size)])
+
+
+GENERATORS = {
+    'deep': _generate_deep,
+    'wide': _generate_wide,
+    'value_array': _generate_value_array,
+    'struct_array': _generate_struct_array,
+    'string_array': _generate_string_array,
+    'blob': _generate_blob,
+    'element_array': _generate_element_array,
+}
+
+
+def generate(shape: str, size: int, seed: int = 0) -> UDM:
+    """Creates a synthetic document of the given shape, `size` scales the item count of that shape."""
+    udm = UDM()
+    if not udm.create('BENCH', 1):
+        raise RuntimeError('Failed to create UDM document')
+    GENERATORS[shape](udm.root.prop_pointer, size, np.random.default_rng(seed))
+    return udm
+
+
+def walk(value, paths, path='', record=True):
+    """Reads every value below `value` and collects the paths that can be looked up from the root."""
+    if isinstance(value, ElementProperty):
+        for name, child in value.items():
+            walk(child, paths, f'{path}/{name}' if path else name, record)
+        return
+    if isinstance(value, (ValueArrayProperty, StructArrayProperty)):
+        value.value()
+    elif isinstance(value, ArrayProperty):
+        for item in value:
+            walk(item, paths, record=False)
+    if record:
+        paths.append(path)
+
+
+def _measure(results, name, shape, size, repeat, func, ops=1, nbytes=0):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    seconds = min(timings)
+    results.append({
+        'benchmark': name, 'shape': shape, 'size': size, 'seconds': seconds, 'ops': ops,
+        'ops_per_second': ops / seconds if seconds else None,
+        'megabytes_per_second': nbytes / (1024 * 1024) / seconds if nbytes and seconds else None,
+    })
+
+
+def run(shapes, size, repeat, lookups, work_dir: Path):
+    results = []
+    for shape in shapes:
+        udm = generate(shape, size)
+        filename = work_dir / f'{shape}.udm_b'
+
+        def save():
+            if not udm.save(filename):
+                raise RuntimeError(f'Failed to save {filename}')
+
+        _measure(results, 'save', shape, size, repeat, save)
+        udm.destroy()
+        nbytes = filename.stat().st_size
+
+        def load():
+            loaded = UDM()
+            if not loaded.load(filename):
+                raise RuntimeError(f'Failed to load {filename}')
+            loaded.destroy()
+
+        _measure(results, 'load', shape, size, repeat, load, nbytes=nbytes)
+
+        udm = UDM()
+        udm.load(filename)
+        root = udm.root
+        leaf_paths = []
+
+        def traverse():
+            leaf_paths.clear()
+            walk(root, leaf_paths)
+
+        _measure(results, 'traversal', shape, size, repeat, traverse)
+        sample = random.Random(0).choices(leaf_paths, k=lookups) if leaf_paths else []
+        _measure(results, 'random_lookup', shape, size, repeat, lambda: [root[path] for path in sample],
+                 ops=len(sample))
+        arrays = [root[path] for path in leaf_paths]
+        arrays = [prop for prop in arrays if isinstance(prop, (ValueArrayProperty, StructArrayProperty))]
+        if arrays:
+            array_bytes = sum(prop.value().nbytes for prop in arrays)
+            _measure(results, 'array_read', shape, size, repeat, lambda: [prop.value() for prop in arrays],
+                     ops=len(arrays), nbytes=array_bytes)
+        _measure(results, 'to_json', shape, size, repeat, root.to_json, nbytes=nbytes)
+        del root, arrays
+        udm.destroy()
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=Path(__file__).parent,
+                                       stderr=subprocess.DEVNULL).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current):
+    baseline = {(r['benchmark'], r['shape'], r['size']): r['seconds'] for r in previous['results']}
+    for result in current['results']:
+        key = (result['benchmark'], result['shape'], result['size'])
+        if key in baseline and result['seconds']:
+            print(f'{result["benchmark"]:>14} {result["shape"]:>14} {result["size"]:>8} '
+                  f'{baseline[key] / result["seconds"]:6.2f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='UDM wrapper benchmarks on synthetic documents')
+    parser.add_argument('--shapes', nargs='+', choices=sorted(GENERATORS), default=sorted(GENERATORS))
+    parser.add_argument('--size', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--lookups', type=int, default=1000)
+    parser.add_argument('-o', '--output', type=Path, default=None, help='Write results as JSON')
+    parser.add_argument('--compare', type=Path, default=None, help='Previous JSON results to compare against')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = {
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': run(args.shapes, args.size, args.repeat, args.lookups, Path(tmp)),
+        }
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=1), encoding='utf8')
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    if args.compare is not None:
+        compare(json.loads(args.compare.read_text(encoding='utf8')), report)
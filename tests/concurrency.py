@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from pragma_udm_wrapper import UDM
+from pragma_udm_wrapper.iproperty import IProperty
+
+from .benchmark import generate, walk
+
+
+def _load(shape, size, work_dir: Path) -> UDM:
+    udm = generate(shape, size)
+    filename = work_dir / f'{shape}.udm_b'
+    if not udm.save(filename):
+        raise RuntimeError(f'Failed to save {filename}')
+    udm.destroy()
+    udm = UDM()
+    if not udm.load(filename):
+        raise RuntimeError(f'Failed to load {filename}')
+    return udm
+
+
+def _read(root, path):
+    value = root[path]
+    return value.to_python() if isinstance(value, IProperty) else value
+
+
+def stress(shapes, size, threads, seconds, work_dir: Path) -> int:
+    """Reads every leaf from many threads at once, with one thread writing, and checks results against a serial read."""
+    failures = 0
+    for shape in shapes:
+        udm = _load(shape, size, work_dir)
+        root = udm.root
+        paths = []
+        walk(root, paths)
+        expected = {path: _read(root, path) for path in paths}
+        # Shared wrappers exercise the lazy caches, fresh lookups exercise the native side
+        shared = {path: root[path] for path in paths}
+        errors = []
+        stop = threading.Event()
+
+        def reader(seed):
+            rng = np.random.default_rng(seed)
+            while not stop.is_set():
+                path = paths[rng.integers(len(paths))]
+                try:
+                    value = shared[path]
+                    value = value.to_python() if isinstance(value, IProperty) else value
+                    np.testing.assert_equal(value, expected[path])
+                    np.testing.assert_equal(_read(root, path), expected[path])
+                except Exception as ex:
+                    errors.append(f'{path}: {type(ex).__name__}: {ex}')
+                    return
+
+        def writer():
+            counter = 0
+            while not stop.is_set():
+                root[f'stress/counter{counter % 16}'] = counter
+                counter += 1
+                time.sleep(0.001)
+
+        workers = [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+        workers.append(threading.Thread(target=writer))
+        for worker in workers:
+            worker.start()
+        time.sleep(seconds)
+        stop.set()
+        for worker in workers:
+            worker.join()
+        del root, shared
+        udm.destroy()
+        print(f'{shape:>14}: {len(errors)} errors', file=sys.stderr)
+        for error in errors[:10]:
+            print(f'    {error}', file=sys.stderr)
+        failures += len(errors)
+    return failures
+
+
+def scaling(shapes, size, thread_counts, repeat, work_dir: Path):
+    """Times reading every leaf of a document split across thread pools of different sizes."""
+    results = []
+    for shape in shapes:
+        udm = _load(shape, size, work_dir)
+        root = udm.root
+        paths = []
+        walk(root, paths)
+        baseline = None
+        for thread_count in thread_counts:
+            timings = []
+            for _ in range(repeat):
+                with ThreadPoolExecutor(thread_count) as executor:
+                    start = time.perf_counter()
+                    list(executor.map(lambda path: _read(root, path), paths))
+                    timings.append(time.perf_counter() - start)
+            seconds = min(timings)
+            baseline = baseline or seconds
+            results.append({'shape': shape, 'size': size, 'threads': thread_count, 'seconds': seconds,
+                            'speedup': baseline / seconds if seconds else None})
+            print(f'{shape:>14} {thread_count:>3} threads {seconds:8.4f}s {baseline / seconds:6.2f}x', file=sys.stderr)
+        del root
+        udm.destroy()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m pragma_udm_wrapper.tests.concurrency',
+                                     description='Concurrent read stress test and thread scaling benchmark')
+    parser.add_argument('--shapes', nargs='+', default=['value_array', 'struct_array', 'element_array', 'wide'])
+    parser.add_argument('--size', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('-o', '--output', type=Path, default=None, help='Write scaling results as JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        failed = stress(args.shapes, args.size, args.threads, args.seconds, Path(tmp))
+        thread_counts = sorted({1, 2, 4, 8, args.threads})
+        report = scaling(args.shapes, args.size, thread_counts, args.repeat, Path(tmp))
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=1), encoding='utf8')
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,13 @@
+import numpy as np
+import pytest
+
+from pragma_udm_wrapper import UDM
+
+
+@pytest.fixture
+def document():
+    udm = UDM.from_python('TEST', 1, {'mesh': {'positions': np.arange(12, dtype=np.float32).reshape(4, 3)},
+                                      'name': 'test',
+                                      'clips': [{'name': 'a'}, {'name': 'b'}, {'name': 'c'}]})
+    yield udm
+    udm.destroy()
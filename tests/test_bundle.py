@@ -0,0 +1,56 @@
+import struct
+
+import pytest
+
+from pragma_udm_wrapper.bundle import BUNDLE_IDENTIFIER, BUNDLE_VERSION, UdmBundle, append_bundle, build_bundle
+
+
+def _binary_file(path, payload: bytes):
+    # Binary files are copied into the bundle without being parsed
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'UDMB' + payload)
+    return path
+
+
+def test_header_and_index(tmp_path):
+    files = [_binary_file(tmp_path / 'a' / 'first.udm_b', b'1'), _binary_file(tmp_path / 'b' / 'second.udm_b', b'22')]
+    bundle_path = tmp_path / 'assets.udmbundle'
+    build_bundle(bundle_path, files, root=tmp_path, max_workers=1)
+
+    identifier, version, _, index_offset, index_size = struct.unpack_from('<8sIIQQ', bundle_path.read_bytes())
+    assert (identifier, version) == (BUNDLE_IDENTIFIER, BUNDLE_VERSION)
+    assert index_offset + index_size == bundle_path.stat().st_size
+    with UdmBundle(bundle_path) as bundle:
+        assert bundle.names() == ['a/first.udm_b', 'b/second.udm_b']
+        assert bytes(bundle.read_bytes('a/first.udm_b')) == b'UDMB1'
+        assert bytes(bundle.read_bytes('b/second.udm_b')) == b'UDMB22'
+        with pytest.raises(KeyError):
+            bundle.entry('missing')
+
+
+def test_append_replaces_entries(tmp_path):
+    bundle_path = tmp_path / 'assets.udmbundle'
+    build_bundle(bundle_path, [_binary_file(tmp_path / 'old' / 'first.udm_b', b'old')], max_workers=1)
+    append_bundle(bundle_path, [_binary_file(tmp_path / 'new' / 'first.udm_b', b'new'),
+                                _binary_file(tmp_path / 'new' / 'second.udm_b', b'2')], max_workers=1)
+    with UdmBundle(bundle_path) as bundle:
+        assert len(bundle) == 2
+        assert bytes(bundle.read_bytes('first.udm_b')) == b'UDMBnew'
+
+
+def test_duplicate_names(tmp_path):
+    files = [_binary_file(tmp_path / 'a' / 'same.udm_b', b'1'), _binary_file(tmp_path / 'b' / 'same.udm_b', b'2')]
+    with pytest.raises(ValueError):
+        build_bundle(tmp_path / 'assets.udmbundle', files, max_workers=1)
+    assert not (tmp_path / 'assets.udmbundle').exists()
+    build_bundle(tmp_path / 'assets.udmbundle', files, root=tmp_path, max_workers=1)
+
+
+def test_not_a_bundle(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        UdmBundle(path)
+    path.write_bytes(b'\0')
+    with pytest.raises(ValueError):
+        UdmBundle(path)
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from pragma_udm_wrapper import UDM
+from pragma_udm_wrapper.catalog import AssetCatalog
+
+
+def _write(path, name, material='metal'):
+    udm = UDM.from_python('PMDL', 1, {'name': name, 'material': material})
+    try:
+        assert udm.save(path, binary=False)
+    finally:
+        udm.destroy()
+
+
+@pytest.fixture
+def assets(tmp_path):
+    root = tmp_path / 'assets'
+    root.mkdir()
+    _write(root / 'a.pmdl', 'a')
+    _write(root / 'b.pmdl', 'b', 'wood')
+    return root
+
+
+def test_scan_and_key_lookup(tmp_path, assets):
+    with AssetCatalog(tmp_path / 'catalog.db', ['material']) as catalog:
+        result = catalog.scan(assets, max_workers=1)
+        assert (result.indexed, result.unchanged, result.removed, result.failed) == (2, 0, 0, 0)
+        assert [entry.path for entry in catalog.assets('PMDL')] == [(assets / 'a.pmdl').resolve().as_posix(),
+                                                                    (assets / 'b.pmdl').resolve().as_posix()]
+        assert catalog.get(assets / 'a.pmdl').asset_version == 1
+        assert catalog.keys(assets / 'b.pmdl') == {'material': 'wood'}
+        assert catalog.find_by_value('wood') == [((assets / 'b.pmdl').resolve().as_posix(), 'material')]
+
+
+def test_rescan_only_indexes_changed_files(tmp_path, assets):
+    with AssetCatalog(tmp_path / 'catalog.db', ['material']) as catalog:
+        catalog.scan(assets, max_workers=1)
+        _write(assets / 'b.pmdl', 'b', 'stone')
+        stat = (assets / 'b.pmdl').stat()
+        os.utime(assets / 'b.pmdl', ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        result = catalog.scan(assets, max_workers=1)
+        assert (result.indexed, result.unchanged) == (1, 1)
+        assert catalog.find_by_value('stone') == [((assets / 'b.pmdl').resolve().as_posix(), 'material')]
+        assert catalog.find_by_value('wood') == []
+
+
+def test_removed_files_are_dropped(tmp_path, assets):
+    with AssetCatalog(tmp_path / 'catalog.db', ['material']) as catalog:
+        catalog.scan(assets, max_workers=1)
+        (assets / 'a.pmdl').unlink()
+        result = catalog.scan(assets, max_workers=1)
+        assert (result.indexed, result.unchanged, result.removed) == (0, 1, 1)
+        assert catalog.get(assets / 'a.pmdl') is None
+        assert catalog.keys(assets / 'a.pmdl') == {}
+
+
+def test_other_key_paths_keep_entries_until_rescan(tmp_path, assets):
+    with AssetCatalog(tmp_path / 'catalog.db', ['material']) as catalog:
+        catalog.scan(assets, max_workers=1)
+    with AssetCatalog(tmp_path / 'catalog.db') as catalog:
+        assert len(catalog.assets()) == 2
+        assert catalog.keys(assets / 'a.pmdl') == {'material': 'metal'}
+        assert catalog.scan(assets, max_workers=1).indexed == 2
+        assert catalog.keys(assets / 'a.pmdl') == {}
+        assert catalog.scan(assets, max_workers=1).unchanged == 2
@@ -0,0 +1,55 @@
+import struct
+
+import numpy as np
+import pytest
+
+from pragma_udm_wrapper import chunked_lz4
+
+pytestmark = pytest.mark.skipif(not chunked_lz4.available(), reason='requires the lz4 package')
+
+
+def _payload(size):
+    return np.arange(size, dtype=np.uint8).tobytes()
+
+
+@pytest.mark.parametrize('size', [0, 1, 4096, 4097, 3 * 4096 + 17])
+def test_round_trip(size):
+    data = _payload(size)
+    compressed = chunked_lz4.compress(data, chunk_size=4096, max_workers=2)
+    assert chunked_lz4.is_chunked(compressed)
+    assert chunked_lz4.chunked_size(compressed) == size
+    assert chunked_lz4.decompress(compressed, max_workers=2) == data
+
+
+def test_framing():
+    compressed = chunked_lz4.compress(_payload(10000), chunk_size=4096)
+    identifier, version, chunk_count, chunk_size, size = struct.unpack_from('<8sIIQQ', compressed)
+    assert (identifier, version, chunk_count, chunk_size, size) == (b'UDMLZ4C\0', 1, 3, 4096, 10000)
+    sizes = struct.unpack_from('<3Q', compressed, 32)
+    assert 32 + 24 + sum(sizes) == len(compressed)
+
+
+def test_plain_data_with_the_identifier_is_not_chunked():
+    assert not chunked_lz4.is_chunked(b'UDMLZ4C\0')
+    assert not chunked_lz4.is_chunked(b'UDMLZ4C\0' + bytes(100))
+    truncated = chunked_lz4.compress(_payload(10000), chunk_size=4096)[:-1]
+    assert not chunked_lz4.is_chunked(truncated)
+    with pytest.raises(ValueError):
+        chunked_lz4.decompress(truncated)
+
+
+def test_set_blob_marks_chunked_payloads():
+    from pragma_udm_wrapper import UDM
+
+    udm = UDM.from_python('TEST', 1, {})
+    try:
+        data = _payload(10000)
+        udm.root.set_blob('plain', b'UDMLZ4C\0' + data, compress=False)
+        udm.root.set_blob('native', data)
+        udm.root.set_blob('chunked', data, chunked=True)
+        assert udm.root.get_blob('plain') == b'UDMLZ4C\0' + data
+        assert udm.root.get_blob('native') == data
+        assert udm.root['chunked']['encoding'] == chunked_lz4.ENCODING
+        assert udm.root.get_blob('chunked') == data
+    finally:
+        udm.destroy()
@@ -0,0 +1,19 @@
+from pragma_udm_wrapper.convert import collect_jobs, convert_file, convert_tree
+
+
+def test_missing_source_fails_its_result(tmp_path):
+    result = convert_file(tmp_path / 'missing.pmat', tmp_path / 'out' / 'missing.pmat_b')
+    assert not result.skipped
+    assert result.error.startswith('FileNotFoundError')
+    assert not (tmp_path / 'out').exists()
+
+
+def test_removed_source_does_not_stop_the_tree(tmp_path):
+    source = tmp_path / 'source'
+    source.mkdir()
+    (source / 'removed.pmat').write_text('"assetType" "PMAT"\n')
+    jobs = collect_jobs(source, tmp_path / 'target')
+    (source / 'removed.pmat').unlink()
+    stats = convert_tree(jobs, max_workers=1)
+    assert stats.failed == 1 and stats.converted == 0
+    assert stats.errors[(source / 'removed.pmat').as_posix()].startswith('FileNotFoundError')
@@ -0,0 +1,50 @@
+import numpy as np
+
+from pragma_udm_wrapper import UDM, diff as diff_module
+from pragma_udm_wrapper.diff import DiffEntry, diff, diff_trees, hash_tree
+
+
+def _data():
+    return {'mesh': {'positions': np.arange(12, dtype=np.float32), 'bones': [{'name': 'root'}, {'name': 'arm'}]},
+            'name': 'test', 'scale': 1.0}
+
+
+def test_changed_added_and_removed_paths():
+    new_data = _data()
+    new_data['mesh']['bones'][1]['name'] = 'leg'
+    new_data['name'] = 'renamed'
+    del new_data['scale']
+    new_data['extra'] = 1
+    old = UDM.from_python('TEST', 1, _data())
+    new = UDM.from_python('TEST', 1, new_data)
+    try:
+        expected = [DiffEntry('changed', 'mesh/bones/1/name'), DiffEntry('changed', 'name'),
+                    DiffEntry('removed', 'scale'), DiffEntry('added', 'extra')]
+        assert diff(old.root, new.root) == expected
+        assert diff_trees(hash_tree(old.root), hash_tree(new.root)) == expected
+        assert diff(old.root, old.root) == []
+    finally:
+        old.destroy()
+        new.destroy()
+
+
+def test_identical_subtrees_are_skipped(monkeypatch):
+    new_data = _data()
+    new_data['name'] = 'renamed'
+    old = UDM.from_python('TEST', 1, _data())
+    new = UDM.from_python('TEST', 1, new_data)
+    try:
+        expanded = []
+        children = diff_module._children
+
+        def record(value):
+            expanded.append(value)
+            return children(value)
+
+        monkeypatch.setattr(diff_module, '_children', record)
+        assert diff(old.root, new.root) == [DiffEntry('changed', 'name')]
+        # Only both roots are expanded, 'mesh' has the same fingerprint on both sides
+        assert len(expanded) == 2
+    finally:
+        old.destroy()
+        new.destroy()
@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pytest
+
+from pragma_udm_wrapper import UDM
+from pragma_udm_wrapper.disk_cache import DecodedAsset, DecodedAssetCache
+
+
+def _asset(size=1024):
+    return DecodedAsset('TEST', 1, {'name': 'test', 'values': np.arange(size, dtype=np.float32),
+                                    'small': np.arange(4, dtype=np.int32), 'blob': b'data'})
+
+
+def _assert_asset(asset, expected):
+    assert (asset.asset_type, asset.asset_version) == (expected.asset_type, expected.asset_version)
+    assert asset.data['name'] == expected.data['name'] and asset.data['blob'] == expected.data['blob']
+    np.testing.assert_array_equal(asset.data['values'], expected.data['values'])
+    np.testing.assert_array_equal(asset.data['small'], expected.data['small'])
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'asset.udm_b'
+    path.write_bytes(b'UDMB' + bytes(16))
+    return path
+
+
+def test_hit_and_miss(tmp_path, source):
+    cache = DecodedAssetCache(tmp_path / 'cache')
+    assert cache.get(source) is None
+    cache.put(source, _asset())
+    asset = cache.get(source)
+    _assert_asset(asset, _asset())
+    assert isinstance(asset.data['values'], np.memmap)
+
+
+def test_changed_file_misses(tmp_path, source):
+    cache = DecodedAssetCache(tmp_path / 'cache')
+    cache.put(source, _asset())
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert cache.get(source) is None
+    cache.put(source, _asset())
+    source.write_bytes(b'UDMB' + bytes(32))
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert cache.get(source) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    first, second = tmp_path / 'first.udm_b', tmp_path / 'second.udm_b'
+    first.write_bytes(b'UDMB1')
+    second.write_bytes(b'UDMB2')
+    # Room for one entry of 4096 floats
+    cache = DecodedAssetCache(tmp_path / 'cache', max_bytes=4096 * 4 + 100)
+    cache.put(first, _asset(4096))
+    manifest = tmp_path / 'cache' / cache.key(first) / 'manifest.json'
+    os.utime(manifest, ns=(0, 0))
+    cache.put(second, _asset(4096))
+    assert cache.get(first) is None
+    assert cache.get(second) is not None
+
+
+def test_load_keys_entries_by_the_parsed_file(tmp_path, monkeypatch):
+    path = tmp_path / 'asset.udm_b'
+    udm = UDM.from_python('TEST', 1, {'value': 1})
+    try:
+        assert udm.save(path)
+    finally:
+        udm.destroy()
+    cache = DecodedAssetCache(tmp_path / 'cache')
+    load = UDM.load
+
+    def load_then_touch(self, filename, *args):
+        res = load(self, filename, *args)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        return res
+
+    monkeypatch.setattr(UDM, 'load', load_then_touch)
+    assert cache.load(path).data == {'value': 1}
+    assert cache.misses == 1
+    # Stored under the key of the file as parsed, the changed file is a miss
+    assert cache.get(path) is None
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from pragma_udm_wrapper import UDM
+from pragma_udm_wrapper.document_cache import UDMCache
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for index in range(3):
+        path = tmp_path / f'{index}.udm'
+        udm = UDM.from_python('TEST', 1, {'index': index})
+        try:
+            assert udm.save(path)
+        finally:
+            udm.destroy()
+        paths.append(path)
+    return paths
+
+
+def _cache(max_documents):
+    return UDMCache(max_documents, lambda udm, filename: 1)
+
+
+def test_least_recently_used_is_evicted(files):
+    cache = _cache(2)
+    cache.get(files[0])
+    cache.get(files[1])
+    cache.get(files[0])
+    cache.get(files[2])
+    assert files[0] in cache and files[1] not in cache and files[2] in cache
+    assert cache.stats.evictions == 1
+
+
+def test_leased_documents_are_pinned(files):
+    cache = _cache(1)
+    with cache.lease(files[0]) as udm:
+        cache.get(files[1])
+        cache.get(files[2])
+        assert files[0] in cache
+        assert udm.root['index'] == 0
+        assert files[1] not in cache and files[2] in cache
+        assert not cache.discard(files[0])
+    # Still over budget, the document is evicted once its lease is released
+    assert files[0] not in cache and files[2] in cache
+    assert cache.discard(files[2])
+    assert len(cache) == 0
+
+
+def test_leases_are_counted(files):
+    cache = _cache(0)
+    cache.acquire(files[0])
+    cache.acquire(files[0])
+    cache.release(files[0])
+    assert files[0] in cache
+    cache.release(files[0])
+    assert files[0] not in cache
+    with pytest.raises(RuntimeError):
+        cache.release(files[0])
+
+
+def test_loads_run_outside_the_cache_lock(files, monkeypatch):
+    cache = _cache(10)
+    cache.get(files[0])
+    loads = []
+    release = threading.Event()
+    load = UDM.load
+
+    def slow_load(self, filename, *args):
+        loads.append(filename)
+        assert release.wait(5)
+        return load(self, filename, *args)
+
+    monkeypatch.setattr(UDM, 'load', slow_load)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(files[1]))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while not loads:
+        time.sleep(0.001)
+    # Served while the other file is still loading
+    assert cache.get(files[0]).root['index'] == 0
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(loads) == 1
+    assert len(results) == 3 and all(udm is results[0] for udm in results)
+    assert cache.stats.misses == 2
+
+
+def test_failed_load_is_not_cached(tmp_path):
+    cache = _cache(10)
+    with pytest.raises(ValueError):
+        cache.get(tmp_path / 'missing.udm')
+    assert not cache._loading and len(cache) == 0
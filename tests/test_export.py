@@ -0,0 +1,45 @@
+import io
+import json
+
+import numpy as np
+
+from pragma_udm_wrapper import UDM
+from pragma_udm_wrapper.export import export_json, export_ndjson
+
+
+def _strict_loads(text):
+    def reject(constant):
+        raise ValueError(f'Non-standard JSON constant {constant}')
+
+    return json.loads(text, parse_constant=reject)
+
+
+def test_non_finite_scalars():
+    for value, expected in ((float('nan'), 'NaN'), (float('inf'), 'Infinity'), (float('-inf'), '-Infinity'),
+                            (1.5, 1.5)):
+        fp = io.StringIO()
+        export_json(value, fp)
+        assert _strict_loads(fp.getvalue()) == expected
+
+
+def test_non_finite_arrays():
+    udm = UDM.from_python('TEST', 1, {'values': np.array([1, np.nan, np.inf, -np.inf], dtype=np.float32),
+                                      'value': float('nan')})
+    try:
+        fp = io.StringIO()
+        export_json(udm.root, fp)
+        assert _strict_loads(fp.getvalue()) == {'values': [1.0, 'NaN', 'Infinity', '-Infinity'], 'value': 'NaN'}
+        fp = io.StringIO()
+        export_ndjson(udm.root, fp)
+        records = [_strict_loads(line) for line in fp.getvalue().splitlines()]
+        assert {'path': 'value', 'value': 'NaN'} in records
+    finally:
+        udm.destroy()
+
+
+def test_to_ascii():
+    udm = UDM.from_python('TEST', 1, {'value': 1})
+    try:
+        assert 'value' in udm.root.to_ascii()
+    finally:
+        udm.destroy()
@@ -0,0 +1,42 @@
+import pytest
+
+from pragma_udm_wrapper.fileutil import chunk_size, write_atomic
+
+
+def test_write_atomic_replaces_the_target(tmp_path):
+    target = tmp_path / 'out.bin'
+    target.write_bytes(b'previous')
+
+    def write(path):
+        path.write_bytes(b'new')
+        return True
+
+    assert write_atomic(target, write, fsync=True)
+    assert target.read_bytes() == b'new'
+    assert [path.name for path in tmp_path.iterdir()] == ['out.bin']
+
+
+def test_failed_write_keeps_the_target(tmp_path):
+    target = tmp_path / 'out.bin'
+    target.write_bytes(b'previous')
+
+    def write(path):
+        path.write_bytes(b'partial')
+        return False
+
+    def fail(path):
+        path.write_bytes(b'partial')
+        raise OSError('disk full')
+
+    assert not write_atomic(target, write)
+    with pytest.raises(OSError):
+        write_atomic(target, fail)
+    assert target.read_bytes() == b'previous'
+    assert [path.name for path in tmp_path.iterdir()] == ['out.bin']
+
+
+def test_chunk_size():
+    assert chunk_size(0, 4) == 1
+    assert chunk_size(160, 4) == 10
+    assert chunk_size(100000, 4) == 64
+    assert chunk_size(100000, 4, 256) == 256
@@ -0,0 +1,34 @@
+from pragma_udm_wrapper import UDM
+from pragma_udm_wrapper.header import UdmHeader, read_header
+
+
+def test_ascii_header(tmp_path):
+    path = tmp_path / 'asset.pmat'
+    path.write_bytes(b'"assetType" "PMAT"\n$uint32 assetVersion 3\n"pbr"\n{\n}\n')
+    assert read_header(path) == UdmHeader('PMAT', 3, path.stat().st_size, False)
+
+
+def test_ascii_header_outside_the_window(tmp_path):
+    path = tmp_path / 'asset.pmat'
+    path.write_bytes(b' ' * 128 + b'$string assetType "PMAT"\n$uint32 assetVersion 3\n')
+    assert read_header(path, window=64) == UdmHeader(None, None, path.stat().st_size, False)
+    assert read_header(path).asset_type == 'PMAT'
+
+
+def test_binary_header(tmp_path):
+    path = tmp_path / 'asset.udm'
+    udm = UDM.from_python('TEST', 7, {'value': 1})
+    try:
+        assert udm.save(path)
+    finally:
+        udm.destroy()
+    assert read_header(path) == UdmHeader('TEST', 7, path.stat().st_size, True)
+
+
+def test_peek_many_reports_unreadable_files(tmp_path):
+    path = tmp_path / 'asset.pmat'
+    path.write_bytes(b'"assetType" "PMAT"\n"assetVersion" 1\n')
+    missing = tmp_path / 'missing.pmat'
+    headers = UDM.peek_many([path, missing], max_workers=2)
+    assert headers[path].asset_type == 'PMAT'
+    assert headers[missing] is None
@@ -0,0 +1,40 @@
+from pragma_udm_wrapper import UDM
+from pragma_udm_wrapper.itype_wrapper import ITypeRootWrapper, ITypeWrapper
+
+
+class _Item(ITypeWrapper):
+    @property
+    def name(self) -> str:
+        return self._prop['name']
+
+
+class _Group(ITypeWrapper):
+    @property
+    def items(self):
+        return self._wrap_array('items', _Item)
+
+
+class _Root(ITypeRootWrapper):
+    ASSET_TYPE = 'TEST'
+
+    @property
+    def group(self) -> _Group:
+        return self._wrap('group', _Group)
+
+
+def test_wrapped_children_are_cached_until_a_write():
+    udm = UDM.from_python('TEST', 1, {'group': {'items': [{'name': 'a'}, {'name': 'b'}]}})
+    try:
+        root = _Root(udm)
+        group = root.group
+        items = group.items
+        assert root.group is group
+        assert group.items is items
+        assert items[1] is items[1]
+        assert [item.name for item in items] == ['a', 'b']
+
+        udm.root['group']['extra'] = 1
+        assert root.group is not group
+        assert root.group.items is not items
+    finally:
+        udm.destroy()
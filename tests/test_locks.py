@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from pragma_udm_wrapper.locks import RWLock, handle_lock
+
+
+def _start(target):
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_readers_share_the_lock():
+    lock = RWLock()
+    inside = threading.Barrier(3, timeout=5)
+
+    def reader():
+        with lock.read():
+            inside.wait()
+
+    threads = [_start(reader) for _ in range(2)]
+    with lock.read():
+        inside.wait()
+    for thread in threads:
+        thread.join(5)
+        assert not thread.is_alive()
+
+
+def test_writer_excludes_readers():
+    lock = RWLock()
+    events = []
+    lock.acquire_write()
+    thread = _start(lambda: (lock.acquire_read(), events.append('read'), lock.release_read()))
+    time.sleep(0.05)
+    assert events == []
+    events.append('write')
+    lock.release_write()
+    thread.join(5)
+    assert events == ['write', 'read']
+
+
+def test_waiting_writer_blocks_new_readers():
+    lock = RWLock()
+    events = []
+    lock.acquire_read()
+    writer = _start(lambda: (lock.acquire_write(), events.append('write'), lock.release_write()))
+    while not lock._writers_waiting:
+        time.sleep(0.001)
+    reader = _start(lambda: (lock.acquire_read(), events.append('read'), lock.release_read()))
+    time.sleep(0.05)
+    # Neither the writer (blocked by this reader) nor the new reader (queued behind the writer) got in
+    assert events == []
+    lock.release_read()
+    writer.join(5)
+    reader.join(5)
+    assert events == ['write', 'read']
+
+
+def test_reentrant_sides():
+    lock = RWLock()
+    with lock.write():
+        with lock.write():
+            with lock.read():
+                pass
+    assert lock._writer is None and lock._readers == 0
+    with lock.read():
+        with lock.read():
+            assert lock._readers == 1
+    assert lock._readers == 0
+
+
+def test_held():
+    lock = RWLock()
+    assert not lock.held()
+    with lock.read():
+        assert lock.held() and not lock.held_write()
+        other = []
+        thread = _start(lambda: other.append(lock.held()))
+        thread.join(5)
+        assert other == [False]
+    with lock.write():
+        assert lock.held() and lock.held_write()
+    assert not lock.held()
+
+
+def test_read_lock_can_not_be_upgraded():
+    lock = RWLock()
+    with lock.read():
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()
+
+
+def test_unbalanced_release():
+    lock = RWLock()
+    with pytest.raises(RuntimeError):
+        lock.release_read()
+    with pytest.raises(RuntimeError):
+        lock.release_write()
+
+
+def test_handle_lock_stripes():
+    assert handle_lock(0x1000) is handle_lock(0x1000)
+    assert handle_lock(0x1000) is not handle_lock(0x1010)
+    assert handle_lock(None) is handle_lock(0)
+    assert handle_lock((1, 'mesh/positions')) is handle_lock((1, 'mesh/positions'))
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from pragma_udm_wrapper import materials
+from pragma_udm_wrapper.materials import MaterialInfo, scan_material, scan_materials
+
+SAMPLE = Path(__file__).with_name('test_material_ascii.pmat')
+
+_SCANNED = {
+    'a.pmat': MaterialInfo('a.pmat', ('pbr', 'unlit'), ('shared', 'a_only'), None),
+    'b.pmat': MaterialInfo('b.pmat', ('pbr',), ('shared',), None),
+    'broken.pmat': MaterialInfo('broken.pmat', (), (), 'Failed to load'),
+}
+
+
+def _scan(path):
+    return _SCANNED[path]
+
+
+def test_graph_keeps_every_shader(monkeypatch):
+    # Worker processes are forked and see the replaced scanner
+    monkeypatch.setattr(materials, 'scan_material', _scan)
+    graph, stats = scan_materials(['a.pmat', 'b.pmat', 'broken.pmat', 'a.pmat'], max_workers=1)
+    assert (stats.files, stats.failed) == (3, 1)
+    assert graph.errors == {'broken.pmat': 'Failed to load'}
+    assert graph.materials == ['a.pmat', 'b.pmat']
+    assert graph.shaders_of('a.pmat') == ['pbr', 'unlit']
+    assert graph.shaders_of('b.pmat') == ['pbr']
+    assert graph.materials_using('shared') == ['a.pmat', 'b.pmat']
+    assert graph.materials_using('a_only') == ['a.pmat']
+    assert len(graph.to_json()['material_shaders']) == 6
+
+
+def test_scan_material():
+    info = scan_material(SAMPLE.as_posix())
+    assert info.error is None
+    assert info.shaders == ('pbr',)
+    assert info.textures == ('models/blast_door', 'pbr/rma_neutral')
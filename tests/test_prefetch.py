@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from pragma_udm_wrapper import UDM, properties
+
+
+def _fail(*args):
+    raise AssertionError('Native lookup or read of a prefetched property')
+
+
+def test_prefetched_lookup_does_not_read(document, monkeypatch):
+    fetched = document.prefetch(['mesh/positions'])
+    mesh = document['mesh']
+    for name in ('udm_get_property', 'udm_get_property_i', 'udm_read_array_property', 'udm_read_property'):
+        monkeypatch.setattr(properties, name, _fail)
+
+    positions = document['mesh/positions']
+    assert positions is fetched['mesh/positions']
+    assert document['/mesh//positions'] is positions
+    assert mesh['positions'] is positions
+    np.testing.assert_equal(positions.to_python(), np.arange(12, dtype=np.float32).reshape(4, 3))
+
+
+def test_write_drops_prefetched_values(document):
+    fetched = document.prefetch(['mesh/positions'])
+    document.root['name'] = 'changed'
+    assert document['mesh/positions'] is not fetched['mesh/positions']
+
+
+def test_missing_paths(document):
+    with pytest.raises(IndexError):
+        document.prefetch(['mesh/normals'])
+    assert list(document.prefetch(['mesh/normals', 'name'], ignore_missing=True)) == ['name']
+
+
+def test_prefetch_while_holding_the_lock(document):
+    with document.transaction():
+        fetched = document.prefetch(['mesh/positions', 'name'], max_workers=2)
+    assert fetched['name'] == 'test'
+    with document.lock.read():
+        assert set(document.prefetch(['mesh/positions'])) == {'mesh/positions'}
+
+
+def test_load_drops_caches_of_the_previous_document(document, tmp_path):
+    other = UDM.from_python('TEST', 1, {'name': 'other'})
+    try:
+        assert other.save(tmp_path / 'other.udm_b')
+    finally:
+        other.destroy()
+    document.prefetch(['name'])
+    fingerprint = document.root.fingerprint()
+    assert document.load(tmp_path / 'other.udm_b')
+    assert document['name'] == 'other'
+    assert document.root.fingerprint() != fingerprint
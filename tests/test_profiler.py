@@ -0,0 +1,25 @@
+import numpy as np
+
+from pragma_udm_wrapper import UDM
+from pragma_udm_wrapper.profiler import profile, top
+
+
+def test_sizes_are_accounted_per_path():
+    udm = UDM.from_python('TEST', 1, {'mesh': {'positions': np.arange(10, dtype=np.float32), 'name': 'ab'},
+                                      'items': [{'v': 1}, {'v': 2}], 'count': 1})
+    try:
+        stats = profile(udm.root)
+        positions = stats['mesh/positions']
+        assert (positions.nodes, positions.array_elements, positions.bytes) == (1, 10, 40)
+        assert stats['mesh/name'].bytes == 2
+        assert (stats['mesh'].nodes, stats['mesh'].bytes) == (3, 42)
+        assert (stats['items/*/v'].nodes, stats['items/*/v'].bytes) == (2, 8)
+        assert (stats['items'].nodes, stats['items'].array_elements, stats['items'].bytes) == (5, 2, 8)
+        assert (stats[''].nodes, stats[''].bytes) == (10, 54)
+        assert [row.path for row in top(stats, 2)] == ['', 'mesh']
+
+        folded = profile(udm.root, max_depth=1)
+        assert 'items/*' not in folded
+        assert (folded['items'].nodes, folded['items'].bytes) == (5, 8)
+    finally:
+        udm.destroy()
@@ -0,0 +1,96 @@
+import threading
+
+import numpy as np
+import pytest
+
+from pragma_udm_wrapper import UDM, UdmType
+
+
+def test_compressed_array_read_through_separate_wrappers():
+    values = np.arange(3 * 100000, dtype=np.float32).reshape(-1, 3)
+    udm = UDM.from_python('TEST', 1, {'values': values}, types={'values': UdmType.ArrayLz4})
+    try:
+        # Every lookup returns a wrapper with its own handle of the same native property
+        wrappers = [udm['values'] for _ in range(8)]
+        start = threading.Barrier(len(wrappers), timeout=5)
+        results = [None] * len(wrappers)
+
+        def read(index):
+            start.wait()
+            results[index] = wrappers[index].to_python()
+
+        threads = [threading.Thread(target=read, args=(index,)) for index in range(len(wrappers))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        for result in results:
+            np.testing.assert_array_equal(result, values)
+    finally:
+        udm.destroy()
+
+
+def test_writes_refresh_buffers_of_other_wrappers():
+    udm = UDM.from_python('TEST', 1, {'values': np.zeros(4, dtype=np.int32)})
+    try:
+        reader = udm['values']
+        assert reader.to_python().tolist() == [0, 0, 0, 0]
+        udm['values'][1] = 5
+        assert reader.to_python().tolist() == [0, 5, 0, 0]
+        with udm.transaction():
+            udm['values'][2:4] = [6, 7]
+        assert reader[3] == 7
+    finally:
+        udm.destroy()
+
+
+def test_columns():
+    items = [{'time': 0.5, 'frame': 1, 'name': 'a', 'flag': True, 'pos': np.array([1, 2, 3], np.float32),
+              'meta': {'tag': 'x'}},
+             {'time': 1.5, 'frame': 2, 'flag': False},
+             {'time': 2.5, 'name': 'c', 'pos': np.array([4, 5, 6], np.float32)}]
+    udm = UDM.from_python('TEST', 1, {'items': items, 'values': np.zeros(3, np.float32)})
+    try:
+        columns = udm['items'].columns(['time', 'frame', 'name', 'flag', 'pos', 'meta', 'meta/tag', 'missing'])
+        time = columns['time']
+        assert time.udm_type == UdmType.Float and time.values.dtype == np.float32
+        np.testing.assert_array_equal(time.values, [0.5, 1.5, 2.5])
+        assert time.mask.all()
+        frame = columns['frame']
+        assert frame.udm_type == UdmType.Int32 and frame.values.tolist() == [1, 2, 0]
+        assert frame.mask.tolist() == [True, True, False]
+        assert columns['name'].values == ['a', None, 'c']
+        assert columns['flag'].values.dtype == np.bool_ and columns['flag'].values.tolist() == [True, False, False]
+        pos = columns['pos']
+        assert pos.values.shape == (3, 3)
+        np.testing.assert_array_equal(pos.values[[0, 2]], [[1, 2, 3], [4, 5, 6]])
+        assert pos.mask.tolist() == [True, False, True]
+        assert columns['meta'].udm_type == UdmType.Element
+        assert columns['meta'].values[0].to_python() == {'tag': 'x'}
+        assert columns['meta/tag'].values == ['x', None, None]
+        missing = columns['missing']
+        assert missing.udm_type is None and missing.values == [None] * 3 and not missing.mask.any()
+        with pytest.raises(ValueError):
+            udm['values'].columns(['time'])
+    finally:
+        udm.destroy()
+
+
+def test_children_are_cached_until_a_write():
+    udm = UDM.from_python('TEST', 1, {'mesh': {'name': 'a'}})
+    other = UDM.from_python('TEST', 1, {'name': 'b'})
+    try:
+        mesh = udm['mesh']
+        children = mesh.children()
+        assert mesh.children() is children
+        other.root['extra'] = 1
+        assert mesh.children() is children
+
+        udm['mesh']['count'] = 1
+        children = mesh.children()
+        assert children.names == ['name', 'count']
+        assert children.types[1] == UdmType.Int32
+        assert mesh['count'] == 1
+    finally:
+        udm.destroy()
+        other.destroy()
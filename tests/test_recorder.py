@@ -0,0 +1,43 @@
+import numpy as np
+
+from pragma_udm_wrapper import UDM, AccessPlan
+
+
+def test_recorded_paths_resolve(document):
+    with document.record() as recorder:
+        document['mesh/positions'][1:3]
+        document['clips'][2]['name']
+        document['clips'][0]
+    plan = recorder.plan()
+    records = {record.path: record for record in plan.records}
+    assert (records['mesh/positions'].start, records['mesh/positions'].stop) == (1, 3)
+    # Element array items are covered by the range of their array
+    assert (records['clips'].start, records['clips'].stop) == (0, 3)
+    for path in plan.paths:
+        assert path in document.root
+
+
+def test_replay_reports_skipped_paths(document, tmp_path):
+    with document.record() as recorder:
+        document['mesh/positions'].to_python()
+        document['clips'][1]
+    recorder.plan().save(tmp_path / 'plan.json')
+    plan = AccessPlan.load(tmp_path / 'plan.json')
+    assert plan == recorder.plan()
+
+    other = UDM.from_python('TEST', 1, {'mesh': {'positions': np.ones((2, 3), dtype=np.float32)}})
+    try:
+        result = other.prefetch_plan(plan)
+        assert 'clips' in result.skipped
+        assert 'mesh/positions' in result.values
+        assert set(result.values) | set(result.skipped) == set(plan.paths)
+        assert other['mesh/positions'] is result.values['mesh/positions']
+    finally:
+        other.destroy()
+
+
+def test_prefetched_hits_are_recorded(document):
+    document.prefetch(['mesh/positions'])
+    with document.record() as recorder:
+        document['mesh/positions']
+    assert recorder.plan().paths == ['mesh/positions']
@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from pragma_udm_wrapper import UDM, wrapper
+
+
+@pytest.fixture
+def document():
+    udm = UDM.from_python('TEST', 1, {'name': 'test'})
+    yield udm
+    udm.destroy()
+
+
+def test_save_replaces_the_target(document, tmp_path):
+    target = tmp_path / 'out.udm_b'
+    target.write_bytes(b'previous')
+    assert document.save_async(target).result()
+    assert not document.dirty
+    assert [path.name for path in tmp_path.iterdir()] == ['out.udm_b']
+    loaded = UDM()
+    try:
+        assert loaded.load(target)
+        assert loaded.root['name'] == 'test'
+    finally:
+        loaded.destroy()
+    assert document.save_async(target).result() is False
+
+
+def test_failed_save_removes_the_temporary_file(document, tmp_path, monkeypatch):
+    def fail(udm_data, filename):
+        with open(filename, 'wb') as f:
+            f.write(b'partial')
+        return False
+
+    monkeypatch.setattr(wrapper, 'udm_save_binary', fail)
+    target = tmp_path / 'out.udm_b'
+    target.write_bytes(b'previous')
+    with pytest.raises(RuntimeError):
+        document.save_async(target).result()
+    assert [path.name for path in tmp_path.iterdir()] == ['out.udm_b']
+    assert target.read_bytes() == b'previous'
+    assert document.dirty
+
+
+def test_destroy_waits_for_a_pending_save(tmp_path, monkeypatch):
+    save_binary = wrapper.udm_save_binary
+    started = threading.Event()
+
+    def slow_save(udm_data, filename):
+        started.set()
+        time.sleep(0.2)
+        return save_binary(udm_data, filename)
+
+    monkeypatch.setattr(wrapper, 'udm_save_binary', slow_save)
+    udm = UDM.from_python('TEST', 1, {'name': 'test'})
+    future = udm.save_async(tmp_path / 'out.udm_b')
+    started.wait()
+    udm.destroy()
+    assert future.done() and future.result()
+    assert (tmp_path / 'out.udm_b').exists()
+
+
+def test_save_inside_a_transaction_is_rejected(document, tmp_path):
+    with document.transaction():
+        with pytest.raises(RuntimeError):
+            document.save_async(tmp_path / 'out.udm_b')
+    with document.lock.write():
+        with pytest.raises(RuntimeError):
+            document.save_async(tmp_path / 'out.udm_b')
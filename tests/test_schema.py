@@ -0,0 +1,51 @@
+import numpy as np
+
+from pragma_udm_wrapper.schema import ElementSchema, FieldSchema, generate_loaders
+from pragma_udm_wrapper.type_info import UdmType
+
+
+def _field(name, udm_type, seen=2, array_type=None, element=None):
+    schema = FieldSchema(name, {udm_type}, seen=seen, element=element)
+    if array_type is not None:
+        schema.array_types.add(array_type)
+    return schema
+
+
+def _schema(*fields, samples=2):
+    return ElementSchema(samples, {field.name: field for field in fields})
+
+
+def _load_module(source):
+    namespace = {}
+    exec(compile(source, '<generated>', 'exec'), namespace)
+    return namespace
+
+
+def test_generated_loader():
+    clip = _schema(_field('frameRate', UdmType.Float), _field('class', UdmType.String, seen=1))
+    schema = _schema(_field('assetName', UdmType.String),
+                     _field('clips', UdmType.Array, array_type=UdmType.Element, element=clip),
+                     _field('positions', UdmType.Array, array_type=UdmType.Vector3),
+                     _field('3d', UdmType.Boolean, seen=1))
+    source = generate_loaders(schema, 'PANIMA', 1, 3)
+    module = _load_module(source)
+    cls = module['Panima']
+    assert (cls.ASSET_TYPE, cls.ASSET_VERSION_MIN, cls.ASSET_VERSION_MAX) == ('PANIMA', 1, 3)
+    positions = np.zeros((2, 3), dtype=np.float32)
+    value = cls.from_python({'assetName': 'walk', 'clips': [{'frameRate': 24.0, 'class': 'a'}, {'frameRate': 30.0}],
+                             'positions': positions})
+    assert value.asset_name == 'walk'
+    assert value.positions is positions
+    assert value._3d is None
+    assert [clip.frame_rate for clip in value.clips] == [24.0, 30.0]
+    assert value.clips[0]._class == 'a' and value.clips[1]._class is None
+    assert type(value.clips[0]).__name__ == 'PanimaClips'
+
+
+def test_colliding_attribute_names():
+    schema = _schema(_field('fooBar', UdmType.Int32), _field('foo_bar', UdmType.String),
+                     _field('foo-bar', UdmType.Float, seen=1), _field('load', UdmType.Boolean))
+    cls = _load_module(generate_loaders(schema, 'TEST'))['Test']
+    value = cls.from_python({'fooBar': 1, 'foo_bar': 'two', 'foo-bar': 3.0, 'load': True})
+    assert (value.foo_bar, value.foo_bar_2, value.foo_bar_3, value.load_2) == (1, 'two', 3.0, True)
+    assert callable(cls.load)
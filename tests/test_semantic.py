@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from pragma_udm_wrapper.semantic import half_to_float32, semantic_view, srgb_to_linear
+from pragma_udm_wrapper.type_info import UdmType
+
+
+def test_half_to_float32():
+    values = np.array([0, 1, -2.5, 65504, np.inf], dtype=np.float16)
+    np.testing.assert_array_equal(half_to_float32(values), values.astype(np.float32))
+    np.testing.assert_array_equal(half_to_float32(values.view(np.uint16)), values.astype(np.float32))
+    assert half_to_float32(values).dtype == np.float32
+
+
+def test_srgb_to_linear():
+    colors = np.array([[0, 255, 188, 128]], dtype=np.uint8)
+    linear = srgb_to_linear(colors)
+    assert linear.dtype == np.float32
+    np.testing.assert_allclose(linear[0, :3], [0, 1, ((188 / 255 + 0.055) / 1.055) ** 2.4], rtol=1e-6)
+    # Alpha is linear coverage
+    assert linear[0, 3] == pytest.approx(128 / 255)
+    assert srgb_to_linear(colors, alpha=False)[0, 3] == pytest.approx(((128 / 255 + 0.055) / 1.055) ** 2.4)
+    assert srgb_to_linear(np.uint8(10)) == pytest.approx(10 / 255 / 12.92)
+    with pytest.raises(ValueError):
+        srgb_to_linear(np.zeros(3, dtype=np.float32))
+
+
+def test_transform_view_shares_memory():
+    flat = np.arange(14, dtype=np.float32).reshape(2, 7)
+    view = semantic_view(flat, UdmType.Transform)
+    assert view.shape == (2,)
+    np.testing.assert_array_equal(view['pos'][1], [7, 8, 9])
+    np.testing.assert_array_equal(view['rot'][0], [3, 4, 5, 6])
+    view['pos'][0, 0] = 100
+    assert flat[0, 0] == 100
+    single = semantic_view(flat[1], UdmType.Transform)
+    np.testing.assert_array_equal(single['rot'], [10, 11, 12, 13])
+
+
+def test_matrix_and_boolean_views():
+    flat = np.arange(32, dtype=np.float32).reshape(2, 16)
+    matrices = semantic_view(flat, UdmType.Mat4)
+    assert matrices.shape == (2, 4, 4)
+    assert matrices[1, 0, 1] == 17
+    booleans = semantic_view(np.array([0, 1], dtype=np.uint8), UdmType.Boolean)
+    assert booleans.dtype == np.bool_ and booleans.tolist() == [False, True]
+    values = np.zeros(3, dtype=np.float32)
+    assert semantic_view(values, UdmType.Float) is values
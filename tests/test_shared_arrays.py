@@ -0,0 +1,50 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from pragma_udm_wrapper import UDM
+from pragma_udm_wrapper.shared_arrays import SharedArrayPool, _attached, detach_all
+
+
+def _sum(shared):
+    return float(shared.attach().sum())
+
+
+def test_attach_and_release():
+    array = np.arange(12, dtype=np.float32).reshape(4, 3)
+    structs = np.zeros(3, np.dtype([('id', np.int32), ('weight', np.float64)]))
+    structs['id'] = [1, 2, 3]
+    with SharedArrayPool() as pool:
+        shared = pickle.loads(pickle.dumps(pool.share(array)))
+        view = shared.attach()
+        np.testing.assert_equal(view, array)
+        assert not view.flags.writeable
+        assert shared.name in _attached
+        np.testing.assert_equal(pool.share(structs).attach(), structs)
+        with ProcessPoolExecutor(1) as executor:
+            assert executor.submit(_sum, shared).result() == array.sum()
+        del view
+        detach_all()
+        assert not _attached
+        name = shared.name
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name)
+
+
+def test_pickled_document_round_trip():
+    udm = UDM.from_python('TEST', 3, {'name': 'test', 'positions': np.arange(6, dtype=np.float32).reshape(2, 3)})
+    try:
+        copy = pickle.loads(pickle.dumps(udm))
+    finally:
+        udm.destroy()
+    try:
+        assert (copy.asset_type, copy.asset_version) == ('TEST', 3)
+        assert copy.root['name'] == 'test'
+        np.testing.assert_equal(copy.root['positions'].to_python(), np.arange(6, dtype=np.float32).reshape(2, 3))
+    finally:
+        copy.destroy()
+    empty = pickle.loads(pickle.dumps(UDM()))
+    assert not empty._udm_data
@@ -0,0 +1,75 @@
+import threading
+
+import numpy as np
+import pytest
+
+from pragma_udm_wrapper import transaction as transaction_module
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    calls = []
+    write_python, write_items = transaction_module.write_python, transaction_module.write_items
+
+    def record_python(prop_p, path, value, **kwargs):
+        calls.append(('value', path, value))
+        return write_python(prop_p, path, value, **kwargs)
+
+    def record_items(prop_p, udm_type, offset, values, udm=None):
+        calls.append(('items', offset, len(values)))
+        return write_items(prop_p, udm_type, offset, values, udm)
+
+    monkeypatch.setattr(transaction_module, 'write_python', record_python)
+    monkeypatch.setattr(transaction_module, 'write_items', record_items)
+    return calls
+
+
+def test_writes_to_one_path_coalesce(document, writes):
+    with document.transaction() as transaction:
+        document['mesh']['scale'] = 1
+        # Another wrapper of the same element, with its own handle
+        document['mesh']['scale'] = 2
+        positions = document['mesh/positions']
+        positions[0] = [1, 1, 1]
+        positions[1] = [2, 2, 2]
+        positions[3] = [4, 4, 4]
+        positions[0] = [3, 3, 3]
+        assert len(transaction) == 4
+    assert writes == [('value', 'scale', 2), ('items', 0, 2), ('items', 3, 1)]
+    assert document['mesh/scale'] == 2
+    np.testing.assert_equal(document['mesh/positions'].to_python()[:, 0], [3, 2, 6, 4])
+
+
+def test_writes_keep_their_order(document, writes):
+    with document.transaction():
+        document.root['first'] = 1
+        document['mesh/positions'][2] = [1, 2, 3]
+        document.root['second'] = 2
+        # Moves to the end, after the item write issued before it
+        document.root['first'] = 3
+        document['mesh/positions'][0] = [4, 5, 6]
+    assert writes == [('items', 2, 1), ('value', 'second', 2), ('value', 'first', 3), ('items', 0, 1)]
+
+
+def test_overwritten_array_keeps_later_value(document):
+    with document.transaction():
+        document['mesh/positions'][1] = [1, 1, 1]
+        document['mesh']['positions'] = np.full((2, 3), 7, dtype=np.float32)
+    np.testing.assert_equal(document['mesh/positions'].to_python(), np.full((2, 3), 7, dtype=np.float32))
+
+
+def test_transaction_is_bound_to_its_thread(document):
+    errors = []
+    root = document.root
+    with document.transaction() as transaction:
+        def write():
+            try:
+                transaction.set(root, 'value', 1)
+            except RuntimeError as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        thread.join(5)
+    assert len(errors) == 1
+    assert 'value' not in document.root
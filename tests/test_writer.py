@@ -0,0 +1,100 @@
+import numpy as np
+
+from pragma_udm_wrapper import UDM, UdmType
+from pragma_udm_wrapper.wrapper import udm_get_property_type
+from pragma_udm_wrapper.writer import collect_types, write_blob
+
+
+def test_writes_only_dirty_their_document(tmp_path):
+    first = UDM.from_python('TEST', 1, {'value': 1})
+    second = UDM.from_python('TEST', 1, {'value': 2})
+    try:
+        assert first.save(tmp_path / 'first.udm_b')
+        assert second.save(tmp_path / 'second.udm_b')
+        assert not first.dirty and not second.dirty
+        first.root['value'] = 3
+        assert first.dirty
+        assert not second.dirty
+    finally:
+        first.destroy()
+        second.destroy()
+
+
+def _clean_document(tmp_path, data):
+    udm = UDM.from_python('TEST', 1, data)
+    assert udm.save(tmp_path / 'test.udm_b')
+    return udm
+
+
+def test_empty_element_assignment(tmp_path):
+    udm = _clean_document(tmp_path, {'value': 1})
+    try:
+        root = udm.root
+        assert 'x' not in root and len(root) == 1
+        root['x'] = {}
+        assert 'x' in root
+        assert len(root) == 2
+        assert sorted(root.keys()) == ['value', 'x']
+        assert udm.dirty
+    finally:
+        udm.destroy()
+
+
+def test_empty_element_array_assignment(tmp_path):
+    udm = _clean_document(tmp_path, {'value': 1})
+    try:
+        root = udm.root
+        assert 'x' not in root and len(root) == 1
+        root['x'] = [{}, {}]
+        assert 'x' in root
+        assert len(root) == 2
+        assert len(root['x']) == 2
+        assert udm.dirty
+    finally:
+        udm.destroy()
+
+
+def test_value_array_item_types_round_trip():
+    rotations = np.tile(np.asarray([1, 0, 0, 0], np.float32), (3, 1))
+    angles = np.zeros((3, 3), np.float32)
+    types = {'rotations/*': UdmType.Quaternion, 'clips/0/angles/*': UdmType.EulerAngles}
+    udm = UDM.from_python('TEST', 1, {'rotations': rotations, 'clips': [{'angles': angles}]}, types)
+    try:
+        assert udm['rotations'].array_type == UdmType.Quaternion
+        assert udm['clips'][0]['angles'].array_type == UdmType.EulerAngles
+        assert collect_types(udm.root) == types
+        copy = UDM.from_python('TEST', 1, udm.root.to_python(), collect_types(udm.root))
+        try:
+            assert copy['rotations'].array_type == UdmType.Quaternion
+            np.testing.assert_equal(copy['rotations'].to_python(), rotations)
+        finally:
+            copy.destroy()
+    finally:
+        udm.destroy()
+
+
+def test_write_blob_round_trip(tmp_path):
+    data = np.arange(4096, dtype=np.uint16)
+    udm = UDM.from_python('TEST', 1, {})
+    try:
+        root = udm.root
+        with udm.lock.write():
+            write_blob(root.prop_pointer, 'raw', data, udm=udm)
+            write_blob(root.prop_pointer, 'compressed', data, compressed=True, udm=udm)
+            write_blob(root.prop_pointer, 'nested/empty', b'', udm=udm)
+        assert udm_get_property_type(root.prop_pointer, b'raw') == UdmType.Blob
+        assert udm_get_property_type(root.prop_pointer, b'compressed') == UdmType.BlobLz4
+        assert root['raw'] == data.tobytes()
+        assert root['compressed'] == data.tobytes()
+        assert udm.save(tmp_path / 'blobs.udm_b')
+    finally:
+        udm.destroy()
+
+    loaded = UDM()
+    assert loaded.load(tmp_path / 'blobs.udm_b')
+    try:
+        assert loaded.root['raw'] == data.tobytes()
+        assert loaded.root['compressed'] == data.tobytes()
+        assert loaded.root['nested']['empty'] == b''
+    finally:
+        loaded.destroy()
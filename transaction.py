@@ -0,0 +1,78 @@
+import threading
+from typing import Any, Dict, Hashable, List, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from .properties import ElementProperty, ValueArrayProperty, _join_path
+from .writer import batched_writes, write_items, write_python
+
+if TYPE_CHECKING:
+    from . import UDM
+
+
+class Transaction:
+    """Buffers writes to one document and applies them at once when flushed.
+
+    Writes are applied in the order they were issued. Writing the same document path again replaces the buffered
+    write, only the last one reaches the native side, at the position of the last write. Consecutive item writes to
+    one value array are merged, sorted and every run of consecutive indices is written with a single native call.
+    Caches are invalidated and the document marked dirty once per flush instead of once per value. Reads made before
+    the flush do not see the buffered writes. A transaction may only be used by the thread that opened it.
+    """
+
+    def __init__(self, udm: 'UDM'):
+        self._udm = udm
+        self._owner = threading.get_ident()
+        # Pending writes in issue order, values are keyed by (document, path) and runs of item writes by their
+        # array and position
+        self._ops: Dict[Hashable, Tuple[Any, ...]] = {}
+        self._last_items: Any = None
+        self._runs = 0
+
+    def _check_owner(self):
+        if threading.get_ident() != self._owner:
+            raise RuntimeError('Transaction used outside of the thread that opened it')
+
+    def __len__(self) -> int:
+        return sum(len(op[2]) if op[0] == 'items' else 1 for op in self._ops.values())
+
+    def set(self, element: ElementProperty, name: str, value):
+        self._check_owner()
+        key = (element._udm, _join_path(element.path, name))
+        # Reinserted so the write lands after everything issued before it
+        self._ops.pop(key, None)
+        self._ops[key] = 'value', element.prop_pointer, name, value
+        self._last_items = None
+
+    def set_items(self, array: ValueArrayProperty, start: int, values):
+        self._check_owner()
+        key = self._last_items
+        if key is None or key[1] != (array._udm, array.path):
+            self._runs += 1
+            key = self._last_items = (self._runs, (array._udm, array.path))
+            self._ops[key] = 'items', array, {}
+        items = self._ops[key][2]
+        for offset, value in enumerate(values):
+            items[start + offset] = value
+
+    def flush(self):
+        self._check_owner()
+        ops, self._ops, self._last_items = self._ops, {}, None
+        with batched_writes():
+            for op in ops.values():
+                if op[0] == 'value':
+                    _, prop_p, name, value = op
+                    write_python(prop_p, name, value, udm=self._udm)
+                    continue
+                _, array, items = op
+                indices = np.fromiter(sorted(items), np.int64, len(items))
+                # Split the sorted indices wherever they stop being consecutive
+                runs: List[np.ndarray] = np.split(indices, np.flatnonzero(np.diff(indices) != 1) + 1)
+                for run in runs:
+                    write_items(array.prop_pointer, array.array_type, int(run[0]), [items[i] for i in run.tolist()],
+                                self._udm)
+                array.data_buffer = None
+
+    def discard(self):
+        self._ops.clear()
+        self._last_items = None
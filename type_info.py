@@ -71,7 +71,7 @@ udm_to_np = {
     UdmType.Utf8String: (np.uint8, 1),
     UdmType.Int8: (np.int8, 1),
     UdmType.UInt8: (np.uint8, 1),
-    UdmType.Srgba: (np.uint8, 3),
+    UdmType.Srgba: (np.uint8, 4),
     UdmType.Int16: (np.int16, 1),
     UdmType.UInt16: (np.uint16, 1),
     UdmType.HdrColor: (np.uint16, 3),
@@ -96,3 +96,31 @@ udm_to_np = {
     UdmType.Vector3i: (np.int32, 3),
     UdmType.Vector4i: (np.int32, 4),
 }
+
+# Preferred UdmType for a (numpy scalar type, component count) pair when writing numpy data
+np_to_udm = {
+    (np.dtype(np.int8), 1): UdmType.Int8,
+    (np.dtype(np.uint8), 1): UdmType.UInt8,
+    (np.dtype(np.int16), 1): UdmType.Int16,
+    (np.dtype(np.uint16), 1): UdmType.UInt16,
+    (np.dtype(np.int32), 1): UdmType.Int32,
+    (np.dtype(np.uint32), 1): UdmType.UInt32,
+    (np.dtype(np.int64), 1): UdmType.Int64,
+    (np.dtype(np.uint64), 1): UdmType.UInt64,
+    (np.dtype(np.float16), 1): UdmType.Half,
+    (np.dtype(np.float32), 1): UdmType.Float,
+    (np.dtype(np.float64), 1): UdmType.Double,
+    (np.dtype(np.bool_), 1): UdmType.Boolean,
+    (np.dtype(np.float32), 2): UdmType.Vector2,
+    (np.dtype(np.float32), 3): UdmType.Vector3,
+    (np.dtype(np.float32), 4): UdmType.Vector4,
+    (np.dtype(np.float32), 7): UdmType.Transform,
+    (np.dtype(np.float32), 10): UdmType.ScaledTransform,
+    (np.dtype(np.float32), 12): UdmType.Mat3x4,
+    (np.dtype(np.float32), 16): UdmType.Mat4,
+    (np.dtype(np.int32), 2): UdmType.Vector2i,
+    (np.dtype(np.int32), 3): UdmType.Vector3i,
+    (np.dtype(np.int32), 4): UdmType.Vector4i,
+    (np.dtype(np.uint8), 4): UdmType.Srgba,
+    (np.dtype(np.uint16), 3): UdmType.HdrColor,
+}
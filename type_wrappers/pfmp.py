@@ -143,7 +143,7 @@ class _SessionSettings(ITypeWrapper):
 
     @property
     def render_settings(self):
-        return _RenderSettings(self._prop['renderSettings'])
+        return self._wrap('renderSettings', _RenderSettings)
 
 
 class _TimeFrame(ITypeWrapper):
@@ -223,15 +223,15 @@ class _Track(ITypeWrapper):
 
     @property
     def overlay_clips(self):
-        return [_OverlayClip(prop) for prop in self._prop['overlayClips']]
+        return self._wrap_array('overlayClips', _OverlayClip)
 
     @property
     def film_clips(self):
-        return [_FilmClip(prop) for prop in self._prop['filmClips']]
+        return self._wrap_array('filmClips', _FilmClip)
 
     @property
     def audio_clips(self):
-        return [_AudioClip(prop) for prop in self._prop['audioClips']]
+        return self._wrap_array('audioClips', _AudioClip)
 
 
 class _TrackGroup(ITypeWrapper):
@@ -239,7 +239,7 @@ class _TrackGroup(ITypeWrapper):
 
     @property
     def tracks(self):
-        return [_Track(prop) for prop in self._prop['tracks']]
+        return self._wrap_array('tracks', _Track)
 
     @property
     def unique_id(self):
@@ -263,15 +263,15 @@ class _Clip(ITypeWrapper):
 
     @property
     def scene(self):
-        return _Scene(self._prop['scene'])
+        return self._wrap('scene', _Scene)
 
     @property
     def time_frame(self):
-        return _TimeFrame(self._prop['timeFrame'])
+        return self._wrap('timeFrame', _TimeFrame)
 
     @property
     def track_groups(self):
-        return [_TrackGroup(prop) for prop in self._prop['trackGroups']]
+        return self._wrap_array('trackGroups', _TrackGroup)
 
     @property
     def bookmark_sets(self):
@@ -323,11 +323,11 @@ class _Session(ITypeWrapper):
 
     @property
     def settings(self):
-        return _SessionSettings(self._prop['settings'])
+        return self._wrap('settings', _SessionSettings)
 
     @property
     def clips(self):
-        return [_Clip(prop) for prop in self._prop['clips']]
+        return self._wrap_array('clips', _Clip)
 
 
 class PragmaFilmMakerProject(ITypeRootWrapper):
@@ -338,4 +338,4 @@ class PragmaFilmMakerProject(ITypeRootWrapper):
 
     @property
     def session(self):
-        return _Session(self._root['session'])
+        return self._wrap('session', _Session)
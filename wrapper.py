@@ -46,6 +46,15 @@ class BlobResult(IntEnum):
         return cls(value)
 
 
+class UdmArrayType(IntEnum):
+    Raw = 0
+    Compressed = 1
+
+    @classmethod
+    def from_param(cls, value):
+        return cls(value)
+
+
 class ReadArrayPropertyResult(IntEnum):
     Success = 0
     NotAnArrayType = 1
@@ -60,11 +69,16 @@ class ReadArrayPropertyResult(IntEnum):
 _library = load_library()
 
 # bool udm_add_property_array(UdmProperty udmData,const char *path,UdmType type,UdmArrayType arrayType,uint32_t size)
-# _udm_add_property_array_function = _library.udm_add_property_array
+udm_add_property_array = _library.udm_add_property_array
+udm_add_property_array.argtypes = [ctypes.c_void_p, ctypes.c_char_p, UdmType, UdmArrayType, ctypes.c_uint32]
+udm_add_property_array.restype = ctypes.c_bool
 
 # bool udm_add_property_struct(UdmProperty udmData,const char *path,uint32_t numMembers,UdmType *types,
 # const char **names)
-# _udm_add_property_struct_function = _library.udm_add_property_struct
+udm_add_property_struct = _library.udm_add_property_struct
+udm_add_property_struct.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_uint32, ctypes.POINTER(ctypes.c_uint8),
+                                    ctypes.POINTER(ctypes.c_char_p)]
+udm_add_property_struct.restype = ctypes.c_bool
 
 # region Create/Save/Destroy
 
@@ -103,6 +117,12 @@ udm_get_asset_version = _library.udm_get_asset_version
 udm_get_asset_version.argtypes = [ctypes.c_void_p]
 udm_get_asset_version.restype = ctypes.c_uint32
 
+# char *udm_read_header(const char *fileName,uint32_t *outVersion)
+# Reads only the file header, returns the asset type or nullptr on failure. Release it with udm_free_memory
+udm_read_header = _library.udm_read_header
+udm_read_header.argtypes = [ctypes.c_char_p, ctypes.POINTER(ctypes.c_uint32)]
+udm_read_header.restype = ctypes.c_void_p
+
 # endregion
 
 # void udm_free_memory(UdmData udmData)
@@ -145,14 +165,16 @@ udm_get_property_i.argtypes = [ctypes.c_void_p, ctypes.c_uint32]
 udm_get_property_i.restype = ctypes.c_void_p
 
 # char *udm_property_to_json(UdmProperty prop)
+# Returned string is owned by the caller and has to be released with udm_free_memory
 udm_property_to_json = _library.udm_property_to_json
 udm_property_to_json.argtypes = [ctypes.c_void_p]
-udm_property_to_json.restype = ctypes.c_char_p
+udm_property_to_json.restype = ctypes.c_void_p
 
 # const char *udm_property_to_ascii(UdmProperty prop,const char *path));
+# Returned string is owned by the caller and has to be released with udm_free_memory
 udm_property_to_ascii = _library.udm_property_to_ascii
 udm_property_to_ascii.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
-udm_property_to_ascii.restype = ctypes.c_char_p
+udm_property_to_ascii.restype = ctypes.c_void_p
 
 # void udm_destroy_property(UdmProperty prop)
 udm_destroy_property = _library.udm_destroy_property
@@ -215,8 +237,8 @@ udm_read_array_property.restype = ReadArrayPropertyResult
 #                               uint32_t numMembers,UdmType *types,const char **names);
 udm_write_array_property = _library.udm_write_array_property
 udm_write_array_property.argtypes = [ctypes.c_void_p, ctypes.c_char_p, UdmType, ctypes.c_void_p,
-                                     ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32,
-                                     ctypes.POINTER(ctypes.c_uint8), ctypes.POINTER(ctypes.c_char_p)]
+                                     ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32, UdmArrayType,
+                                     ctypes.c_uint32, ctypes.POINTER(ctypes.c_uint8), ctypes.POINTER(ctypes.c_char_p)]
 udm_write_array_property.restype = ctypes.c_bool
 
 # char *udm_read_property_s(UdmProperty prop,const char *path,const char *defaultValue)
@@ -231,7 +253,7 @@ udm_read_array_property_string.restype = ctypes.POINTER(ctypes.c_char_p)
 
 # bool udm_write_property_vs(UdmProperty prop,const char *path,const char **values,uint32_t numValues)
 udm_write_array_property_string = _library.udm_write_property_vs
-udm_write_array_property_string.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_char_p), ctypes.c_void_p,
+udm_write_array_property_string.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.POINTER(ctypes.c_char_p),
                                             ctypes.c_uint32]
 udm_write_array_property_string.restype = ctypes.c_bool
 
@@ -0,0 +1,295 @@
+import ctypes
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+
+import numpy as np
+
+from .iproperty import IProperty
+from .type_info import UdmType, udm_to_np, np_to_udm
+from .wrapper import (
+    UdmArrayType, udm_write_property, udm_write_property_string, udm_write_array_property,
+    udm_write_array_property_string, udm_size_of_struct, udm_add_property_array, udm_get_property,
+    udm_get_property_i, udm_get_property_type, udm_write_property_v, udm_size_of_type, nullptr
+)
+
+if TYPE_CHECKING:
+    from . import UDM
+
+PropertyHandle = Union[int, ctypes.c_void_p]
+
+# Bumped by writes made without their document, those change the generation of every document
+_write_generation = 0
+
+
+def write_generation(udm: Optional['UDM'] = None) -> int:
+    """Generation the caches and dirty state of `udm` are checked against, it changes with every write to it.
+
+    The helpers below take the document the handles belong to as their `udm` argument. Writes made without it can
+    not be attributed and change the generation of all documents.
+    """
+    if udm is None:
+        return _write_generation
+    return _write_generation + udm._writes
+
+
+_batch = threading.local()
+
+
+def _written(udm: Optional['UDM'] = None):
+    global _write_generation
+    if getattr(_batch, 'depth', 0):
+        _batch.pending.add(udm)
+        return
+    if udm is None:
+        _write_generation += 1
+    else:
+        udm._writes += 1
+
+
+@contextmanager
+def batched_writes():
+    """Defers the cache invalidation of writes made by this thread until the outermost batch ends."""
+    depth = getattr(_batch, 'depth', 0)
+    if depth == 0:
+        _batch.pending = set()
+    _batch.depth = depth + 1
+    try:
+        yield
+    finally:
+        _batch.depth -= 1
+        if _batch.depth == 0:
+            pending, _batch.pending = _batch.pending, set()
+            for udm in pending:
+                _written(udm)
+
+
+def _to_buffer(udm_type: UdmType, value) -> np.ndarray:
+    data_type, data_len = udm_to_np[udm_type]
+    buffer = np.ascontiguousarray(value, data_type)
+    if data_len > 1:
+        buffer = buffer.reshape(-1, data_len)
+    return buffer
+
+
+def struct_members(dtype: np.dtype) -> Tuple[List[str], List[UdmType]]:
+    """Maps the fields of a structured numpy dtype onto UDM struct member names and types."""
+    names, types = [], []
+    for name in dtype.names:
+        field_dtype = dtype.fields[name][0]
+        count = int(np.prod(field_dtype.shape)) if field_dtype.shape else 1
+        udm_type = np_to_udm.get((field_dtype.base, count))
+        if udm_type is None:
+            raise TypeError(f'Struct member {name!r} of type {field_dtype} has no UDM equivalent')
+        names.append(name)
+        types.append(udm_type)
+    return names, types
+
+
+def write_value(prop_p: PropertyHandle, path: str, udm_type: UdmType, value, udm: Optional['UDM'] = None):
+    """Writes (and creates if missing) a single non-array value at `path` relative to `prop_p`."""
+    b_path = path.encode('utf8')
+    if udm_type in (UdmType.String, UdmType.Utf8String):
+        res = udm_write_property_string(prop_p, b_path, value.encode('utf8'))
+    else:
+        buffer = _to_buffer(udm_type, value)
+        expected_len = udm_to_np[udm_type][1]
+        if buffer.size != expected_len:
+            raise ValueError(f'Expected {expected_len} components for {udm_type.name} value at {path!r}, '
+                             f'got {buffer.size}')
+        res = udm_write_property(prop_p, b_path, udm_type, buffer.ctypes.data, buffer.nbytes)
+    if not res:
+        raise ValueError(f'Failed to write {udm_type.name} value at {path!r}')
+    _written(udm)
+
+
+def write_array(prop_p: PropertyHandle, path: str, udm_type: UdmType, values, compressed: bool = False,
+                udm: Optional['UDM'] = None):
+    """Writes a whole value array in one native call."""
+    buffer = _to_buffer(udm_type, values)
+    array_type = UdmArrayType.Compressed if compressed else UdmArrayType.Raw
+    res = udm_write_array_property(prop_p, path.encode('utf8'), udm_type, buffer.ctypes.data, buffer.nbytes, 0,
+                                   len(buffer), array_type, 0, None, None)
+    if not res:
+        raise ValueError(f'Failed to write {udm_type.name} array at {path!r}')
+    _written(udm)
+
+
+def write_items(prop_p: PropertyHandle, udm_type: UdmType, offset: int, values, udm: Optional['UDM'] = None):
+    """Overwrites `len(values)` consecutive items of an existing value array starting at `offset` in one native call."""
+    buffer = _to_buffer(udm_type, values)
+    if buffer.ndim == 0:
+        buffer = buffer.reshape(1)
+    if not udm_write_property_v(prop_p, nullptr, buffer.ctypes.data, udm_size_of_type(udm_type), offset, len(buffer)):
+        raise ValueError(f'Failed to write {len(buffer)} {udm_type.name} items at offset {offset}')
+    _written(udm)
+
+
+def write_struct_array(prop_p: PropertyHandle, path: str, values: np.ndarray, compressed: bool = False,
+                       udm: Optional['UDM'] = None):
+    """Writes a structured numpy array as an array of UDM structs in one native call."""
+    names, types = struct_members(values.dtype)
+    member_types = (ctypes.c_uint8 * len(types))(*types)
+    member_names = (ctypes.c_char_p * len(names))(*(name.encode('utf8') for name in names))
+    sizeof = udm_size_of_struct(len(types), member_types)
+    # Drop any padding numpy added, UDM structs are packed
+    packed_dtype = np.dtype([(name, values.dtype.fields[name][0]) for name in names])
+    if sizeof != packed_dtype.itemsize:
+        raise ValueError(f'Struct layout of {path!r} does not match UDM calculated size')
+    buffer = np.ascontiguousarray(values.astype(packed_dtype, copy=False))
+    array_type = UdmArrayType.Compressed if compressed else UdmArrayType.Raw
+    res = udm_write_array_property(prop_p, path.encode('utf8'), UdmType.Struct, buffer.ctypes.data, buffer.nbytes, 0,
+                                   len(buffer), array_type, len(types), member_types, member_names)
+    if not res:
+        raise ValueError(f'Failed to write struct array at {path!r}')
+    _written(udm)
+
+
+def write_string_array(prop_p: PropertyHandle, path: str, values: Sequence[str], udm: Optional['UDM'] = None):
+    encoded = (ctypes.c_char_p * len(values))(*(value.encode('utf8') for value in values))
+    if not udm_write_array_property_string(prop_p, path.encode('utf8'), encoded, len(values)):
+        raise ValueError(f'Failed to write string array at {path!r}')
+    _written(udm)
+
+
+def write_blob(prop_p: PropertyHandle, path: str, data, compressed: bool = False, udm: Optional['UDM'] = None):
+    """Writes any buffer-protocol object as a Blob (or BlobLz4, compressed by the native side) without copying."""
+    buffer = np.frombuffer(memoryview(data).cast('B'), np.uint8)
+    udm_type = UdmType.BlobLz4 if compressed else UdmType.Blob
+    if not udm_write_property(prop_p, path.encode('utf8'), udm_type, buffer.ctypes.data, buffer.nbytes):
+        raise ValueError(f'Failed to write {udm_type.name} at {path!r}')
+    _written(udm)
+
+
+def _array_type_of(array: np.ndarray) -> UdmType:
+    if array.ndim == 1:
+        count = 1
+    elif array.ndim == 2:
+        count = array.shape[1]
+    else:
+        raise TypeError(f'Can not map array of shape {array.shape} onto a UDM array')
+    udm_type = np_to_udm.get((array.dtype, count))
+    if udm_type is None:
+        raise TypeError(f'Can not map array of {array.dtype} with {count} components onto a UDM type')
+    return udm_type
+
+
+def infer_udm_type(value) -> UdmType:
+    """Picks the UDM type used to store a python value, arrays and lists map to UdmType.Array."""
+    if isinstance(value, dict):
+        return UdmType.Element
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return UdmType.Array
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return UdmType.Blob
+    if isinstance(value, str):
+        return UdmType.String
+    if isinstance(value, (bool, np.bool_)):
+        return UdmType.Boolean
+    if isinstance(value, np.generic):
+        return np_to_udm[(value.dtype, 1)]
+    if isinstance(value, int):
+        return UdmType.Int32 if -2 ** 31 <= value < 2 ** 31 else UdmType.Int64
+    if isinstance(value, float):
+        return UdmType.Float
+    raise TypeError(f'Can not store value of type {type(value).__name__} in UDM')
+
+
+def write_python(prop_p: PropertyHandle, path: str, value, types: Optional[Dict[str, UdmType]] = None,
+                 compress_threshold: Optional[int] = None, udm: Optional['UDM'] = None, _type_path: str = ''):
+    """Writes nested dicts, lists, scalars, strings and numpy arrays below `prop_p`.
+
+    `types` optionally maps '/' separated paths (array items are addressed by index) onto the UdmType to store the
+    value as, UdmType.ArrayLz4 forces a compressed array. A '<path>/*' key sets the item type of a value array, like
+    Quaternion for float32 (N, 4) data that would be stored as Vector4. Value arrays with at least `compress_threshold` bytes are
+    written compressed. `udm` is the document `prop_p` belongs to, see `write_generation`.
+    """
+    type_path = f'{_type_path}/{path}' if _type_path else path
+    udm_type = (types or {}).get(type_path)
+    if udm_type is None:
+        udm_type = infer_udm_type(value)
+    compressed = udm_type == UdmType.ArrayLz4
+
+    if udm_type == UdmType.Element:
+        if not value:
+            if not udm_write_property(prop_p, path.encode('utf8'), UdmType.Element, None, 0):
+                raise ValueError(f'Failed to create empty element at {path!r}')
+            _written(udm)
+            return
+        for name, item in value.items():
+            write_python(prop_p, f'{path}/{name}', item, types, compress_threshold, udm, _type_path)
+    elif udm_type in (UdmType.Array, UdmType.ArrayLz4):
+        if isinstance(value, np.ndarray):
+            array = value
+        elif value and all(isinstance(item, dict) for item in value):
+            _write_element_array(prop_p, path, value, types, compress_threshold, type_path, compressed, udm)
+            return
+        elif all(isinstance(item, str) for item in value):
+            write_string_array(prop_p, path, value, udm)
+            return
+        else:
+            array = np.asarray(value)
+            if array.dtype == object:
+                raise TypeError(f'Can not store list with mixed items at {type_path!r} as a UDM array')
+        if compress_threshold is not None and array.nbytes >= compress_threshold:
+            compressed = True
+        if array.dtype.fields is not None:
+            write_struct_array(prop_p, path, array, compressed, udm)
+        else:
+            if array.ndim == 3 and array.shape[1:] in ((4, 4), (3, 4)):
+                # Matrix arrays, Mat4 and Mat3x4
+                array = array.reshape(len(array), -1)
+            item_type = (types or {}).get(f'{type_path}/*')
+            write_array(prop_p, path, item_type or _array_type_of(array), array, compressed, udm)
+    elif udm_type in (UdmType.Blob, UdmType.BlobLz4):
+        write_blob(prop_p, path, value, udm_type == UdmType.BlobLz4, udm)
+    else:
+        write_value(prop_p, path, udm_type, value, udm)
+
+
+def _write_element_array(prop_p: PropertyHandle, path: str, items: List[dict], types: Optional[Dict[str, UdmType]],
+                         compress_threshold: Optional[int], type_path: str, compressed: bool, udm: Optional['UDM']):
+    b_path = path.encode('utf8')
+    array_type = UdmArrayType.Compressed if compressed else UdmArrayType.Raw
+    if not udm_add_property_array(prop_p, b_path, UdmType.Element, array_type, len(items)):
+        raise ValueError(f'Failed to create element array at {path!r}')
+    _written(udm)
+    array_p = udm_get_property(prop_p, b_path)
+    for index, item in enumerate(items):
+        item_p = udm_get_property_i(array_p, index)
+        for name, value in item.items():
+            write_python(item_p, name, value, types, compress_threshold, udm, f'{type_path}/{index}')
+
+
+def collect_types(value, path: str = '', types: Optional[Dict[str, UdmType]] = None) -> Dict[str, UdmType]:
+    """Records the UdmType of every property, and item type of every value array, that can not be inferred back from
+    its `to_python()` value.
+
+    Passing the result as `types` to `write_python`/`UDM.from_python` makes the round-trip exact.
+    """
+    from .properties import ArrayProperty, ElementProperty, ValueArrayProperty, StructArrayProperty
+
+    if types is None:
+        types = {}
+    if isinstance(value, ElementProperty):
+        prefix = f'{path}/' if path else ''
+        for name in value:
+            child = value[name]
+            child_path = prefix + name
+            if isinstance(child, IProperty):
+                if child.type == UdmType.ArrayLz4:
+                    types[child_path] = UdmType.ArrayLz4
+                collect_types(child, child_path, types)
+            else:
+                udm_type = udm_get_property_type(value.prop_pointer, name.encode('utf8'))
+                if udm_type != infer_udm_type(child):
+                    types[child_path] = udm_type
+    elif isinstance(value, ValueArrayProperty):
+        data_type, data_len = udm_to_np[value.array_type]
+        if np_to_udm.get((np.dtype(data_type), data_len)) != value.array_type:
+            types[f'{path}/*'] = value.array_type
+    elif isinstance(value, ArrayProperty) and not isinstance(value, StructArrayProperty):
+        if value.array_type == UdmType.Element:
+            for index, item in enumerate(value):
+                collect_types(item, f'{path}/{index}', types)
+    return types